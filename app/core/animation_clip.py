@@ -0,0 +1,617 @@
+import json
+import mmap
+import struct
+import numpy as np
+
+# Binary animation clip written by scripts/blender_extract_anim.py.
+# Layout (all little-endian), same framing as the mesh payload:
+#   "MLAC" | uint32 version | uint32 header_len | JSON header | raw buffers
+# The JSON header carries the bone names, timing and armature matrix; every
+# array is listed under "buffers" as {"offset", "shape", "dtype"} relative to
+# the start of the buffer section. Header and buffers are padded to CLIP_ALIGN.
+#
+# Keys are stored per channel as flat arrays: the keys of bone b live in
+# times/values[offsets[b]:offsets[b + 1]]. Values are local to the parent
+# bone (armature space for roots); rotations are (w, x, y, z) quaternions.
+#
+# Keys are quantized (version 3): whole-frame times are uint16 frames after
+# start_frame (float32 otherwise), rotations are int16 components scaled by
+# ROTATION_SCALE, and translation/scale are uint16 steps across each bone's
+# range, with {key}_range holding the per-bone (minimum, step) rows. Bones
+# whose range is too wide for the steps to stay within POSITION_TOLERANCE /
+# SCALE_TOLERANCE are flagged in {key}_exact and keep float32 keys in
+# {key}_exact_values.
+CLIP_MAGIC = b"MLAC"
+CLIP_VERSION = 3
+CLIP_ALIGN = 16
+PREAMBLE = struct.Struct("<4sII")
+
+CHANNELS = {"translation": 3, "rotation": 4, "scale": 3}
+
+ROTATION_SCALE = 32767
+RANGE_STEPS = 65535
+
+# Default error budgets: scene units for translation and scale, degrees for rotation
+POSITION_TOLERANCE = 1e-4
+ROTATION_TOLERANCE = 0.05
+SCALE_TOLERANCE = 1e-4
+
+
+def _pad(length):
+    return -length % CLIP_ALIGN
+
+
+def quantize_times(times, start_frame):
+    """uint16 frames after `start_frame` when every key sits on a whole frame, else float32 times."""
+    relative = np.asarray(times, dtype=np.float64) - start_frame
+    if np.all(relative == np.round(relative)) and np.all((relative >= 0) & (relative <= RANGE_STEPS)):
+        return relative.astype(np.uint16)
+    return np.asarray(times, dtype=np.float32)
+
+
+def dequantize_times(times, start_frame):
+    if times.dtype == np.uint16:
+        return times.astype(np.float32) + np.float32(start_frame)
+    return times
+
+
+def quantize_range(offsets, values, tolerance):
+    """
+    uint16 steps across each bone's range of (K, n) values, plus the
+    (B, 2, n) float32 (minimum, step) rows needed to rebuild them. Bones
+    whose rounding error could exceed `tolerance` are left out of the steps
+    and kept as float32. Returns (quantized, ranges, exact, exact_values),
+    where `exact` is a (B,) uint8 flag per bone.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    counts = np.diff(offsets.astype(np.int64))
+    bone_count = len(counts)
+    owners = np.repeat(np.arange(bone_count), counts)
+    ranges = np.zeros((bone_count, 2, values.shape[1]), dtype=np.float32)
+    exact = np.zeros(bone_count, dtype=np.uint8)
+    if len(values):
+        minimum = np.full((bone_count, values.shape[1]), np.inf)
+        maximum = np.full((bone_count, values.shape[1]), -np.inf)
+        np.minimum.at(minimum, owners, values)
+        np.maximum.at(maximum, owners, values)
+        animated = counts > 0
+        ranges[animated, 0] = minimum[animated]
+        ranges[animated, 1] = (maximum[animated] - ranges[animated, 0]) / RANGE_STEPS
+        # Rounding is off by at most half a step
+        exact[animated & np.any(ranges[:, 1] > 2.0 * tolerance, axis=1)] = 1
+        ranges[exact == 1] = 0.0
+
+    stepped = exact[owners] == 0
+    step = ranges[owners[stepped], 1].astype(np.float64)
+    steps = (values[stepped] - ranges[owners[stepped], 0]) / np.where(step > 0, step, 1.0)
+    quantized = np.clip(np.round(steps), 0, RANGE_STEPS).astype(np.uint16)
+    return quantized, ranges, exact, values[~stepped].astype(np.float32)
+
+
+def dequantize_range(offsets, quantized, ranges, exact, exact_values):
+    owners = np.repeat(np.arange(len(ranges)), np.diff(offsets.astype(np.int64)))
+    stepped = exact[owners] == 0
+    values = np.empty((len(owners), ranges.shape[2]), dtype=np.float32)
+    values[stepped] = ranges[owners[stepped], 0] + quantized * ranges[owners[stepped], 1]
+    values[~stepped] = exact_values
+    return values
+
+
+def quantize_rotations(values):
+    return np.round(np.clip(values, -1.0, 1.0) * ROTATION_SCALE).astype(np.int16)
+
+
+def dequantize_rotations(quantized):
+    values = quantized.astype(np.float32) / ROTATION_SCALE
+    return values / np.maximum(np.linalg.norm(values, axis=1, keepdims=True), 1e-12)
+
+
+def slerp(q0, q1, t):
+    """Vectorized quaternion slerp over (N, 4) arrays with (N,) weights."""
+    dot = np.einsum("ij,ij->i", q0, q1)
+    # Take the short way round
+    q1 = np.where((dot < 0.0)[:, None], -q1, q1)
+    dot = np.abs(dot)
+
+    t = t[:, None]
+    theta = np.arccos(np.clip(dot, -1.0, 1.0))[:, None]
+    sin_theta = np.sin(theta)
+    nearly_equal = sin_theta < 1e-6
+    safe_sin = np.where(nearly_equal, 1.0, sin_theta)
+    w0 = np.where(nearly_equal, 1.0 - t, np.sin((1.0 - t) * theta) / safe_sin)
+    w1 = np.where(nearly_equal, t, np.sin(t * theta) / safe_sin)
+
+    result = w0 * q0 + w1 * q1
+    return result / np.linalg.norm(result, axis=1, keepdims=True)
+
+
+def quat_multiply(a, b):
+    """Hamilton product of (N, 4) wxyz quaternions (broadcasts)."""
+    aw, ax, ay, az = np.moveaxis(a, -1, 0)
+    bw, bx, by, bz = np.moveaxis(b, -1, 0)
+    return np.stack((
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+    ), axis=-1)
+
+
+def quat_rotate(q, v):
+    """Rotates (N, 3) vectors by (N, 4) wxyz unit quaternions (broadcasts)."""
+    w = q[..., :1]
+    u = q[..., 1:]
+    t = 2.0 * np.cross(u, v)
+    return v + w * t + np.cross(u, t)
+
+
+def matrix_to_quaternion(r):
+    """(N, 4) wxyz quaternions from (N, 3, 3) rotation matrices."""
+    r = np.asarray(r, dtype=np.float64)
+    m00, m01, m02 = r[:, 0, 0], r[:, 0, 1], r[:, 0, 2]
+    m10, m11, m12 = r[:, 1, 0], r[:, 1, 1], r[:, 1, 2]
+    m20, m21, m22 = r[:, 2, 0], r[:, 2, 1], r[:, 2, 2]
+    # Pick the numerically safest of the four extraction formulas per matrix
+    diagonal = np.stack((1 + m00 + m11 + m22, 1 + m00 - m11 - m22, 1 - m00 + m11 - m22, 1 - m00 - m11 + m22), axis=1)
+    case = np.argmax(diagonal, axis=1)
+    root = np.sqrt(np.maximum(diagonal[np.arange(len(r)), case], 1e-12)) * 2.0 # 4 * largest component
+
+    candidates = np.stack((
+        np.stack((root / 4, (m21 - m12) / root, (m02 - m20) / root, (m10 - m01) / root), axis=1),
+        np.stack(((m21 - m12) / root, root / 4, (m01 + m10) / root, (m02 + m20) / root), axis=1),
+        np.stack(((m02 - m20) / root, (m01 + m10) / root, root / 4, (m12 + m21) / root), axis=1),
+        np.stack(((m10 - m01) / root, (m02 + m20) / root, (m12 + m21) / root, root / 4), axis=1),
+    ))
+    q = candidates[case, np.arange(len(r))]
+    # Canonical hemisphere (w >= 0), like mathutils
+    q[q[:, 0] < 0] *= -1
+    return q / np.linalg.norm(q, axis=1, keepdims=True)
+
+
+def decompose_matrices(matrices):
+    """(translation, rotation, scale) arrays from (N, 4, 4) affine matrices without shear."""
+    matrices = np.asarray(matrices, dtype=np.float64)
+    basis = matrices[:, :3, :3]
+    scales = np.linalg.norm(basis, axis=1)
+    # Mirrored matrices keep a proper rotation by negating one scale axis
+    scales[np.linalg.det(basis) < 0, 0] *= -1
+    rotations = matrix_to_quaternion(basis / scales[:, None, :])
+    return matrices[:, :3, 3].copy(), rotations, scales
+
+
+def continuous_rotations(rotations):
+    """Flips (F, B, 4) quaternions so consecutive frames stay in one hemisphere."""
+    rotations = np.array(rotations, dtype=np.float64)
+    if len(rotations) < 2:
+        return rotations
+    dots = np.einsum("fbi,fbi->fb", rotations[1:], rotations[:-1])
+    signs = np.cumprod(np.where(dots < 0, -1.0, 1.0), axis=0)
+    rotations[1:] *= signs[..., None]
+    return rotations
+
+
+def compose_matrices(translations, rotations, scales):
+    """(N, 4, 4) matrices from (N, 3) translation, (N, 4) wxyz rotation and (N, 3) scale."""
+    w, x, y, z = rotations.T
+    matrices = np.zeros((len(translations), 4, 4), dtype=np.float64)
+    matrices[:, 0, 0] = 1 - 2 * (y * y + z * z)
+    matrices[:, 0, 1] = 2 * (x * y - w * z)
+    matrices[:, 0, 2] = 2 * (x * z + w * y)
+    matrices[:, 1, 0] = 2 * (x * y + w * z)
+    matrices[:, 1, 1] = 1 - 2 * (x * x + z * z)
+    matrices[:, 1, 2] = 2 * (y * z - w * x)
+    matrices[:, 2, 0] = 2 * (x * z - w * y)
+    matrices[:, 2, 1] = 2 * (y * z + w * x)
+    matrices[:, 2, 2] = 1 - 2 * (x * x + y * y)
+    matrices[:, :3, :3] *= scales[:, None, :]
+    matrices[:, :3, 3] = translations
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+
+class AnimationClip:
+    """
+    Keyframed local TRS animation for one armature.
+
+    `evaluate(frame)` interpolates every bone's keys at once (lerp for
+    translation/scale, slerp for rotation) and runs forward kinematics one
+    hierarchy level at a time, returning armature-space matrices.
+    """
+
+    def __init__(self, bone_names, parents, bind_pose, channels, start_frame=0, end_frame=0,
+                 fps=24.0, armature_world_matrix=None, name=""):
+        self.name = name
+        self.bone_names = list(bone_names)
+        self.bone_index = {name: i for i, name in enumerate(self.bone_names)}
+        self.parents = np.asarray(parents, dtype=np.int32)
+        self.bind_pose = {key: np.asarray(bind_pose[key], dtype=np.float32) for key in CHANNELS}
+        # channel -> (offsets, times, values)
+        self.channels = {
+            key: tuple(np.asarray(a) for a in channels[key]) for key in CHANNELS
+        }
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.fps = fps
+        if armature_world_matrix is None:
+            armature_world_matrix = np.identity(4, dtype=np.float32).reshape(16, order="F")
+        self.armature_world_matrix = [float(v) for v in armature_world_matrix]
+
+        self.pose_tensor = None # Filled by bake()
+        self._levels = self._hierarchy_levels()
+        self._search = {key: self._search_table(*self.channels[key]) for key in CHANNELS}
+
+    @classmethod
+    def from_samples(cls, bone_names, parents, frames, translations, rotations, scales, bind_pose, **kwargs):
+        """Builds a clip with one key per sampled frame from (F, B, n) local TRS arrays."""
+        frames = np.asarray(frames, dtype=np.float32)
+        rotations = continuous_rotations(rotations)
+        bone_count = len(bone_names)
+        channels = {}
+        for key, samples in (("translation", translations), ("rotation", rotations), ("scale", scales)):
+            samples = np.asarray(samples, dtype=np.float32)
+            offsets = np.arange(bone_count + 1, dtype=np.uint32) * len(frames)
+            times = np.tile(frames, bone_count)
+            values = samples.transpose(1, 0, 2).reshape(-1, CHANNELS[key])
+            channels[key] = (offsets, times, values)
+        return cls(bone_names, parents, bind_pose, channels, **kwargs)
+
+    @property
+    def frame_count(self):
+        return int(self.end_frame - self.start_frame) + 1
+
+    @property
+    def bone_count(self):
+        return len(self.bone_names)
+
+    def _hierarchy_levels(self):
+        """Bone indices grouped by depth, so each level only depends on the previous one."""
+        depth = np.full(self.bone_count, -1, dtype=np.int32)
+        for i in range(self.bone_count):
+            chain = []
+            bone = i
+            while bone >= 0 and depth[bone] < 0:
+                chain.append(bone)
+                bone = self.parents[bone]
+            base = depth[bone] if bone >= 0 else -1
+            for offset, b in enumerate(reversed(chain)):
+                depth[b] = base + 1 + offset
+        return [np.flatnonzero(depth == d) for d in range(int(depth.max(initial=-1)) + 1)]
+
+    def _search_table(self, offsets, times, values):
+        """
+        Key times shifted by bone so one searchsorted over the flat array
+        finds every bone's key at once. Returns (shifted times, stride).
+        """
+        counts = np.diff(offsets.astype(np.int64))
+        owners = np.repeat(np.arange(self.bone_count), counts)
+        span = float(times.max() - times.min()) + 1.0 if len(times) else 1.0
+        return times.astype(np.float64) + owners * span, span
+
+    def _sample(self, key, frame, defaults):
+        offsets, times, values = self.channels[key]
+        result = defaults.astype(np.float64)
+        starts = offsets[:-1].astype(np.int64)
+        ends = offsets[1:].astype(np.int64)
+        animated = np.flatnonzero(ends > starts)
+        if len(animated) == 0:
+            return result
+
+        shifted, span = self._search[key]
+        lo = np.searchsorted(shifted, frame + animated * span, side="right") - 1
+        lo = np.clip(lo, starts[animated], ends[animated] - 1)
+        hi = np.minimum(lo + 1, ends[animated] - 1)
+
+        t0 = times[lo].astype(np.float64)
+        t1 = times[hi].astype(np.float64)
+        duration = np.where(hi > lo, t1 - t0, 1.0)
+        weight = np.clip((frame - t0) / duration, 0.0, 1.0)
+        weight[hi == lo] = 0.0
+
+        v0 = values[lo].astype(np.float64)
+        v1 = values[hi].astype(np.float64)
+        if key == "rotation":
+            result[animated] = slerp(v0, v1, weight)
+        else:
+            result[animated] = v0 + (v1 - v0) * weight[:, None]
+        return result
+
+    def local_pose(self, frame):
+        """Interpolated local (translation, rotation, scale) arrays for every bone."""
+        return tuple(self._sample(key, frame, self.bind_pose[key]) for key in CHANNELS)
+
+    def forward_kinematics(self, local_matrices):
+        """Armature-space matrices from (B, 4, 4) local matrices, one level at a time."""
+        world = np.empty_like(local_matrices)
+        for level, bones in enumerate(self._levels):
+            if level == 0:
+                world[bones] = local_matrices[bones]
+            else:
+                world[bones] = world[self.parents[bones]] @ local_matrices[bones]
+        return world
+
+    def evaluate(self, frame):
+        """(B, 4, 4) armature-space matrices at `frame` (fractional frames interpolate)."""
+        return self.forward_kinematics(compose_matrices(*self.local_pose(frame)))
+
+    def bind_matrices(self):
+        """(B, 4, 4) armature-space rest matrices."""
+        return self.forward_kinematics(compose_matrices(*(self.bind_pose[key].astype(np.float64) for key in CHANNELS)))
+
+    def bake(self):
+        """
+        Evaluates every whole frame into a contiguous (F, B, 4, 4) float32
+        tensor. Each [f, b] matrix is stored transposed, so it flattens to the
+        column-major 16 floats OpenGL expects.
+        """
+        tensor = np.empty((self.frame_count, self.bone_count, 4, 4), dtype=np.float32)
+        for i in range(self.frame_count):
+            tensor[i] = self.evaluate(self.start_frame + i).transpose(0, 2, 1)
+        self.pose_tensor = tensor
+        return tensor
+
+    def baked_pose(self, frame_offset):
+        """
+        (B, 16) column-major matrices `frame_offset` frames after the start,
+        blended linearly between the two nearest baked frames. Call bake() first.
+        """
+        tensor = self.pose_tensor
+        last = len(tensor) - 1
+        frame_offset = min(max(frame_offset, 0.0), float(last))
+        lo = int(frame_offset)
+        hi = min(lo + 1, last)
+        weight = frame_offset - lo
+        if weight == 0.0 or hi == lo:
+            return tensor[lo].reshape(-1, 16)
+        return (tensor[lo] + (tensor[hi] - tensor[lo]) * weight).reshape(-1, 16)
+
+    def pose(self, frame):
+        """bone name -> 16 floats (column-major), the shape MeshManager.set_pose expects."""
+        return self.as_pose(self.evaluate(frame))
+
+    def as_pose(self, matrices):
+        flat = matrices.transpose(0, 2, 1).reshape(-1, 16).astype(np.float32)
+        return dict(zip(self.bone_names, flat))
+
+    def buffers(self, position_tolerance=POSITION_TOLERANCE, scale_tolerance=SCALE_TOLERANCE):
+        """
+        name -> array for every buffer stored in a clip file, with the keys
+        quantized. Translation and scale stay within the given tolerances.
+        """
+        tolerances = {"translation": position_tolerance, "scale": scale_tolerance}
+        # Hierarchy and rest pose first, so loading the bind pose touches one small region
+        arrays = {"parents": self.parents}
+        for key in CHANNELS:
+            arrays[f"bind_{key}"] = self.bind_pose[key]
+        for key in CHANNELS:
+            offsets, times, values = self.channels[key]
+            offsets = offsets.astype(np.uint32)
+            arrays[f"{key}_offsets"] = offsets
+            arrays[f"{key}_times"] = quantize_times(times, self.start_frame)
+            if key == "rotation":
+                arrays[f"{key}_values"] = quantize_rotations(values)
+            else:
+                (arrays[f"{key}_values"], arrays[f"{key}_range"], arrays[f"{key}_exact"],
+                 arrays[f"{key}_exact_values"]) = quantize_range(offsets, values, tolerances[key])
+        return arrays
+
+
+def encode_clip(clip, position_tolerance=POSITION_TOLERANCE, scale_tolerance=SCALE_TOLERANCE):
+    """Serializes a clip to bytes, quantizing translation and scale within the given tolerances."""
+    header = {
+        "name": clip.name,
+        "bones": clip.bone_names,
+        "start_frame": clip.start_frame,
+        "end_frame": clip.end_frame,
+        "fps": clip.fps,
+        "armature_world_matrix": clip.armature_world_matrix,
+        "buffers": {}
+    }
+    data = bytearray()
+    for name, array in clip.buffers(position_tolerance, scale_tolerance).items():
+        array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<"))
+        header["buffers"][name] = {"offset": len(data), "shape": list(array.shape), "dtype": array.dtype.str}
+        blob = array.tobytes()
+        data += blob + b"\0" * _pad(len(blob))
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    header_bytes += b" " * _pad(PREAMBLE.size + len(header_bytes))
+    return PREAMBLE.pack(CLIP_MAGIC, CLIP_VERSION, len(header_bytes)) + header_bytes + bytes(data)
+
+
+def decode_arrays(buffer):
+    """Parses a clip into (header, arrays); arrays are views over `buffer`, still quantized."""
+    magic, version, header_len = PREAMBLE.unpack_from(buffer, 0)
+    if magic != CLIP_MAGIC:
+        raise ValueError("Not a MechaLaunchPad animation clip")
+    if version != CLIP_VERSION:
+        raise ValueError(f"Unsupported animation clip version {version}")
+
+    header_start = PREAMBLE.size
+    data_start = header_start + header_len
+    header = json.loads(bytes(buffer[header_start:data_start]).decode("utf-8"))
+
+    arrays = {}
+    for name, info in header["buffers"].items():
+        dtype = np.dtype(info["dtype"])
+        count = int(np.prod(info["shape"]))
+        arrays[name] = np.frombuffer(
+            buffer, dtype=dtype, count=count, offset=data_start + info["offset"]
+        ).reshape(info["shape"])
+    return header, arrays
+
+
+def clip_from_arrays(header, arrays, keys=True):
+    """
+    Builds a clip from decoded arrays, dequantizing the keys. With keys=False
+    only the rest pose is used, which touches just the small bind buffers at
+    the start of the file.
+    """
+    if keys:
+        channels = {}
+        for key in CHANNELS:
+            offsets = arrays[f"{key}_offsets"]
+            times = dequantize_times(arrays[f"{key}_times"], header["start_frame"])
+            values = arrays[f"{key}_values"]
+            if key == "rotation":
+                values = dequantize_rotations(values)
+            else:
+                values = dequantize_range(offsets, values, arrays[f"{key}_range"], arrays[f"{key}_exact"],
+                                          arrays[f"{key}_exact_values"])
+            channels[key] = (offsets, times, values)
+    else:
+        bone_count = len(header["bones"])
+        channels = {
+            key: (np.zeros(bone_count + 1, dtype=np.uint32), np.empty(0, dtype=np.float32),
+                  np.empty((0, size), dtype=np.float32))
+            for key, size in CHANNELS.items()
+        }
+    return AnimationClip(
+        header["bones"],
+        arrays["parents"],
+        {key: arrays[f"bind_{key}"] for key in CHANNELS},
+        channels,
+        start_frame=header["start_frame"],
+        end_frame=header["end_frame"] if keys else header["start_frame"],
+        fps=header["fps"],
+        armature_world_matrix=header["armature_world_matrix"],
+        name=header.get("name", "")
+    )
+
+
+def decode_clip(buffer):
+    """Decodes a clip; offsets and the rest pose are views over `buffer`."""
+    return clip_from_arrays(*decode_arrays(buffer))
+
+
+def write_clip(path, clip, position_tolerance=POSITION_TOLERANCE, scale_tolerance=SCALE_TOLERANCE):
+    with open(path, "wb") as f:
+        f.write(encode_clip(clip, position_tolerance, scale_tolerance))
+
+
+def read_clip(path):
+    with open(path, "rb") as f:
+        return decode_clip(f.read())
+
+
+def map_clip(path):
+    """
+    Memory-maps a clip file and returns (header, arrays) without reading the
+    key data; pages load on first access and stay mapped while arrays live.
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return decode_arrays(mapped)
+
+
+def _channel_error(kind, expected, actual):
+    """Per-key error: distance for translation/scale, angle in degrees for rotation."""
+    if kind == "rotation":
+        dot = np.abs(np.einsum("ij,ij->i", expected, actual))
+        return np.degrees(2.0 * np.arccos(np.clip(dot, 0.0, 1.0)))
+    return np.linalg.norm(expected - actual, axis=1)
+
+
+def _interpolate(kind, v0, v1, weights):
+    count = len(weights)
+    a = np.repeat(v0[None], count, axis=0)
+    b = np.repeat(v1[None], count, axis=0)
+    if kind == "rotation":
+        return slerp(a, b, weights)
+    return a + (b - a) * weights[:, None]
+
+
+def _reduce_channel(kind, times, values, tolerance):
+    """
+    Indices of the keys to keep so that interpolating between them stays
+    within `tolerance` of every dropped key, plus the largest error left.
+    """
+    if len(times) <= 1:
+        return np.arange(len(times)), 0.0
+
+    # Constant channel: a single key reproduces every sample
+    held = _channel_error(kind, values, np.repeat(values[:1], len(values), axis=0))
+    if held.max() <= tolerance:
+        return np.array([0]), float(held.max())
+
+    kept = [0]
+    max_error = 0.0
+    anchor = 0
+    last_error = 0.0
+    end = 2
+    while end < len(times):
+        inner = np.arange(anchor + 1, end)
+        weights = (times[inner] - times[anchor]) / (times[end] - times[anchor])
+        error = _channel_error(kind, values[inner], _interpolate(kind, values[anchor], values[end], weights)).max()
+        if error > tolerance:
+            # The previous candidate was the furthest valid key
+            kept.append(end - 1)
+            max_error = max(max_error, last_error)
+            anchor = end - 1
+            last_error = 0.0
+        else:
+            last_error = error
+        end += 1
+    kept.append(len(times) - 1)
+    max_error = max(max_error, last_error)
+    return np.array(kept), float(max_error)
+
+
+def reduce_keys(clip, position_tolerance=POSITION_TOLERANCE, rotation_tolerance=ROTATION_TOLERANCE,
+                scale_tolerance=SCALE_TOLERANCE):
+    """
+    Drops keys that linear/slerp interpolation can rebuild within the given
+    tolerances (scene units for translation and scale, degrees for rotation).
+    Constant channels collapse to one key.
+
+    Returns (reduced clip, report), where the report lists key counts, the
+    compression ratio and the largest error introduced per channel, plus the
+    largest armature-space bone displacement over all original key times.
+    Errors are measured on the reduced clip as encode_clip stores it, so they
+    include quantization and can exceed a tolerance by up to that much.
+    """
+    tolerances = {"translation": position_tolerance, "rotation": rotation_tolerance, "scale": scale_tolerance}
+    report = {"keys_before": 0, "keys_after": 0}
+    channels = {}
+    for key in CHANNELS:
+        offsets, times, values = clip.channels[key]
+        new_offsets = [0]
+        new_times = []
+        new_values = []
+        for bone in range(clip.bone_count):
+            start, end = int(offsets[bone]), int(offsets[bone + 1])
+            bone_times = times[start:end].astype(np.float64)
+            bone_values = values[start:end].astype(np.float64)
+            kept, _ = _reduce_channel(key, bone_times, bone_values, tolerances[key])
+            new_times.append(bone_times[kept])
+            new_values.append(bone_values[kept])
+            new_offsets.append(new_offsets[-1] + len(kept))
+
+        channels[key] = (
+            np.array(new_offsets, dtype=np.uint32),
+            np.concatenate(new_times).astype(np.float32) if new_times else np.empty(0, dtype=np.float32),
+            np.concatenate(new_values).astype(np.float32) if new_values else np.empty((0, CHANNELS[key]), dtype=np.float32)
+        )
+        report["keys_before"] += len(times)
+        report["keys_after"] += new_offsets[-1]
+        report[f"max_{key}_error"] = 0.0
+
+    reduced = AnimationClip(
+        clip.bone_names, clip.parents, clip.bind_pose, channels,
+        start_frame=clip.start_frame, end_frame=clip.end_frame,
+        fps=clip.fps, armature_world_matrix=clip.armature_world_matrix, name=clip.name
+    )
+
+    stored = decode_clip(encode_clip(reduced, position_tolerance, scale_tolerance))
+    sample_times = np.unique(np.concatenate([clip.channels[key][1] for key in CHANNELS]))
+    world_error = 0.0
+    for t in sample_times:
+        expected = clip.local_pose(float(t))
+        actual = stored.local_pose(float(t))
+        for key, e, a in zip(CHANNELS, expected, actual):
+            report[f"max_{key}_error"] = max(report[f"max_{key}_error"], float(_channel_error(key, e, a).max()))
+        delta = (clip.forward_kinematics(compose_matrices(*expected))[:, :3, 3]
+                 - stored.forward_kinematics(compose_matrices(*actual))[:, :3, 3])
+        world_error = max(world_error, float(np.linalg.norm(delta, axis=1).max()))
+    report["max_world_error"] = world_error
+    report["ratio"] = report["keys_before"] / max(report["keys_after"], 1)
+    return reduced, report
@@ -0,0 +1,38 @@
+import numpy as np
+
+def frustum_planes(projection):
+    """
+    (6, 4) view-space planes (nx, ny, nz, d) of a column-major projection
+    matrix, normals pointing inwards and normalized: left, right, bottom,
+    top, near, far.
+    """
+    m = np.asarray(projection, dtype=np.float64).reshape(4, 4).T
+    planes = np.array([
+        m[3] + m[0], m[3] - m[0],
+        m[3] + m[1], m[3] - m[1],
+        m[3] + m[2], m[3] - m[2],
+    ])
+    return planes / np.linalg.norm(planes[:, :3], axis=1)[:, None]
+
+def spheres_outside(planes, centers, radii):
+    """(M,) True for spheres entirely behind at least one plane."""
+    distances = centers @ planes[:, :3].T + planes[:, 3]
+    return np.any(distances < -radii[:, None], axis=1)
+
+def boxes_outside(planes, centers, extents):
+    """(M,) True for boxes (center, half extents) entirely behind at least one plane."""
+    distances = centers @ planes[:, :3].T + planes[:, 3]
+    reach = extents @ np.abs(planes[:, :3]).T
+    return np.any(distances < -reach, axis=1)
+
+def transform_bounds(transforms, centers, extents, radii):
+    """
+    Moves mesh-space bounds into view space with (M, 4, 4) row-major transforms.
+    Boxes stay axis-aligned (Arvo's method) and spheres grow with the largest
+    axis scale. Returns (centers, extents, radii) in view space.
+    """
+    linear = transforms[:, :3, :3]
+    view_centers = np.einsum("mij,mj->mi", linear, centers) + transforms[:, :3, 3]
+    view_extents = np.einsum("mij,mj->mi", np.abs(linear), extents)
+    view_radii = radii * np.linalg.norm(linear, axis=1).max(axis=1)
+    return view_centers, view_extents, view_radii
@@ -0,0 +1,111 @@
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+# Unreferenced GPU resources kept around so re-selecting a recently viewed part uploads nothing
+DEFAULT_KEEP_ALIVE_BYTES = 256 * 1024 * 1024
+
+
+def geometry_key(vertices, normals, indices):
+    """Content hash of one mesh's flat float32 vertices/normals and uint32 indices."""
+    digest = hashlib.blake2b(digest_size=16)
+    for array, dtype in ((vertices, np.float32), (normals, np.float32), (indices, np.uint32)):
+        array = np.ascontiguousarray(array, dtype=dtype)
+        digest.update(len(array).to_bytes(8, "little"))
+        digest.update(array.data)
+    return digest.hexdigest()
+
+
+class GeometryRegistry:
+    """
+    Reference-counted, content-keyed GPU resources shared between parts.
+    Entries only need `key`, `nbytes` and `release()` (which frees their
+    buffers, so it runs with the GL context current). An entry whose last
+    reference goes away is kept in an LRU of up to `keep_alive_bytes`
+    before it is released.
+    """
+
+    def __init__(self, keep_alive_bytes=DEFAULT_KEEP_ALIVE_BYTES):
+        self.keep_alive_bytes = keep_alive_bytes
+        self.live = {} # key -> entry
+        self.refs = {} # key -> reference count of live entries
+        self.idle = OrderedDict() # key -> unreferenced entry, least recently used first
+        self.idle_bytes = 0
+
+    def acquire(self, key):
+        """Adds a reference to the entry stored under key; None if there is none."""
+        if key in self.live:
+            self.refs[key] += 1
+            return self.live[key]
+        entry = self.idle.pop(key, None)
+        if entry is None:
+            return None
+        self.idle_bytes -= entry.nbytes
+        self.live[key] = entry
+        self.refs[key] = 1
+        return entry
+
+    def add(self, entry):
+        """
+        Stores a new entry with one reference. If another entry with the same
+        key got there first, that one is referenced instead and `entry` is released.
+        """
+        existing = self.acquire(entry.key)
+        if existing is not None:
+            if existing is not entry:
+                entry.release()
+            return existing
+        self.live[entry.key] = entry
+        self.refs[entry.key] = 1
+        return entry
+
+    def intern(self, key, create):
+        """Acquires the entry under key, adding `create()` if there is none."""
+        entry = self.acquire(key)
+        return entry if entry is not None else self.add(create())
+
+    def release(self, entry):
+        """Drops a reference; unreferenced entries move to the keep-alive LRU."""
+        key = entry.key
+        if self.live.get(key) is not entry:
+            return
+        self.refs[key] -= 1
+        if self.refs[key] > 0:
+            return
+        del self.live[key]
+        del self.refs[key]
+        self.idle[key] = entry
+        self.idle_bytes += entry.nbytes
+        self._evict()
+
+    def _evict(self):
+        while self.idle and self.idle_bytes > self.keep_alive_bytes:
+            _, entry = self.idle.popitem(last=False)
+            self.idle_bytes -= entry.nbytes
+            entry.release()
+
+    def trim(self, keep_alive_bytes=0):
+        """Releases idle entries down to keep_alive_bytes (everything by default)."""
+        limit, self.keep_alive_bytes = self.keep_alive_bytes, keep_alive_bytes
+        self._evict()
+        self.keep_alive_bytes = limit
+
+    def discard_idle(self):
+        """Forgets idle entries without releasing them, for when the GL context is gone."""
+        self.idle.clear()
+        self.idle_bytes = 0
+
+    def entries(self):
+        return list(self.live.values()) + list(self.idle.values())
+
+    def buffer_bytes(self):
+        """GPU memory held by live and kept-alive entries."""
+        return sum(entry.buffer_bytes() for entry in self.entries())
+
+    def stats(self):
+        return {
+            "live": len(self.live),
+            "references": sum(self.refs.values()),
+            "idle": len(self.idle),
+            "idle_bytes": self.idle_bytes,
+        }
@@ -0,0 +1,106 @@
+import numpy as np
+
+# Simplified levels generated per mesh, on top of the full-resolution level 0
+MAX_LOD_LEVELS = 3
+# A level is only kept if it has at most this fraction of the previous level's triangles
+MIN_REDUCTION = 0.7
+# Meshes (or levels) smaller than this are not simplified any further
+MIN_TRIANGLES = 16
+# Default on-screen simplification error tolerated before switching to a finer level
+DEFAULT_PIXEL_ERROR = 1.0
+
+def cluster_mesh(vertices, normals, indices, cell_size):
+    """
+    Vertex-clustering simplification: every vertex snaps to the mean of the
+    vertices sharing its grid cell, and triangles that collapse are dropped.
+    Returns flat (vertices, normals, indices) arrays like MeshObject takes.
+    """
+    positions = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+    vertex_normals = np.asarray(normals, dtype=np.float32).reshape(-1, 3)
+    triangles = np.asarray(indices, dtype=np.int64).reshape(-1, 3)
+
+    cells = np.floor((positions - positions.min(axis=0)) / cell_size).astype(np.int64)
+    dims = cells.max(axis=0) + 1
+    keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+    _, cluster = np.unique(keys, return_inverse=True)
+    cluster = cluster.reshape(-1)
+    cluster_count = int(cluster.max()) + 1
+
+    counts = np.bincount(cluster, minlength=cluster_count).astype(np.float32)
+    new_positions = np.empty((cluster_count, 3), dtype=np.float32)
+    new_normals = np.empty((cluster_count, 3), dtype=np.float32)
+    for axis in range(3):
+        new_positions[:, axis] = np.bincount(cluster, weights=positions[:, axis], minlength=cluster_count) / counts
+        new_normals[:, axis] = np.bincount(cluster, weights=vertex_normals[:, axis], minlength=cluster_count)
+    lengths = np.linalg.norm(new_normals, axis=1)
+    flat = lengths < 1e-8
+    new_normals[~flat] /= lengths[~flat, None]
+    new_normals[flat] = (0.0, 0.0, 1.0)
+
+    # Drop triangles that collapsed to a line or point, then duplicates
+    remapped = cluster[triangles]
+    a, b, c = remapped[:, 0], remapped[:, 1], remapped[:, 2]
+    remapped = remapped[(a != b) & (b != c) & (a != c)]
+    if len(remapped):
+        _, first = np.unique(np.sort(remapped, axis=1), axis=0, return_index=True)
+        remapped = remapped[np.sort(first)]
+
+    # Compact away clusters no surviving triangle uses
+    used, compact = np.unique(remapped, return_inverse=True)
+    return (
+        new_positions[used].reshape(-1),
+        new_normals[used].reshape(-1),
+        compact.reshape(-1).astype(np.uint32),
+    )
+
+def build_lod_chain(vertices, normals, indices, max_levels=MAX_LOD_LEVELS,
+                    min_reduction=MIN_REDUCTION, min_triangles=MIN_TRIANGLES):
+    """
+    Simplified levels of one mesh, finest first. Each level is a dict with
+    vertices, normals, indices and `error`: the largest distance (in mesh
+    units) a vertex may have moved, i.e. the diagonal of a clustering cell.
+    """
+    positions = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+    triangle_count = len(indices) // 3
+    if triangle_count < 2 * min_triangles or len(positions) == 0:
+        return []
+    extent = float((positions.max(axis=0) - positions.min(axis=0)).max())
+    if extent <= 0.0:
+        return []
+
+    # Start with roughly one cell per sqrt(triangles) along the longest axis and coarsen
+    resolution = 2 ** int(np.ceil(np.log2(max(np.sqrt(triangle_count), 2))))
+    levels = []
+    current = (vertices, normals, indices)
+    while len(levels) < max_levels and resolution >= 2:
+        cell_size = extent / resolution
+        resolution //= 2
+        simplified = cluster_mesh(vertices, normals, indices, cell_size)
+        count = len(simplified[2]) // 3
+        if count == 0:
+            break
+        if count > (len(current[2]) // 3) * min_reduction:
+            continue
+        levels.append({
+            "vertices": simplified[0],
+            "normals": simplified[1],
+            "indices": simplified[2],
+            "error": float(cell_size * np.sqrt(3.0)),
+        })
+        current = simplified
+        if count < min_triangles:
+            break
+    return levels
+
+def select_levels(errors, depths, pixel_scale, pixel_error=DEFAULT_PIXEL_ERROR):
+    """
+    Picks the coarsest level per mesh whose simplification error, projected to
+    the screen, stays within `pixel_error` pixels.
+
+    errors: (M, L) view-space error per level, level 0 first (0), inf past the
+    last generated level. depths: (M,) view-space distance of each mesh.
+    pixel_scale: pixels per view-space unit at distance 1.
+    """
+    projected = errors * (pixel_scale / np.maximum(depths, 1e-6))[:, None]
+    # Errors grow with the level, so counting the acceptable levels picks the coarsest
+    return np.count_nonzero(projected[:, 1:] <= pixel_error, axis=1)
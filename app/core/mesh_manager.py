@@ -1,7 +1,18 @@
 from OpenGL.GL import *
+import ctypes
 import numpy as np
-import json
-import os
+from concurrent.futures import ThreadPoolExecutor
+from app.core.palette_renderer import PaletteProgram, PartBatch, InstanceStream
+from app.core.lod import build_lod_chain, select_levels, DEFAULT_PIXEL_ERROR
+from app.core.culling import frustum_planes, spheres_outside, boxes_outside, transform_bounds
+from app.core.upload_queue import UploadQueue, upload_buffer, WAITING
+from app.core.geometry_registry import GeometryRegistry, geometry_key
+
+IDENTITY_4x4 = np.identity(4, dtype=np.float32).reshape(16)
+
+# Interleaved vertex layout: position (3 floats) followed by normal (3 floats)
+VERTEX_STRIDE = 6 * 4
+NORMAL_OFFSET = ctypes.c_void_p(3 * 4)
 
 def transpose_4x4(m):
     return [
@@ -11,71 +22,712 @@ def transpose_4x4(m):
         m[3], m[7], m[11], m[15]
     ]
 
-class MeshObject:
-    def __init__(self, name, vertices, normals, indices):
-        self.name = name
-        self.vertices = np.array(vertices, dtype=np.float32)
-        self.normals = np.array(normals, dtype=np.float32)
-        self.indices = np.array(indices, dtype=np.uint32)
-        self.visible = True
-        self.parent_bone = ""
-        self.color = (0.7, 0.7, 0.7)
+class PackedMesh:
+    """
+    Contiguous, upload-ready arrays of one mesh plus its bounds and content
+    hash. Built in the worker threads that produce FBXData (see
+    pack_fbx_data), so the UI thread never converts or hashes geometry.
+    """
 
-    def draw(self):
-        if not self.visible or len(self.indices) == 0:
+    def __init__(self, vertices, normals, indices):
+        self.vertices = np.ascontiguousarray(vertices, dtype=np.float32).reshape(-1)
+        self.normals = np.ascontiguousarray(normals, dtype=np.float32).reshape(-1)
+        self.indices = np.ascontiguousarray(indices, dtype=np.uint32).reshape(-1)
+        self.key = geometry_key(self.vertices, self.normals, self.indices)
+        positions = self.vertices.reshape(-1, 3)
+        self.interleaved = np.empty((len(positions), 6), dtype=np.float32)
+        self.interleaved[:, 0:3] = positions
+        self.interleaved[:, 3:6] = self.normals.reshape(-1, 3)
+        self.nbytes = self.interleaved.nbytes + self.indices.nbytes
+
+        # Mesh-space bounds; LOD levels stay inside them, so they are shared
+        if len(positions):
+            self.bounds_min = positions.min(axis=0)
+            self.bounds_max = positions.max(axis=0)
+        else:
+            self.bounds_min = self.bounds_max = np.zeros(3, dtype=np.float32)
+        self.center = (self.bounds_min + self.bounds_max) * 0.5
+        self.radius = float(np.linalg.norm(positions - self.center, axis=1).max()) if len(positions) else 0.0
+
+def pack_fbx_data(fbx_data):
+    """
+    Adds a "packed" PackedMesh to every mesh dict of fbx_data that carries
+    geometry. Run it in the worker thread that produced fbx_data; it is a
+    no-op for meshes that are already packed.
+    """
+    for mesh in fbx_data.meshes:
+        if "packed" not in mesh and "vertices" in mesh:
+            mesh["packed"] = PackedMesh(mesh["vertices"], mesh["normals"], mesh["indices"])
+    return fbx_data
+
+class SharedGeometry:
+    """
+    GPU buffers of one unique mesh and its LOD levels. MeshManager shares a
+    single instance between all meshes with the same content through its
+    GeometryRegistry; a standalone MeshObject gets its own.
+    """
+
+    def __init__(self, packed):
+        self.packed = packed
+        self.key = packed.key
+        self.vertices = packed.vertices
+        self.normals = packed.normals
+        self.indices = packed.indices
+        self.index_count = len(self.indices)
+        self.vbo = None
+        self.ibo = None
+        self.uploading = False # A staged upload is filling the buffers
+        self.lods = [] # Simplified SharedGeometry, finest first
+        self.lod_errors = None # Geometric error per simplified level; None until the chain is built
+
+    @property
+    def nbytes(self):
+        return self.packed.nbytes + sum(lod.nbytes for lod in self.lods)
+
+    def set_lods(self, lods, errors):
+        self.lods = list(lods)
+        self.lod_errors = list(errors)
+
+    def upload(self):
+        """Uploads geometry to GPU buffers. Needs a current GL context."""
+        if self.vbo is not None or self.index_count == 0:
+            return
+        self.vbo, self.ibo = (int(b) for b in glGenBuffers(2))
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, self.packed.interleaved, GL_STATIC_DRAW)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, self.indices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+    def upload_staged(self):
+        """
+        Generator version of upload() for an UploadQueue; buffers are only set
+        once complete. Waits instead of uploading twice if another task is
+        already filling this geometry.
+        """
+        while self.uploading:
+            yield WAITING
+        if self.vbo is not None or self.index_count == 0:
             return
+        self.uploading = True
+        try:
+            vbo = yield from upload_buffer(GL_ARRAY_BUFFER, self.packed.interleaved)
+            try:
+                ibo = yield from upload_buffer(GL_ELEMENT_ARRAY_BUFFER, self.indices)
+            except GeneratorExit:
+                glDeleteBuffers(1, [vbo])
+                raise
+            self.vbo, self.ibo = vbo, ibo
+        finally:
+            self.uploading = False
 
+    def forget_buffers(self):
+        """Drops buffer ids without freeing them, for when the GL context is gone."""
+        self.vbo = self.ibo = None
+        self.uploading = False
+        for lod in self.lods:
+            lod.forget_buffers()
+
+    def release(self):
+        """Frees the GPU buffers, including LOD levels. Needs a current GL context."""
+        if self.vbo is not None:
+            glDeleteBuffers(2, [self.vbo, self.ibo])
+            self.vbo = self.ibo = None
+        for lod in self.lods:
+            lod.release()
+
+    def buffer_bytes(self):
+        """GPU memory held by this geometry's buffers, including LOD levels."""
+        own = self.packed.nbytes if self.vbo is not None else 0
+        return own + sum(lod.buffer_bytes() for lod in self.lods)
+
+    def draw_buffers(self, color):
+        if self.index_count == 0:
+            return 0
+        if self.vbo is None:
+            self.upload()
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
         glEnableClientState(GL_VERTEX_ARRAY)
         glEnableClientState(GL_NORMAL_ARRAY)
         
-        glVertexPointer(3, GL_FLOAT, 0, self.vertices)
-        glNormalPointer(GL_FLOAT, 0, self.normals)
+        glVertexPointer(3, GL_FLOAT, VERTEX_STRIDE, None)
+        glNormalPointer(GL_FLOAT, VERTEX_STRIDE, NORMAL_OFFSET)
         
-        glColor3f(*self.color)
-        glDrawElements(GL_TRIANGLES, len(self.indices), GL_UNSIGNED_INT, self.indices)
+        glColor3f(*color)
+        glDrawElements(GL_TRIANGLES, self.index_count, GL_UNSIGNED_INT, None)
         
         glDisableClientState(GL_NORMAL_ARRAY)
         glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        return self.index_count // 3
+
+class MeshObject:
+    """One placed mesh: its SharedGeometry plus per-instance bone, color and draw state."""
+
+    def __init__(self, name, vertices=None, normals=None, indices=None, packed=None, geometry=None):
+        self.name = name
+        self.geometry = geometry or SharedGeometry(packed or PackedMesh(vertices, normals, indices))
+        packed = self.geometry.packed
+        self.vertices = packed.vertices
+        self.normals = packed.normals
+        self.indices = packed.indices
+        self.bounds_min = packed.bounds_min
+        self.bounds_max = packed.bounds_max
+        self.center = packed.center
+        self.radius = packed.radius
+        self.index_count = len(self.indices)
+        self.visible = True
+        self.parent_bone = ""
+        self.bone_index = -1 # Index into MeshManager.bone_names, -1 if unposed
+        self.color = (0.7, 0.7, 0.7)
+        self.lod_level = 0 # Level drawn this frame
+        self.culled = False # Outside the view frustum this frame
+
+    @property
+    def key(self):
+        return self.geometry.key
+
+    @property
+    def lods(self):
+        """Simplified levels (finest first), shared by every mesh with this geometry."""
+        return self.geometry.lods
+
+    @property
+    def lod_errors(self):
+        """Geometric error per level in mesh units, level 0 first."""
+        return [0.0] + (self.geometry.lod_errors or [])
+
+    def set_lods(self, lods, errors):
+        """Attaches simplified levels (finest first) and their geometric errors."""
+        self.geometry.set_lods(lods, errors)
+        self.lod_level = min(self.lod_level, len(self.lods))
+
+    def level_geometry(self):
+        """The geometry holding the buffers of the current LOD level."""
+        return self.lods[self.lod_level - 1] if self.lod_level else self.geometry
+
+    def interleaved(self):
+        """Returns an (N, 6) float32 array of position + normal per vertex."""
+        return self.geometry.packed.interleaved
+
+    def release(self):
+        """Frees the buffers of a standalone mesh; MeshManager releases shared ones through its registry."""
+        self.geometry.release()
+
+    def draw(self):
+        """Returns the number of triangles submitted."""
+        if not self.visible or self.culled:
+            return 0
+        return self.level_geometry().draw_buffers(self.color)
+
+def build_lod_levels(geometry):
+    """Worker-thread job: (PackedMesh levels, errors) per (vertices, normals, indices)."""
+    chains = []
+    for vertices, normals, indices in geometry:
+        levels = build_lod_chain(vertices, normals, indices)
+        chains.append((
+            [PackedMesh(l["vertices"], l["normals"], l["indices"]) for l in levels],
+            [l["error"] for l in levels],
+        ))
+    return chains
+
+def unique_geometry(meshes):
+    """The distinct SharedGeometry of meshes, in first-use order."""
+    return list({id(mesh.geometry): mesh.geometry for mesh in meshes}.values())
 
 class MeshManager:
     """Manages 3D meshes for the viewport."""
-    def __init__(self):
+    def __init__(self, use_shaders=True):
         self.parts = {} # category -> list of MeshObject
-        self.current_pose = {} # bone_name -> 16 floats (column-major)
+        self.bone_names = [] # Skeleton of the current pose source
+        self.bone_index = {} # bone name -> index into bone_names, resolved once per mesh
+        self.pose_matrices = np.empty((0, 16), dtype=np.float32) # (B, 16) column-major, per bone
+        self.gl_ready = False # Set by the viewport once its GL context exists
+
+        # Identical geometry (and identical batches) share one set of buffers, found by content hash
+        self.registry = GeometryRegistry()
+
+        # Matrix-palette renderer; None means the fixed-function path is used
+        self.use_shaders = use_shaders
+        self.program = None
+        self.batches = {} # category -> PartBatch of the meshes that are not instanced
+        self.instanced = {} # category -> meshes drawn by instance, their geometry repeats within the part
+        self.instance_stream = InstanceStream()
+        self.palette_bones = [None] # slot -> bone name, slot 0 is the identity
+        self.bone_slots = {} # bone name -> slot
+        self.slot_bone_index = np.array([-1]) # slot -> bone index, -1 keeps the identity
+
+        # Uploads are staged over frames; a part replaces the old one once fully uploaded
+        self.uploads = UploadQueue()
+        self.pending_parts = {} # category -> list of MeshObject still uploading
+
+        # Level of detail: chains are simplified off the UI thread, picked per frame
+        self.executor = None # Background CPU work: LOD chains and batch packing
+        self.lod_jobs = {} # category -> (meshes, geometries, Future of their LOD chains)
+        self.forced_lod = None # Level to draw everywhere instead of the automatic pick
+        self.pixel_error = DEFAULT_PIXEL_ERROR
+        self.lod_stats = {"meshes": 0, "pending": 0, "levels": [], "triangles": 0, "full_triangles": 0}
+        self.cull_stats = {"drawn": 0, "culled": 0}
+        self.draw_stats = {"draw_calls": 0, "triangles": 0} # Submitted by the last draw_all
+        self._lod_table = None # Cached per-mesh arrays for prepare_frame
+
+    def initialize_gl(self):
+        """Called with the GL context current; uploads anything added before it existed."""
+        self.gl_ready = True
+        if self.use_shaders:
+            try:
+                self.program = PaletteProgram()
+            except Exception as e:
+                print(f"Shader renderer unavailable, using fixed-function path: {e}")
+                self.program = None
+
+        # A re-created context (e.g. after reparenting) has lost the old buffers and
+        # half-finished uploads; parts still uploading are installed right away instead
+        self.uploads.discard()
+        self.registry.discard_idle()
+        for entry in self.registry.entries():
+            entry.forget_buffers()
+        self.instance_stream.forget_buffers()
+        for category, meshes in self.pending_parts.items():
+            self._release_part(category)
+            self.parts[category] = meshes
+        self.pending_parts.clear()
+        self._lod_table = None
+
+        for category in self.parts:
+            self._upload_part(category)
+
+    def _assign_slots(self, meshes):
+        for mesh in meshes:
+            if mesh.parent_bone and mesh.parent_bone not in self.bone_slots:
+                self.bone_slots[mesh.parent_bone] = len(self.palette_bones)
+                self.palette_bones.append(mesh.parent_bone)
+        self._update_slot_indices()
+
+    def _update_slot_indices(self):
+        self.slot_bone_index = np.array(
+            [-1] + [self.bone_index.get(bone, -1) for bone in self.palette_bones[1:]], dtype=np.int64
+        )
+
+    def _split_instanced(self, meshes):
+        """(batched, instanced) meshes: geometry used more than once in a part is drawn by instance."""
+        if self.program is None or not self.program.instancing:
+            return list(meshes), []
+        uses = {}
+        for mesh in meshes:
+            uses[id(mesh.geometry)] = uses.get(id(mesh.geometry), 0) + 1
+        batched = [mesh for mesh in meshes if uses[id(mesh.geometry)] == 1]
+        instanced = [mesh for mesh in meshes if uses[id(mesh.geometry)] > 1]
+        return batched, instanced
+
+    def _upload_part(self, category):
+        """Uploads a part in one go, for parts added before the GL context existed."""
+        meshes = self.parts[category]
+        old = self.batches.pop(category, None)
+        slots = self._batch_slots(meshes) if self.program is not None else None
+        if slots is None:
+            for geometry in unique_geometry(meshes):
+                geometry.upload()
+        else:
+            batched, instanced = self._split_instanced(meshes)
+            for geometry in unique_geometry(instanced):
+                geometry.upload()
+            key = PartBatch.cache_key(category, batched, slots)
+            batch = self.registry.intern(key, lambda: PartBatch(batched, slots, category=category))
+            batch.upload()
+            batch.meshes = batched
+            self.batches[category] = batch
+            self.instanced[category] = instanced
+        if old:
+            self.registry.release(old)
+
+    def _submit(self, work, *args, **kwargs):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="mesh-prep")
+        return self.executor.submit(work, *args, **kwargs)
+
+    def _batch_slots(self, meshes):
+        """Palette slots for meshes, or None if the palette overflowed and shaders were disabled."""
+        self._assign_slots(meshes)
+        if len(self.palette_bones) > self.program.palette_size:
+            print(f"Bone palette exceeds {self.program.palette_size} slots, using fixed-function path")
+            self._disable_shaders()
+            return None
+        return dict(self.bone_slots)
+
+    def _stage_batch(self, category, meshes, lods=None):
+        """
+        Uploads what the shader path needs for meshes in steps: the shared
+        geometry of instanced meshes, then the batch of the rest, packed off
+        the UI thread unless the registry already holds an identical one.
+        Returns (batch, instanced meshes) holding a batch reference, or None
+        without shaders.
+        """
+        slots = self._batch_slots(meshes) if self.program is not None else None
+        if slots is None:
+            return None
+        # Snapshot the levels: a part sharing this geometry may attach a chain meanwhile
+        if lods is None:
+            lods = [list(mesh.lods) for mesh in meshes]
+        levels = {id(mesh.geometry): mesh_lods for mesh, mesh_lods in zip(meshes, lods)}
+        batched, instanced = self._split_instanced(meshes)
+        for geometry in unique_geometry(instanced):
+            for level in [geometry] + levels[id(geometry)]:
+                yield from level.upload_staged()
+
+        batched_lods = [levels[id(mesh.geometry)] for mesh in batched]
+        key = PartBatch.cache_key(category, batched, slots, batched_lods)
+        batch = self.registry.acquire(key)
+        if batch is None:
+            future = self._submit(PartBatch, batched, slots, batched_lods, category=category)
+            while not future.done():
+                yield WAITING
+            batch = future.result()
+            yield from batch.upload_staged()
+            batch = self.registry.add(batch)
+        if self.program is None:
+            # Another part overflowed the palette meanwhile
+            self.registry.release(batch)
+            return None
+        batch.meshes = batched
+        return batch, instanced
+
+    def _part_upload_task(self, category, meshes):
+        """Uploads a new part step by step, then swaps it in for the old one."""
+        # Cancelling releases the meshes' geometry in _cancel_pending
+        staged = yield from self._stage_batch(category, meshes)
+        if staged is None:
+            for geometry in unique_geometry(meshes):
+                for level in [geometry] + geometry.lods:
+                    yield from level.upload_staged()
+
+        self.pending_parts.pop(category, None)
+        self._release_part(category)
+        self.parts[category] = meshes
+        if staged is not None:
+            self.batches[category], self.instanced[category] = staged
+        self._lod_table = None
+
+    def _lod_upload_task(self, category, meshes, chains):
+        """Uploads finished LOD levels step by step, then lets selection use them."""
+        levels = {id(geometry): new_levels for geometry, (new_levels, _) in chains.items()}
+        lods = [levels.get(id(mesh.geometry), mesh.lods) for mesh in meshes]
+        try:
+            staged = yield from self._stage_batch(category, meshes, lods)
+            if staged is None:
+                for new_levels, _ in chains.values():
+                    for level in new_levels:
+                        yield from level.upload_staged()
+        except GeneratorExit:
+            for new_levels, _ in chains.values():
+                for level in new_levels:
+                    level.release()
+            raise
+
+        for geometry, (new_levels, errors) in chains.items():
+            if geometry.lod_errors is None:
+                geometry.set_lods(new_levels, errors)
+            else:
+                # Another part with this geometry attached its chain first
+                for level in new_levels:
+                    level.release()
+        if staged is not None:
+            old = self.batches.pop(category, None)
+            self.batches[category], self.instanced[category] = staged
+            if old:
+                self.registry.release(old)
+        self._lod_table = None
+
+    def process_uploads(self, budget_ms=None):
+        """Runs staged uploads for this frame. Needs the GL context current."""
+        self.collect_lods()
+        self.uploads.run(budget_ms)
+
+    def has_pending_work(self):
+        """True while parts or LOD levels are still being prepared or uploaded."""
+        return bool(len(self.uploads) or self.lod_jobs)
+
+    def _disable_shaders(self):
+        for batch in self.batches.values():
+            self.registry.release(batch)
+        self.batches.clear()
+        self.instanced.clear()
+        self.program.release()
+        self.program = None
+
+    def set_skeleton(self, bone_names):
+        """Sets the bone order of upcoming poses and re-resolves every mesh's bone index."""
+        bone_names = list(bone_names)
+        if bone_names == self.bone_names:
+            return
+        self.bone_names = bone_names
+        self.bone_index = {name: i for i, name in enumerate(bone_names)}
+        self.pose_matrices = np.tile(IDENTITY_4x4, (len(bone_names), 1))
+        for meshes in list(self.parts.values()) + list(self.pending_parts.values()):
+            for mesh in meshes:
+                mesh.bone_index = self.bone_index.get(mesh.parent_bone, -1)
+        self._update_slot_indices()
+        self._lod_table = None
+
+    def set_pose_matrices(self, matrices):
+        """Updates the current bone transforms from a (B, 16) column-major array in skeleton order."""
+        self.pose_matrices = matrices
 
     def set_pose(self, pose_data):
-        """Updates the current bone transforms for animation."""
-        self.current_pose = pose_data
+        """Updates the current bone transforms from a bone name -> 16 floats (column-major) mapping."""
+        self.set_skeleton(pose_data.keys())
+        self.set_pose_matrices(np.asarray(list(pose_data.values()), dtype=np.float32).reshape(-1, 16))
+
+    def build_palette(self):
+        """(S, 16) column-major matrices for every palette slot from the current pose."""
+        palette = np.empty((len(self.palette_bones), 16), dtype=np.float32)
+        palette[:] = IDENTITY_4x4
+        posed = self.slot_bone_index >= 0
+        palette[posed] = self.pose_matrices[self.slot_bone_index[posed]]
+        return palette
 
     def add_part_meshes(self, category, meshes_data):
-        """Adds meshes extracted from an FBX to a specific category."""
+        """
+        Adds meshes extracted from an FBX to a specific category. Once the GL
+        context exists the part is uploaded over the next frames and replaces
+        the category's current meshes when complete. Mesh dicts packed by
+        pack_fbx_data are used as-is; others are packed here. Geometry that is
+        already resident (another mesh, or a recently shown part version) is
+        shared instead of uploaded again.
+        """
         mesh_objs = []
         for m in meshes_data:
-            obj = MeshObject(
-                m["name"], 
-                m["vertices"], 
-                m["normals"], 
-                m["indices"]
-            )
+            packed = m.get("packed") or PackedMesh(m["vertices"], m["normals"], m["indices"])
+            geometry = self.registry.intern(packed.key, lambda: SharedGeometry(packed))
+            obj = MeshObject(m["name"], geometry=geometry)
             obj.parent_bone = m.get("parent_bone", "")
+            obj.bone_index = self.bone_index.get(obj.parent_bone, -1)
             mesh_objs.append(obj)
         
-        self.parts[category] = mesh_objs
+        self._cancel_pending(category)
+        if self.gl_ready:
+            self.pending_parts[category] = mesh_objs
+            self.uploads.submit(("part", category), self._part_upload_task(category, mesh_objs))
+        else:
+            self._release_part(category)
+            self.parts[category] = mesh_objs
+            self._lod_table = None
+        self._start_lod_job(category, mesh_objs)
 
     def clear_part(self, category):
+        self._cancel_pending(category)
+        self._release_part(category)
+        self._lod_table = None
+
+    def _release_meshes(self, meshes):
+        for mesh in meshes:
+            self.registry.release(mesh.geometry)
+
+    def _release_part(self, category):
         if category in self.parts:
-            del self.parts[category]
+            self._release_meshes(self.parts.pop(category))
+        batch = self.batches.pop(category, None)
+        if batch:
+            self.registry.release(batch)
+        self.instanced.pop(category, None)
+
+    def _cancel_pending(self, category):
+        self.uploads.cancel(("part", category))
+        self.uploads.cancel(("lods", category))
+        pending = self.pending_parts.pop(category, None)
+        if pending:
+            self._release_meshes(pending)
+        job = self.lod_jobs.pop(category, None)
+        if job:
+            job[2].cancel()
+
+    def _start_lod_job(self, category, meshes):
+        """Simplifies the geometry of meshes that has no LOD chain yet, off the UI thread."""
+        geometries = [geometry for geometry in unique_geometry(meshes) if geometry.lod_errors is None]
+        if not geometries:
+            return
+        work = [(geometry.vertices, geometry.normals, geometry.indices) for geometry in geometries]
+        self.lod_jobs[category] = (meshes, geometries, self._submit(build_lod_levels, work))
+
+    def lods_ready(self):
+        """True if a background LOD job has finished and is waiting for collect_lods."""
+        return any(
+            future.done() and self.pending_parts.get(category) is not meshes
+            for category, (meshes, _, future) in self.lod_jobs.items()
+        )
+
+    def collect_lods(self):
+        """Hands finished LOD chains of installed parts to the upload queue (or attaches them without GL)."""
+        for category, (meshes, geometries, future) in list(self.lod_jobs.items()):
+            if not future.done() or self.pending_parts.get(category) is meshes:
+                continue # Still simplifying, or waiting for the part itself to finish uploading
+            del self.lod_jobs[category]
+            if future.cancelled() or self.parts.get(category) is not meshes:
+                continue
+            try:
+                results = future.result()
+            except Exception as e:
+                print(f"DEBUG: LOD generation failed for {category}: {e}")
+                continue
+            chains = {
+                geometry: ([SharedGeometry(packed) for packed in levels], errors)
+                for geometry, (levels, errors) in zip(geometries, results)
+                if geometry.lod_errors is None
+            }
+            # Even without new chains (another part attached them first) the batch is rebuilt with the levels
+            if self.gl_ready:
+                self.uploads.submit(("lods", category), self._lod_upload_task(category, meshes, chains))
+            else:
+                for geometry, (levels, errors) in chains.items():
+                    geometry.set_lods(levels, errors)
+                self._lod_table = None
+
+    def _build_lod_table(self):
+        meshes = [mesh for part in self.parts.values() for mesh in part]
+        level_count = max((len(mesh.lod_errors) for mesh in meshes), default=1)
+        errors = np.full((len(meshes), level_count), np.inf, dtype=np.float32)
+        triangles = np.zeros((len(meshes), level_count), dtype=np.int64)
+        for i, mesh in enumerate(meshes):
+            errors[i, :len(mesh.lod_errors)] = mesh.lod_errors
+            triangles[i, :len(mesh.lod_errors)] = [level.index_count // 3 for level in [mesh] + mesh.lods]
+        return {
+            "meshes": meshes,
+            "centers": np.array([mesh.center for mesh in meshes], dtype=np.float32).reshape(-1, 3),
+            "extents": np.array([(mesh.bounds_max - mesh.bounds_min) * 0.5 for mesh in meshes], dtype=np.float32).reshape(-1, 3),
+            "radii": np.array([mesh.radius for mesh in meshes], dtype=np.float32),
+            "bone_index": np.array([mesh.bone_index for mesh in meshes], dtype=np.int64),
+            "errors": errors,
+            "triangles": triangles,
+        }
+
+    def mesh_transforms(self, modelview, bone_index):
+        """(M, 4, 4) row-major mesh-to-view matrices for column-major `modelview` and pose."""
+        view = np.asarray(modelview, dtype=np.float32).reshape(4, 4).T
+        transforms = np.broadcast_to(view, (len(bone_index), 4, 4)).copy()
+        posed = bone_index >= 0
+        if posed.any() and len(self.pose_matrices):
+            bones = self.pose_matrices[bone_index[posed]].reshape(-1, 4, 4).transpose(0, 2, 1)
+            transforms[posed] = view @ bones
+        return transforms
+
+    def prepare_frame(self, modelview, projection, pixel_scale):
+        """
+        Culls meshes against the view frustum and picks each one's LOD level,
+        with every mesh's bounds moved by the current pose in one step.
+        `modelview` and `projection` are the column-major matrices the meshes
+        are drawn with (no culling without a projection) and `pixel_scale` the
+        viewport's pixels per view-space unit at distance 1.
+        """
+        self.collect_lods()
+        if self._lod_table is None:
+            self._lod_table = self._build_lod_table()
+        table = self._lod_table
+        meshes = table["meshes"]
+        if not meshes:
+            self.lod_stats = {"meshes": 0, "pending": len(self.lod_jobs), "levels": [], "triangles": 0, "full_triangles": 0}
+            self.cull_stats = {"drawn": 0, "culled": 0}
+            return
+
+        transforms = self.mesh_transforms(modelview, table["bone_index"])
+        centers, extents, radii = transform_bounds(transforms, table["centers"], table["extents"], table["radii"])
+
+        if projection is not None:
+            planes = frustum_planes(projection)
+            culled = spheres_outside(planes, centers, radii) | boxes_outside(planes, centers, extents)
+        else:
+            culled = np.zeros(len(meshes), dtype=bool)
+
+        max_level = table["errors"].shape[1] - 1
+        if self.forced_lod is not None:
+            available = np.isfinite(table["errors"]).sum(axis=1) - 1
+            levels = np.minimum(self.forced_lod, available)
+        else:
+            # Errors scale like the bounding spheres: with the largest axis scale
+            scale = radii / np.maximum(table["radii"], 1e-12)
+            scale[table["radii"] <= 0] = 1.0
+            levels = select_levels(table["errors"] * scale[:, None], -centers[:, 2], pixel_scale, self.pixel_error)
+
+        for mesh, level, outside in zip(meshes, levels.tolist(), culled.tolist()):
+            mesh.lod_level = level
+            mesh.culled = outside
+
+        visible = np.array([mesh.visible for mesh in meshes])
+        drawn = visible & ~culled
+        triangles = table["triangles"][np.arange(len(meshes)), levels]
+        self.cull_stats = {"drawn": int(drawn.sum()), "culled": int((visible & culled).sum())}
+        self.lod_stats = {
+            "meshes": len(meshes),
+            "pending": len(self.lod_jobs),
+            "levels": np.bincount(levels[drawn], minlength=max_level + 1).tolist(),
+            "triangles": int(triangles[drawn].sum()),
+            "full_triangles": int(table["triangles"][visible, 0].sum()),
+        }
+
+    def buffer_bytes(self):
+        """GPU memory held by vertex and index buffers, including kept-alive ones."""
+        return self.registry.buffer_bytes()
+
+    def geometry_stats(self):
+        """How much of the scene's geometry is shared: meshes, unique geometries, instanced meshes."""
+        meshes = [mesh for part in self.parts.values() for mesh in part]
+        registry = self.registry.stats()
+        return {
+            "meshes": len(meshes),
+            "unique": len(unique_geometry(meshes)),
+            "instanced": sum(len(part) for part in self.instanced.values()),
+            "cached": registry["idle"],
+        }
 
     def draw_all(self):
+        if self.program is not None:
+            self.draw_batched()
+            return
+
+        draw_calls = triangles = 0
+        pose = self.pose_matrices
         for category, meshes in self.parts.items():
             for mesh in meshes:
+                if not mesh.visible or mesh.culled:
+                    continue
                 glPushMatrix()
                 
-                # Apply Stitching Transform (Armature-space matrix)
-                if mesh.parent_bone in self.current_pose:
-                    mat = self.current_pose[mesh.parent_bone]
-                    # We already flattened to column-major in extraction script
-                    glMultMatrixf(mat)
+                # Apply Stitching Transform (Armature-space matrix, column-major)
+                if mesh.bone_index >= 0:
+                    glMultMatrixf(pose[mesh.bone_index])
                 
-                mesh.draw()
+                drawn = mesh.draw()
+                draw_calls += drawn > 0
+                triangles += drawn
                 glPopMatrix()
+        self.draw_stats = {"draw_calls": draw_calls, "triangles": triangles}
+
+    def instance_groups(self):
+        """(geometry, color, palette slots) per shared geometry level and color among instanced meshes."""
+        groups = {}
+        for meshes in self.instanced.values():
+            for mesh in meshes:
+                if not mesh.visible or mesh.culled:
+                    continue
+                level = mesh.level_geometry()
+                group = groups.setdefault((id(level), mesh.color), (level, mesh.color, []))
+                group[2].append(self.bone_slots.get(mesh.parent_bone, 0))
+        return list(groups.values())
+
+    def draw_batched(self):
+        """One palette upload per frame, one draw per category and color, one instanced draw per repeated geometry."""
+        draw_calls = triangles = 0
+        self.program.begin(self.build_palette())
+        for batch in self.batches.values():
+            calls, count = batch.draw(self.program)
+            draw_calls += calls
+            triangles += count
+        calls, count = self.instance_stream.draw(self.program, self.instance_groups())
+        self.program.end()
+        draw_calls += calls
+        triangles += count
+        self.draw_stats = {"draw_calls": draw_calls, "triangles": triangles}
@@ -0,0 +1,57 @@
+import json
+import mmap
+import struct
+import numpy as np
+
+# Binary payload written by scripts/blender_extract_validate.py --out <path>.
+# Layout (all little-endian):
+#   "MLPX" | uint32 version | uint32 header_len | JSON header | raw buffers
+# The JSON header carries the FBX metadata; each mesh lists its buffers as
+# {"offset", "count", "dtype"} relative to the start of the buffer section.
+# Header and buffers are padded to PAYLOAD_ALIGN bytes.
+PAYLOAD_MAGIC = b"MLPX"
+PAYLOAD_VERSION = 1
+PAYLOAD_ALIGN = 16
+PREAMBLE = struct.Struct("<4sII")
+
+
+def decode_payload(buffer):
+    """
+    Decodes a payload into the same dict shape the JSON extractor returns,
+    with mesh geometry as read-only NumPy views over `buffer` (no copies).
+    """
+    magic, version, header_len = PREAMBLE.unpack_from(buffer, 0)
+    if magic != PAYLOAD_MAGIC:
+        raise ValueError("Not a MechaLaunchPad mesh payload")
+    if version != PAYLOAD_VERSION:
+        raise ValueError(f"Unsupported mesh payload version {version}")
+
+    header_start = PREAMBLE.size
+    data_start = header_start + header_len
+    header = json.loads(bytes(buffer[header_start:data_start]).decode("utf-8"))
+
+    for mesh in header.get("meshes", []):
+        for key, info in mesh.pop("buffers", {}).items():
+            mesh[key] = np.frombuffer(
+                buffer,
+                dtype=np.dtype(info["dtype"]),
+                count=info["count"],
+                offset=data_start + info["offset"]
+            )
+    return header
+
+
+def read_payload(path):
+    """Reads a payload file in one go and decodes it."""
+    with open(path, "rb") as f:
+        return decode_payload(f.read())
+
+
+def map_payload(path):
+    """
+    Memory-maps a payload file and decodes it. Geometry arrays page in from
+    disk on demand and keep the mapping alive for as long as they are used.
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return decode_payload(mapped)
@@ -0,0 +1,289 @@
+from OpenGL.GL import *
+import ctypes
+import hashlib
+import numpy as np
+from app.core.upload_queue import upload_buffer
+
+# Batched vertex layout: position (3 floats), normal (3 floats), palette slot (1 float)
+BATCH_STRIDE = 7 * 4
+NORMAL_OFFSET = ctypes.c_void_p(3 * 4)
+BONE_OFFSET = ctypes.c_void_p(6 * 4)
+# Layout of shared single-mesh buffers (SharedGeometry): position, normal
+GEOMETRY_STRIDE = 6 * 4
+
+ATTR_POSITION = 0
+ATTR_NORMAL = 1
+ATTR_BONE = 2
+
+# Uniform components reserved for everything that isn't the palette
+RESERVED_UNIFORM_COMPONENTS = 64
+MAX_PALETTE_SIZE = 128
+
+VERTEX_SHADER = """
+#version 120
+attribute vec3 a_position;
+attribute vec3 a_normal;
+attribute float a_bone;
+uniform mat4 u_palette[PALETTE_SIZE];
+varying vec3 v_normal;
+
+void main() {
+    mat4 bone = u_palette[int(a_bone + 0.5)];
+    gl_Position = gl_ModelViewProjectionMatrix * (bone * vec4(a_position, 1.0));
+    v_normal = gl_NormalMatrix * (mat3(bone[0].xyz, bone[1].xyz, bone[2].xyz) * a_normal);
+}
+"""
+
+# Matches the fixed-function setup in ModularViewport.initializeGL:
+# GL_LIGHT0 directional light with GL_COLOR_MATERIAL driving ambient + diffuse.
+FRAGMENT_SHADER = """
+#version 120
+uniform vec3 u_color;
+varying vec3 v_normal;
+
+void main() {
+    vec3 n = normalize(v_normal);
+    vec3 l = normalize(gl_LightSource[0].position.xyz);
+    float diffuse = max(dot(n, l), 0.0);
+    vec3 light = gl_LightModel.ambient.rgb + gl_LightSource[0].ambient.rgb
+               + gl_LightSource[0].diffuse.rgb * diffuse;
+    gl_FragColor = vec4(u_color * light, 1.0);
+}
+"""
+
+
+def _compile_shader(source, shader_type):
+    shader = glCreateShader(shader_type)
+    glShaderSource(shader, source)
+    glCompileShader(shader)
+    if not glGetShaderiv(shader, GL_COMPILE_STATUS):
+        log = glGetShaderInfoLog(shader)
+        glDeleteShader(shader)
+        raise RuntimeError(f"Shader compile failed: {log}")
+    return shader
+
+
+class PaletteProgram:
+    """
+    Linked skinning shader. Every vertex carries a palette slot and is
+    transformed by u_palette[slot]; slot 0 is always the identity.
+    """
+
+    def __init__(self):
+        max_components = glGetIntegerv(GL_MAX_VERTEX_UNIFORM_COMPONENTS)
+        self.palette_size = min(MAX_PALETTE_SIZE, (int(max_components) - RESERVED_UNIFORM_COMPONENTS) // 16)
+        if self.palette_size < 2:
+            raise RuntimeError("Not enough vertex uniforms for a bone palette")
+
+        vertex = _compile_shader(VERTEX_SHADER.replace("PALETTE_SIZE", str(self.palette_size)), GL_VERTEX_SHADER)
+        fragment = _compile_shader(FRAGMENT_SHADER, GL_FRAGMENT_SHADER)
+        self.program = glCreateProgram()
+        glAttachShader(self.program, vertex)
+        glAttachShader(self.program, fragment)
+        glBindAttribLocation(self.program, ATTR_POSITION, "a_position")
+        glBindAttribLocation(self.program, ATTR_NORMAL, "a_normal")
+        glBindAttribLocation(self.program, ATTR_BONE, "a_bone")
+        glLinkProgram(self.program)
+        glDeleteShader(vertex)
+        glDeleteShader(fragment)
+        if not glGetProgramiv(self.program, GL_LINK_STATUS):
+            log = glGetProgramInfoLog(self.program)
+            glDeleteProgram(self.program)
+            raise RuntimeError(f"Shader link failed: {log}")
+
+        self.u_palette = glGetUniformLocation(self.program, "u_palette")
+        self.u_color = glGetUniformLocation(self.program, "u_color")
+        # With per-instance attributes a_bone can come from an instance buffer instead
+        self.instancing = bool(glVertexAttribDivisor) and bool(glDrawElementsInstanced)
+
+    def begin(self, palette):
+        """Binds the program and uploads the (S, 4, 4) column-major palette."""
+        glUseProgram(self.program)
+        glUniformMatrix4fv(self.u_palette, len(palette), GL_FALSE, palette)
+        glEnableVertexAttribArray(ATTR_POSITION)
+        glEnableVertexAttribArray(ATTR_NORMAL)
+        glEnableVertexAttribArray(ATTR_BONE)
+
+    def end(self):
+        glDisableVertexAttribArray(ATTR_BONE)
+        glDisableVertexAttribArray(ATTR_NORMAL)
+        glDisableVertexAttribArray(ATTR_POSITION)
+        glUseProgram(0)
+
+    def release(self):
+        glDeleteProgram(self.program)
+
+
+class PartBatch:
+    """All meshes of one category, with their LOD levels, packed into a single VBO/IBO pair."""
+
+    def __init__(self, meshes, bone_slots, lods=None, category=""):
+        """`lods` overrides each mesh's LOD levels, for batches built before they are attached."""
+        self.meshes = meshes
+        self.key = self.cache_key(category, meshes, bone_slots, lods)
+        self.level_ranges = [] # per mesh, (first index, index count) per LOD level
+        self.vbo = None
+        self.ibo = None
+
+        vertex_blocks = []
+        index_blocks = []
+        vertex_base = 0
+        index_base = 0
+        for i, mesh in enumerate(meshes):
+            slot = bone_slots.get(mesh.parent_bone, 0)
+            levels = []
+            for level in [mesh] + (lods[i] if lods is not None else mesh.lods):
+                positions = level.vertices.reshape(-1, 3)
+                block = np.empty((len(positions), 7), dtype=np.float32)
+                block[:, 0:3] = positions
+                block[:, 3:6] = level.normals.reshape(-1, 3)
+                block[:, 6] = slot
+                vertex_blocks.append(block)
+                index_blocks.append(level.indices + np.uint32(vertex_base))
+                levels.append((index_base, len(level.indices)))
+                vertex_base += len(positions)
+                index_base += len(level.indices)
+            self.level_ranges.append(levels)
+        self.ranges = [levels[0] for levels in self.level_ranges] # full-resolution range per mesh
+
+        self.vertex_data = np.concatenate(vertex_blocks) if vertex_blocks else np.empty((0, 7), dtype=np.float32)
+        self.index_data = np.concatenate(index_blocks) if index_blocks else np.empty(0, dtype=np.uint32)
+        self.nbytes = self.vertex_data.nbytes + self.index_data.nbytes
+
+    @staticmethod
+    def cache_key(category, meshes, bone_slots, lods=None):
+        """
+        Identifies a batch by its content: the geometry hashes and palette slots
+        of its meshes and LOD levels. Cheap enough to look a batch up before packing it.
+        """
+        digest = hashlib.blake2b(category.encode(), digest_size=16)
+        for i, mesh in enumerate(meshes):
+            levels = lods[i] if lods is not None else mesh.lods
+            digest.update(f"{mesh.key}:{bone_slots.get(mesh.parent_bone, 0)}".encode())
+            digest.update(",".join(level.key for level in levels).encode() + b";")
+        return "batch:" + digest.hexdigest()
+
+    def upload(self):
+        if self.vbo is not None or len(self.index_data) == 0:
+            return
+        self.vbo, self.ibo = (int(b) for b in glGenBuffers(2))
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, self.vertex_data, GL_STATIC_DRAW)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, self.index_data, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+    def upload_staged(self):
+        """Generator version of upload() for an UploadQueue; buffers are only set once complete."""
+        if self.vbo is not None or len(self.index_data) == 0:
+            return
+        vbo = yield from upload_buffer(GL_ARRAY_BUFFER, self.vertex_data)
+        try:
+            ibo = yield from upload_buffer(GL_ELEMENT_ARRAY_BUFFER, self.index_data)
+        except GeneratorExit:
+            glDeleteBuffers(1, [vbo])
+            raise
+        self.vbo, self.ibo = vbo, ibo
+
+    def forget_buffers(self):
+        """Drops buffer ids without freeing them, for when the GL context is gone."""
+        self.vbo = self.ibo = None
+
+    def release(self):
+        if self.vbo is not None:
+            glDeleteBuffers(2, [self.vbo, self.ibo])
+            self.vbo = self.ibo = None
+
+    def buffer_bytes(self):
+        return self.nbytes if self.vbo is not None else 0
+
+    def draw_runs(self):
+        """Contiguous (color, first, count) runs of visible, unculled meshes at their LOD, merged by color."""
+        runs = []
+        for mesh, levels in zip(self.meshes, self.level_ranges):
+            first, count = levels[min(mesh.lod_level, len(levels) - 1)]
+            if not mesh.visible or mesh.culled or count == 0:
+                continue
+            if runs and runs[-1][0] == mesh.color and runs[-1][1] + runs[-1][2] == first:
+                runs[-1][2] += count
+            else:
+                runs.append([mesh.color, first, count])
+        return runs
+
+    def draw(self, program):
+        """Returns (draw calls, triangles) submitted."""
+        if len(self.index_data) == 0:
+            return 0, 0
+        self.upload()
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+        glVertexAttribPointer(ATTR_POSITION, 3, GL_FLOAT, GL_FALSE, BATCH_STRIDE, None)
+        glVertexAttribPointer(ATTR_NORMAL, 3, GL_FLOAT, GL_FALSE, BATCH_STRIDE, NORMAL_OFFSET)
+        glVertexAttribPointer(ATTR_BONE, 1, GL_FLOAT, GL_FALSE, BATCH_STRIDE, BONE_OFFSET)
+
+        runs = self.draw_runs()
+        for color, first, count in runs:
+            glUniform3f(program.u_color, *color)
+            glDrawElements(GL_TRIANGLES, count, GL_UNSIGNED_INT, ctypes.c_void_p(first * 4))
+
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        return len(runs), sum(count for _, _, count in runs) // 3
+
+
+class InstanceStream:
+    """
+    Draws meshes that share one geometry with a single instanced call each.
+    Their palette slots are streamed into one buffer per frame and read as a
+    per-instance a_bone.
+    """
+
+    def __init__(self):
+        self.vbo = None
+
+    def draw(self, program, groups):
+        """
+        groups: (geometry, color, slots) with geometry buffers in the
+        GEOMETRY_STRIDE layout. Call between program.begin() and end().
+        Returns (draw calls, triangles) submitted.
+        """
+        groups = [group for group in groups if group[0].index_count]
+        if not groups:
+            return 0, 0
+        slots = np.concatenate([np.asarray(group_slots, dtype=np.float32) for _, _, group_slots in groups])
+        if self.vbo is None:
+            self.vbo = int(glGenBuffers(1))
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, slots, GL_STREAM_DRAW)
+        glVertexAttribDivisor(ATTR_BONE, 1)
+
+        first = 0
+        triangles = 0
+        for geometry, color, group_slots in groups:
+            if geometry.vbo is None:
+                geometry.upload()
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glVertexAttribPointer(ATTR_BONE, 1, GL_FLOAT, GL_FALSE, 4, ctypes.c_void_p(first * 4))
+            glBindBuffer(GL_ARRAY_BUFFER, geometry.vbo)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, geometry.ibo)
+            glVertexAttribPointer(ATTR_POSITION, 3, GL_FLOAT, GL_FALSE, GEOMETRY_STRIDE, None)
+            glVertexAttribPointer(ATTR_NORMAL, 3, GL_FLOAT, GL_FALSE, GEOMETRY_STRIDE, NORMAL_OFFSET)
+            glUniform3f(program.u_color, *color)
+            glDrawElementsInstanced(GL_TRIANGLES, geometry.index_count, GL_UNSIGNED_INT, None, len(group_slots))
+            first += len(group_slots)
+            triangles += geometry.index_count // 3 * len(group_slots)
+
+        glVertexAttribDivisor(ATTR_BONE, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        return len(groups), triangles
+
+    def forget_buffers(self):
+        self.vbo = None
+
+    def release(self):
+        if self.vbo is not None:
+            glDeleteBuffers(1, [self.vbo])
+            self.vbo = None
@@ -0,0 +1,168 @@
+import time
+import ctypes
+from collections import deque
+import numpy as np
+from OpenGL.GL import *
+# The wrapped 64-bit getter can't build its output array; read into a ctypes value instead
+from OpenGL.raw.GL.VERSION.GL_3_3 import glGetQueryObjectui64v as _get_query_ui64
+
+# Frames kept for summaries; a few seconds at the active frame rate
+HISTORY_FRAMES = 600
+# Timer queries in flight; results are read back a few frames late to avoid stalls
+GPU_QUERY_RING = 4
+
+COUNTERS = ("draw_calls", "triangles", "meshes_drawn", "meshes_culled", "buffer_bytes", "render_scale")
+
+
+class GpuTimer:
+    """GL_TIME_ELAPSED queries around each frame, read back without blocking."""
+
+    def __init__(self):
+        if not bool(glGenQueries) or not bool(_get_query_ui64):
+            raise RuntimeError("Timer queries are not supported")
+        self.queries = [int(q) for q in np.atleast_1d(glGenQueries(GPU_QUERY_RING))]
+        self.free = list(self.queries)
+        self.pending = deque() # (query, frame record) in issue order
+        self.active = None
+
+    def begin(self, frame):
+        if not self.free:
+            return # Every query is still in flight; this frame goes untimed
+        self.active = (self.free.pop(), frame)
+        glBeginQuery(GL_TIME_ELAPSED, self.active[0])
+
+    def end(self):
+        if self.active is None:
+            return
+        glEndQuery(GL_TIME_ELAPSED)
+        self.pending.append(self.active)
+        self.active = None
+
+    def poll(self):
+        """Stores finished results as `gpu_ms` on the frame records they were issued for."""
+        while self.pending:
+            query, frame = self.pending[0]
+            if not glGetQueryObjectiv(query, GL_QUERY_RESULT_AVAILABLE):
+                break
+            self.pending.popleft()
+            self.free.append(query)
+            elapsed_ns = ctypes.c_uint64()
+            _get_query_ui64(query, GL_QUERY_RESULT, ctypes.byref(elapsed_ns))
+            # Some drivers (llvmpipe) report a bogus first result; no frame takes a minute
+            if elapsed_ns.value < 60e9:
+                frame["gpu_ms"] = elapsed_ns.value / 1e6
+
+    def release(self):
+        glDeleteQueries(len(self.queries), self.queries)
+        self.queries = self.free = []
+        self.pending.clear()
+
+
+class RenderStats:
+    """
+    Rolling per-frame render statistics. Each frame record holds cpu_ms
+    (time spent in paintGL), interval_ms (time since the previous frame),
+    gpu_ms once its timer query resolves, and the COUNTERS plus the
+    animation frame passed to end_frame.
+    """
+
+    def __init__(self, history=HISTORY_FRAMES):
+        self.history = deque(maxlen=history)
+        self.marks = {} # label -> summary(), for before/after comparisons
+        self.gpu_timer = None
+        self._frame = None
+        self._start = None
+        self._last_start = None
+
+    def initialize_gl(self):
+        """Called with the GL context current; GPU timing is skipped where unsupported."""
+        try:
+            self.gpu_timer = GpuTimer()
+        except Exception as e:
+            print(f"GPU frame timing unavailable: {e}")
+            self.gpu_timer = None
+
+    def begin_frame(self):
+        now = time.perf_counter()
+        interval = (now - self._last_start) * 1000.0 if self._last_start is not None else None
+        self._last_start = self._start = now
+        self._frame = {"interval_ms": interval, "gpu_ms": None}
+        if self.gpu_timer:
+            self.gpu_timer.begin(self._frame)
+
+    def end_frame(self, **counters):
+        """Closes the frame opened by begin_frame with the counters gathered while drawing it."""
+        if self._frame is None:
+            return
+        if self.gpu_timer:
+            self.gpu_timer.end()
+            self.gpu_timer.poll()
+        frame = self._frame
+        frame["cpu_ms"] = (time.perf_counter() - self._start) * 1000.0
+        frame.update(counters)
+        self.history.append(frame)
+        self._frame = None
+
+    def latest(self):
+        return self.history[-1] if self.history else None
+
+    def summary(self, frames=None):
+        """Mean / p95 / max of the timings and mean counters over the last `frames` (all by default)."""
+        records = list(self.history)[-frames:] if frames else list(self.history)
+        result = {"frames": len(records)}
+        for key in ("cpu_ms", "gpu_ms", "interval_ms"):
+            values = np.array([r[key] for r in records if r.get(key) is not None], dtype=np.float64)
+            result[key] = {
+                "mean": float(values.mean()),
+                "p95": float(np.percentile(values, 95)),
+                "max": float(values.max()),
+            } if len(values) else None
+        for key in COUNTERS:
+            values = [r[key] for r in records if key in r]
+            result[key] = float(np.mean(values)) if values else None
+        return result
+
+    def mark(self, label, frames=None):
+        """Remembers the current summary under `label` so it can be compared later."""
+        self.marks[label] = self.summary(frames)
+        return self.marks[label]
+
+    def compare(self, before, after=None):
+        """Differences of mean timings and counters between two marks (or a mark and now)."""
+        old = self.marks[before]
+        new = self.marks[after] if after else self.summary()
+        delta = {}
+        for key in ("cpu_ms", "gpu_ms", "interval_ms"):
+            if old[key] and new[key]:
+                delta[key] = new[key]["mean"] - old[key]["mean"]
+        for key in COUNTERS:
+            if old[key] is not None and new[key] is not None:
+                delta[key] = new[key] - old[key]
+        return delta
+
+    def overlay_lines(self, frames=60):
+        """Short text lines for the viewport HUD."""
+        latest = self.latest()
+        if not latest:
+            return []
+        recent = self.summary(frames)
+        lines = [f"CPU {recent['cpu_ms']['mean']:.2f} ms (p95 {recent['cpu_ms']['p95']:.2f})"]
+        if recent["gpu_ms"]:
+            lines.append(f"GPU {recent['gpu_ms']['mean']:.2f} ms (p95 {recent['gpu_ms']['p95']:.2f})")
+        elif self.gpu_timer is None:
+            lines.append("GPU n/a")
+        if recent["interval_ms"]:
+            lines.append(f"{1000.0 / recent['interval_ms']['mean']:.1f} fps")
+        lines.append(f"{latest.get('draw_calls', 0)} draws, {latest.get('triangles', 0):,} tris")
+        lines.append(f"{latest.get('meshes_drawn', 0)} meshes, {latest.get('meshes_culled', 0)} culled")
+        lines.append(f"{latest.get('buffer_bytes', 0) / (1024 * 1024):.1f} MiB buffers")
+        if latest.get("render_scale", 1.0) < 1.0:
+            lines.append(f"{latest['render_scale']:.0%} resolution (interacting)")
+        if latest.get("animation_frame") is not None:
+            lines.append(f"anim frame {latest['animation_frame']:.1f}")
+        return lines
+
+    def release(self):
+        if self.gpu_timer:
+            self.gpu_timer.release()
+            self.gpu_timer = None
@@ -0,0 +1,73 @@
+from OpenGL.GL import *
+
+# Fraction of the full resolution rendered while the camera is being dragged
+DEFAULT_INTERACTION_SCALE = 0.5
+# Choices offered in the preview tab
+INTERACTION_SCALES = (1.0, 0.75, 0.5, 0.33)
+# Lowest accepted scale; below this the upscaled image is too blurry to aim with
+MIN_RENDER_SCALE = 0.25
+
+
+def scaled_size(width, height, scale):
+    """Pixel size of a render at `scale` of width x height, never below 1 x 1."""
+    scale = min(max(scale, MIN_RENDER_SCALE), 1.0)
+    return max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+
+
+class ScaledRenderTarget:
+    """
+    Offscreen framebuffer (color + depth renderbuffers) the scene is drawn
+    into at reduced resolution, then stretched onto the widget's framebuffer
+    with a linear-filtered blit. Storage is reallocated only when the size
+    changes. All methods need the GL context current.
+    """
+
+    def __init__(self):
+        self.framebuffer = None
+        self.color = None
+        self.depth = None
+        self.size = (0, 0)
+
+    def bind(self, width, height):
+        """Binds the framebuffer for drawing at width x height, (re)allocating it if needed."""
+        if self.framebuffer is None:
+            self.framebuffer = int(glGenFramebuffers(1))
+            self.color, self.depth = (int(rb) for rb in glGenRenderbuffers(2))
+        glBindFramebuffer(GL_FRAMEBUFFER, self.framebuffer)
+        if self.size != (width, height):
+            glBindRenderbuffer(GL_RENDERBUFFER, self.color)
+            glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, width, height)
+            glBindRenderbuffer(GL_RENDERBUFFER, self.depth)
+            glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH_COMPONENT24, width, height)
+            glBindRenderbuffer(GL_RENDERBUFFER, 0)
+            glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, self.color)
+            glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_RENDERBUFFER, self.depth)
+            self.size = (width, height)
+            if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+                self.release()
+                raise RuntimeError("Reduced-resolution framebuffer is incomplete")
+        glViewport(0, 0, width, height)
+
+    def blit(self, target_framebuffer, width, height):
+        """Stretches the color buffer over width x height of `target_framebuffer` and leaves that bound."""
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, self.framebuffer)
+        glBindFramebuffer(GL_DRAW_FRAMEBUFFER, target_framebuffer)
+        glBlitFramebuffer(0, 0, self.size[0], self.size[1], 0, 0, width, height, GL_COLOR_BUFFER_BIT, GL_LINEAR)
+        glBindFramebuffer(GL_FRAMEBUFFER, target_framebuffer)
+        glViewport(0, 0, width, height)
+
+    def buffer_bytes(self):
+        """GPU memory of the color (RGBA8) and depth (24-bit, padded to 32) storage."""
+        return self.size[0] * self.size[1] * 8
+
+    def release(self):
+        if self.framebuffer is not None:
+            glDeleteFramebuffers(1, [self.framebuffer])
+            glDeleteRenderbuffers(2, [self.color, self.depth])
+        self.framebuffer = self.color = self.depth = None
+        self.size = (0, 0)
+
+    def forget_buffers(self):
+        """Forgets the GL objects without deleting them, for when the context is gone."""
+        self.framebuffer = self.color = self.depth = None
+        self.size = (0, 0)
@@ -0,0 +1,277 @@
+import math
+import struct
+import zlib
+import numpy as np
+
+# Matches ModularViewport.apply_gl_state: clear color, GL_LIGHT0 direction (eye space)
+# and ambient (light 0.3 + the default global 0.2) with GL_COLOR_MATERIAL
+BACKGROUND = (0.1, 0.1, 0.12)
+LIGHT_DIRECTION = np.array([1.0, 2.0, 1.0]) / math.sqrt(6.0)
+AMBIENT = 0.5
+DEFAULT_COLOR = (0.7, 0.7, 0.7)
+
+THUMBNAIL_SIZE = 64
+THUMBNAIL_FOV = 30.0
+# Orbit of thumbnails, as ModularViewport.camera_rot: pitch, yaw in degrees
+THUMBNAIL_ORBIT = (15.0, 25.0)
+
+# Candidate pixels rasterized per step; bounds memory for large triangles or images
+RASTER_CHUNK = 1 << 21
+# Triangles with a vertex this close to (or behind) the eye are dropped, not clipped
+NEAR_W = 1e-6
+
+
+def translation(x, y, z):
+    m = np.identity(4)
+    m[:3, 3] = (x, y, z)
+    return m
+
+def rotation_x(degrees):
+    c, s = math.cos(math.radians(degrees)), math.sin(math.radians(degrees))
+    m = np.identity(4)
+    m[1, 1], m[1, 2], m[2, 1], m[2, 2] = c, -s, s, c
+    return m
+
+def rotation_y(degrees):
+    c, s = math.cos(math.radians(degrees)), math.sin(math.radians(degrees))
+    m = np.identity(4)
+    m[0, 0], m[0, 2], m[2, 0], m[2, 2] = c, s, -s, c
+    return m
+
+def perspective(fov_y, aspect, near, far):
+    """Row-major equivalent of gluPerspective."""
+    f = 1.0 / math.tan(math.radians(fov_y) / 2.0)
+    m = np.zeros((4, 4))
+    m[0, 0] = f / aspect
+    m[1, 1] = f
+    m[2, 2] = (far + near) / (near - far)
+    m[2, 3] = 2.0 * far * near / (near - far)
+    m[3, 2] = -1.0
+    return m
+
+
+class _Arrays:
+    """Unpacked mesh dict arrays, shaped like a PackedMesh for gather_triangles."""
+    def __init__(self, vertices, normals, indices):
+        self.vertices, self.normals, self.indices = vertices, normals, indices
+
+def manager_items(manager, root=None):
+    """
+    (geometry, model matrix, color) of every visible mesh in a MeshManager,
+    posed like draw_all poses it. `root` (row-major) goes in front of each
+    bone matrix, e.g. the viewport's Z-up to Y-up and armature transforms.
+    """
+    items = []
+    pose = np.asarray(manager.pose_matrices, dtype=np.float64).reshape(-1, 4, 4).transpose(0, 2, 1)
+    for meshes in manager.parts.values():
+        for mesh in meshes:
+            if not mesh.visible:
+                continue
+            model = pose[mesh.bone_index] if 0 <= mesh.bone_index < len(pose) else None
+            items.append((mesh.geometry, _combine(root, model), mesh.color))
+    return items
+
+def mesh_data_items(meshes_data, bone_names, pose_matrices, root=None, color=DEFAULT_COLOR):
+    """
+    Like manager_items for FBXData mesh dicts, posed by parent bone name with
+    (B, 16) column-major matrices in `bone_names` order.
+    """
+    index = {name: i for i, name in enumerate(bone_names)}
+    pose = np.asarray(pose_matrices, dtype=np.float64).reshape(-1, 4, 4).transpose(0, 2, 1)
+    items = []
+    for mesh in meshes_data:
+        geometry = mesh.get("packed") or _Arrays(mesh["vertices"], mesh["normals"], mesh["indices"])
+        bone = index.get(mesh.get("parent_bone", ""), -1)
+        items.append((geometry, _combine(root, pose[bone] if bone >= 0 else None), color))
+    return items
+
+def _combine(root, model):
+    if root is None:
+        return model
+    return root if model is None else root @ model
+
+def gather_triangles(items):
+    """
+    Flattens (geometry, model matrix or None, color) items into world-space
+    triangles: (T, 3, 3) positions, (T, 3, 3) normals and (T, 3) colors.
+    """
+    positions, normals, colors = [], [], []
+    for geometry, model, color in items:
+        vertices = np.asarray(geometry.vertices, dtype=np.float64).reshape(-1, 3)
+        vertex_normals = np.asarray(geometry.normals, dtype=np.float64).reshape(-1, 3)
+        triangles = np.asarray(geometry.indices, dtype=np.int64).reshape(-1, 3)
+        if not len(triangles):
+            continue
+        if model is not None:
+            vertices = vertices @ model[:3, :3].T + model[:3, 3]
+            vertex_normals = vertex_normals @ np.linalg.inv(model[:3, :3]) # Inverse transpose, applied to rows
+        positions.append(vertices[triangles])
+        normals.append(vertex_normals[triangles])
+        colors.append(np.broadcast_to(np.asarray(color, dtype=np.float64), (len(triangles), 3)))
+    if not positions:
+        return np.empty((0, 3, 3)), np.empty((0, 3, 3)), np.empty((0, 3))
+    return np.concatenate(positions), np.concatenate(normals), np.concatenate(colors)
+
+def frame_camera(positions, aspect=1.0, orbit=THUMBNAIL_ORBIT, fov=THUMBNAIL_FOV, padding=1.05):
+    """Row-major (view, projection) orbiting the bounding sphere of positions and filling the image with it."""
+    points = positions.reshape(-1, 3)
+    if not len(points):
+        return translation(0, 0, -1), perspective(fov, aspect, 0.1, 10.0)
+    center = (points.min(axis=0) + points.max(axis=0)) * 0.5
+    radius = max(float(np.linalg.norm(points - center, axis=1).max()), 1e-6)
+    half = math.radians(fov) / 2.0
+    narrowest = min(half, math.atan(math.tan(half) * aspect))
+    distance = radius / math.sin(narrowest) * padding
+    pitch, yaw = orbit
+    view = translation(0, 0, -distance) @ rotation_x(pitch) @ rotation_y(yaw) @ translation(*-center)
+    return view, perspective(fov, aspect, max(distance - radius * 1.5, distance * 0.01), distance + radius * 1.5)
+
+def render(positions, normals, colors, view, projection, width, height, background=BACKGROUND, supersample=1):
+    """
+    Z-buffered, Lambert-lit rasterization of world-space triangles with
+    row-major view and projection matrices. Returns an (H, W, 3) uint8 image,
+    or (H, W, 4) with a transparent background when `background` is None.
+    """
+    W, H = width * supersample, height * supersample
+    mvp = projection @ view
+    flat = positions.reshape(-1, 3)
+    clip = flat @ mvp[:3, :3].T + mvp[:3, 3]
+    w = (flat @ mvp[3, :3] + mvp[3, 3]).reshape(-1, 3)
+    clip = clip.reshape(-1, 3, 3)
+
+    # Lighting happens in eye space, like the fixed-function pipeline
+    eye_normals = normals @ np.linalg.inv(view[:3, :3])
+
+    keep = np.all(w > NEAR_W, axis=1)
+    ndc = clip[keep] / w[keep][..., None]
+    w, eye_normals, colors = w[keep], eye_normals[keep], colors[keep]
+    sx = (ndc[..., 0] * 0.5 + 0.5) * W
+    sy = (0.5 - ndc[..., 1] * 0.5) * H
+    sz = ndc[..., 2]
+
+    # Triangle setup: barycentric weights as affine functions of the pixel center
+    x0, x1, x2 = sx[:, 0], sx[:, 1], sx[:, 2]
+    y0, y1, y2 = sy[:, 0], sy[:, 1], sy[:, 2]
+    area = (x1 - x0) * (y2 - y0) - (x2 - x0) * (y1 - y0)
+    px_min = np.maximum(np.ceil(sx.min(axis=1) - 0.5), 0)
+    px_max = np.minimum(np.floor(sx.max(axis=1) - 0.5), W - 1)
+    py_min = np.maximum(np.ceil(sy.min(axis=1) - 0.5), 0)
+    py_max = np.minimum(np.floor(sy.max(axis=1) - 0.5), H - 1)
+    box_w = (px_max - px_min + 1).astype(np.int64)
+    box_h = (py_max - py_min + 1).astype(np.int64)
+    live = (np.abs(area) > 1e-12) & (box_w > 0) & (box_h > 0) & (sz.min(axis=1) <= 1) & (sz.max(axis=1) >= -1)
+
+    tris = np.flatnonzero(live)
+    area = area[tris]
+    a = np.stack([(y1 - y2)[tris], (y2 - y0)[tris], (y0 - y1)[tris]], axis=1) / area[:, None]
+    b = np.stack([(x2 - x1)[tris], (x0 - x2)[tris], (x1 - x0)[tris]], axis=1) / area[:, None]
+    c = np.stack([(x1 * y2 - x2 * y1)[tris], (x2 * y0 - x0 * y2)[tris], (x0 * y1 - x1 * y0)[tris]], axis=1) / area[:, None]
+    counts = box_w[tris] * box_h[tris]
+
+    depth = np.full(W * H, np.inf)
+    color = np.empty((W * H, 3))
+    color[:] = background if background is not None else 0.0
+    covered = np.zeros(W * H, dtype=bool)
+
+    ends = np.cumsum(counts)
+    start = 0
+    while start < len(tris):
+        base = ends[start - 1] if start else 0
+        stop = max(int(np.searchsorted(ends, base + RASTER_CHUNK, side="right")), start + 1)
+        chunk = np.arange(start, stop)
+        chunk_counts = counts[start:stop]
+        local = np.repeat(chunk, chunk_counts)
+        offsets = np.arange(int(chunk_counts.sum())) - np.repeat(np.concatenate(([0], np.cumsum(chunk_counts)[:-1])), chunk_counts)
+        start = stop
+
+        t = tris[local]
+        px = px_min[t].astype(np.int64) + offsets % box_w[t]
+        py = py_min[t].astype(np.int64) + offsets // box_w[t]
+        cx, cy = px + 0.5, py + 0.5
+        weights = a[local] * cx[:, None] + b[local] * cy[:, None] + c[local]
+        inside = np.all(weights >= 0, axis=1)
+        weights, t, px, py = weights[inside], t[inside], px[inside], py[inside]
+        z = np.einsum("ij,ij->i", weights, sz[t])
+        in_range = (z >= -1) & (z <= 1)
+        weights, t, z, pixel = weights[in_range], t[in_range], z[in_range], (py * W + px)[in_range]
+
+        # Nearest fragment per pixel within the chunk, then against the z-buffer
+        order = np.lexsort((z, pixel))
+        pixel = pixel[order]
+        first = np.ones(len(pixel), dtype=bool)
+        first[1:] = pixel[1:] != pixel[:-1]
+        nearest = order[first]
+        pixel = pixel[first]
+        closer = z[nearest] < depth[pixel]
+        nearest, pixel = nearest[closer], pixel[closer]
+        depth[pixel] = z[nearest]
+        covered[pixel] = True
+
+        # Perspective-correct normal, then Lambert
+        t = t[nearest]
+        q = weights[nearest] / w[t]
+        normal = np.einsum("ij,ijk->ik", q, eye_normals[t])
+        normal /= np.maximum(np.linalg.norm(normal, axis=1), 1e-12)[:, None]
+        diffuse = np.maximum(normal @ LIGHT_DIRECTION, 0.0)
+        color[pixel] = np.minimum(colors[t] * (AMBIENT + diffuse)[:, None], 1.0)
+
+    if background is None:
+        image = np.concatenate([color * covered[:, None], covered[:, None].astype(np.float64)], axis=1)
+    else:
+        image = color
+    image = image.reshape(H, W, -1)
+    if supersample > 1:
+        image = image.reshape(height, supersample, width, supersample, -1).mean(axis=(1, 3))
+        if background is None:
+            # Averaged premultiplied color back to straight alpha
+            alpha = image[..., 3:]
+            image[..., :3] /= np.maximum(alpha, 1e-12)
+    return np.round(np.clip(image, 0.0, 1.0) * 255).astype(np.uint8)
+
+def render_thumbnail(items, size=THUMBNAIL_SIZE, orbit=THUMBNAIL_ORBIT, background=None, supersample=2):
+    """A framed, square thumbnail of (geometry, model matrix, color) items; transparent background by default."""
+    positions, normals, colors = gather_triangles(items)
+    view, projection = frame_camera(positions, orbit=orbit)
+    return render(positions, normals, colors, view, projection, size, size, background, supersample)
+
+
+def encode_png(image):
+    """PNG bytes of an (H, W, 3) or (H, W, 4) uint8 image, unfiltered."""
+    height, width, channels = image.shape
+    rows = np.zeros((height, 1 + width * channels), dtype=np.uint8) # Filter byte 0 per row
+    rows[:, 1:] = image.reshape(height, -1)
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2 if channels == 3 else 6, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(rows.tobytes(), 6)) + chunk(b"IEND", b""))
+
+def write_png(path, image):
+    with open(path, "wb") as f:
+        f.write(encode_png(image))
+
+def read_png(path):
+    """Reads an unfiltered 8-bit RGB/RGBA PNG, as written by write_png, into an (H, W, C) array."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:8] != b"\x89PNG\r\n\x1a\n":
+        raise ValueError(f"{path} is not a PNG")
+    pos = 8
+    idat = b""
+    while pos < len(data):
+        length, tag = struct.unpack(">I4s", data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        if tag == b"IHDR":
+            width, height, depth, color_type = struct.unpack(">IIBB", body[:10])
+            if depth != 8 or color_type not in (2, 6):
+                raise ValueError(f"{path}: only 8-bit RGB/RGBA is supported")
+        elif tag == b"IDAT":
+            idat += body
+        pos += 12 + length
+    channels = 3 if color_type == 2 else 4
+    rows = np.frombuffer(zlib.decompress(idat), dtype=np.uint8).reshape(height, 1 + width * channels)
+    if rows[:, 0].any():
+        raise ValueError(f"{path}: filtered scanlines are not supported")
+    return rows[:, 1:].reshape(height, width, channels).copy()
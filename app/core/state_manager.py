@@ -48,7 +48,12 @@ class StateManager:
                 fbx_dict = {
                     "filename": fbx_data.filename,
                     "tris": fbx_data.tris,
-                    "meshes": fbx_data.meshes,
+                    # Extracted geometry arrives as NumPy arrays; store it as plain lists.
+                    # "packed" holds the viewport's upload-ready copy and is rebuilt on load.
+                    "meshes": [
+                        {k: (v.tolist() if hasattr(v, "tolist") else v) for k, v in mesh.items() if k != "packed"}
+                        for mesh in fbx_data.meshes
+                    ],
                     "armature_name": fbx_data.armature_name,
                     "bones": fbx_data.bones
                 }
@@ -0,0 +1,90 @@
+import time
+from collections import OrderedDict
+import numpy as np
+from OpenGL.GL import *
+
+# GPU time the viewport may spend on uploads per frame
+DEFAULT_UPLOAD_BUDGET_MS = 4.0
+# Bytes copied per glBufferSubData call; the unit of work between budget checks
+UPLOAD_CHUNK_BYTES = 256 * 1024
+
+# Yielded by a task that is waiting on something else (e.g. a worker thread):
+# the queue moves on to the next task instead of spending the budget on it
+WAITING = object()
+
+
+def upload_buffer(target, data, chunk_bytes=UPLOAD_CHUNK_BYTES):
+    """
+    Generator that creates a GL buffer and fills it one chunk per step.
+    Returns the buffer id (use with `yield from`). Closing it early frees
+    the buffer, so the GL context must be current whenever it runs.
+    """
+    data = np.ascontiguousarray(data)
+    raw = data.reshape(-1).view(np.uint8)
+    buffer = int(glGenBuffers(1))
+    try:
+        glBindBuffer(target, buffer)
+        glBufferData(target, raw.nbytes, None, GL_STATIC_DRAW)
+        glBindBuffer(target, 0)
+        for offset in range(0, raw.nbytes, chunk_bytes):
+            yield
+            # Other code may bind buffers between steps
+            glBindBuffer(target, buffer)
+            glBufferSubData(target, offset, raw[offset:offset + chunk_bytes])
+            glBindBuffer(target, 0)
+    except GeneratorExit:
+        glDeleteBuffers(1, [buffer])
+        raise
+    return buffer
+
+
+class UploadQueue:
+    """
+    GL upload tasks run a step at a time within a per-frame time budget.
+    A task is a generator that yields between steps (or yields WAITING while
+    blocked); submitting a task under a key that is already queued closes the
+    old one.
+    """
+
+    def __init__(self, budget_ms=DEFAULT_UPLOAD_BUDGET_MS):
+        self.budget_ms = budget_ms
+        self.tasks = OrderedDict() # key -> generator, run in submission order
+
+    def submit(self, key, task):
+        self.cancel(key)
+        self.tasks[key] = task
+
+    def cancel(self, key):
+        task = self.tasks.pop(key, None)
+        if task is not None:
+            task.close()
+
+    def discard(self):
+        """Forgets every task without running its cleanup, for when the GL context is gone."""
+        self.tasks.clear()
+
+    def __contains__(self, key):
+        return key in self.tasks
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def run(self, budget_ms=None):
+        """Steps queued tasks until the budget is spent; at least one step always runs."""
+        if not self.tasks:
+            return
+        deadline = time.perf_counter() + (self.budget_ms if budget_ms is None else budget_ms) / 1000.0
+        for key, task in list(self.tasks.items()):
+            if self.tasks.get(key) is not task:
+                continue # Replaced or cancelled by an earlier task this frame
+            while True:
+                try:
+                    state = next(task)
+                except StopIteration:
+                    if self.tasks.get(key) is task:
+                        del self.tasks[key]
+                    break
+                if state is WAITING or time.perf_counter() >= deadline:
+                    break
+            if time.perf_counter() >= deadline:
+                break
@@ -1,9 +1,14 @@
 import subprocess
 import os
 import sys
+from app.services.blender_pool import BlenderWorkerPool
 
 class BlenderLauncher:
-    """Handles locating and launching Blender in background mode."""
+    """
+    Handles locating and launching Blender in background mode.
+    With pool_size > 0, scripts run on warm, long-lived Blender workers
+    instead of a fresh process per call.
+    """
     
     DEFAULT_PATHS = [
         r"C:\Program Files\Blender Foundation\Blender 4.5\blender.exe",
@@ -11,11 +16,22 @@ class BlenderLauncher:
         r"C:\Program Files\Blender Foundation\Blender 4.3\blender.exe",
     ]
 
-    def __init__(self, executable_path=None):
+    def __init__(self, executable_path=None, pool_size=0, max_jobs_per_worker=25, job_timeout=300.0):
         self.executable_path = executable_path or self._find_blender()
         if not self.executable_path:
             raise FileNotFoundError("Blender executable not found. Please specify path.")
 
+        self._version = None
+        self.pool = None
+        if pool_size > 0:
+            self.pool = BlenderWorkerPool(
+                self.executable_path,
+                size=pool_size,
+                max_jobs_per_worker=max_jobs_per_worker,
+                job_timeout=job_timeout
+            )
+            self.pool.warm_up()
+
     def _find_blender(self):
         # 1. Check if it's already in PATH
         try:
@@ -31,6 +47,26 @@ class BlenderLauncher:
         
         return None
 
+    @property
+    def version(self):
+        """
+        Blender version string (e.g. 'Blender 4.5.1'), looked up once.
+        Always the first line of `blender --version`, never the warm workers'
+        bpy.app.version_string: extraction cache keys include it, so it must
+        not depend on whether the pool has booted yet.
+        """
+        if self._version is None:
+            try:
+                result = subprocess.run(
+                    [self.executable_path, "--version"],
+                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, errors='replace'
+                )
+                lines = result.stdout.strip().splitlines()
+                self._version = lines[0].strip() if lines else "unknown"
+            except OSError:
+                self._version = "unknown"
+        return self._version
+
     def run_python_script(self, script_path, blend_file=None, extra_args=None):
         """Runs a python script in Blender headless mode."""
         cmd = [self.executable_path, "--background"]
@@ -44,6 +80,9 @@ class BlenderLauncher:
             base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
             script_path = os.path.join(base_dir, "scripts", "blender_extract_validate.py")
             
+        if self.pool:
+            return self.pool.run_python_script(script_path, blend_file=blend_file, extra_args=extra_args)
+
         cmd.extend(["--python", script_path])
         
         if extra_args:
@@ -63,3 +102,8 @@ class BlenderLauncher:
         
         stdout, stderr = process.communicate()
         return process.returncode, stdout, stderr
+
+    def shutdown(self):
+        """Stops any warm Blender workers."""
+        if self.pool:
+            self.pool.shutdown()
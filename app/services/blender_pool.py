@@ -0,0 +1,251 @@
+import os
+import json
+import time
+import queue
+import threading
+import subprocess
+from collections import deque
+
+# Must match RESPONSE_PREFIX in scripts/blender_worker.py
+RESPONSE_PREFIX = "@@MLP_WORKER@@ "
+
+
+class BlenderWorker:
+    """A single long-lived Blender process running scripts/blender_worker.py."""
+
+    def __init__(self, executable_path, worker_script):
+        self.process = subprocess.Popen(
+            [executable_path, "--background", "--python", worker_script],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1
+        )
+        self.responses = queue.Queue()
+        self.jobs_run = 0
+        self.version = ""
+        self.last_used = time.monotonic()
+        self._next_id = 0
+
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    def _read_loop(self):
+        # Blender prints plenty of its own output; only protocol lines matter
+        for line in self.process.stdout:
+            if line.startswith(RESPONSE_PREFIX):
+                try:
+                    self.responses.put(json.loads(line[len(RESPONSE_PREFIX):]))
+                except ValueError:
+                    pass
+        self.responses.put(None)  # EOF: the process is gone
+
+    def is_alive(self):
+        return self.process.poll() is None
+
+    def wait_ready(self, timeout):
+        """Blocks until the worker has finished booting Blender."""
+        message = self._next_response(None, timeout)
+        self.version = message.get("version", "")
+
+    def _next_response(self, request_id, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"No response from Blender worker within {timeout:.0f}s")
+            try:
+                message = self.responses.get(timeout=remaining)
+            except queue.Empty:
+                raise TimeoutError(f"No response from Blender worker within {timeout:.0f}s")
+            if message is None:
+                raise ConnectionError("Blender worker exited unexpectedly")
+            if message.get("id") == request_id:
+                return message
+
+    def request(self, message, timeout):
+        """Sends one request and waits for its matching response."""
+        self._next_id += 1
+        message = dict(message, id=self._next_id)
+        try:
+            self.process.stdin.write(json.dumps(message) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError):
+            raise ConnectionError("Blender worker exited unexpectedly")
+        response = self._next_response(self._next_id, timeout)
+        self.last_used = time.monotonic()
+        return response
+
+    def ping(self, timeout=5.0):
+        if not self.is_alive():
+            return False
+        try:
+            return bool(self.request({"op": "ping"}, timeout).get("pong"))
+        except (TimeoutError, ConnectionError):
+            return False
+
+    def stop(self, timeout=5.0):
+        if self.is_alive():
+            try:
+                self.process.stdin.write(json.dumps({"op": "quit"}) + "\n")
+                self.process.stdin.flush()
+                self.process.wait(timeout=timeout)
+            except (BrokenPipeError, OSError, ValueError, subprocess.TimeoutExpired):
+                self.process.kill()
+        try:
+            self.process.stdin.close()
+        except (OSError, ValueError):
+            pass
+
+
+class BlenderWorkerPool:
+    """
+    Keeps a few warm Blender processes around and hands them jobs.
+    Workers are health-checked before reuse, recycled after `max_jobs_per_worker`
+    jobs or a crash, and killed if a job runs past `job_timeout` seconds.
+    """
+
+    def __init__(self, executable_path, size=2, max_jobs_per_worker=25, job_timeout=300.0,
+                 startup_timeout=120.0, health_check_interval=60.0):
+        self.executable_path = executable_path
+        self.size = max(1, size)
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.job_timeout = job_timeout
+        self.startup_timeout = startup_timeout
+        self.health_check_interval = health_check_interval
+
+        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.worker_script = os.path.join(base_dir, "scripts", "blender_worker.py")
+
+        self.version = ""
+        self._idle = deque()
+        self._lock = threading.Lock()
+        # Signalled whenever a worker goes idle or a slot frees up (recycle, crash, failed spawn)
+        self._available = threading.Condition(self._lock)
+        self._spawned = 0
+        self._closed = False
+
+    def warm_up(self):
+        """Boots all workers on a background thread so the first job is already warm."""
+        def _boot():
+            workers = []
+            for _ in range(self.size):
+                with self._lock:
+                    if self._closed or self._spawned >= self.size:
+                        break
+                    self._spawned += 1
+                try:
+                    workers.append(self._spawn())
+                except Exception as e:
+                    self._free_slot()
+                    print(f"Blender worker failed to start: {e}")
+                    break
+            for worker in workers:
+                self._release(worker)
+
+        threading.Thread(target=_boot, daemon=True).start()
+
+    def _spawn(self):
+        worker = BlenderWorker(self.executable_path, self.worker_script)
+        try:
+            worker.wait_ready(self.startup_timeout)
+        except (TimeoutError, ConnectionError):
+            worker.process.kill()
+            raise
+        self.version = worker.version or self.version
+        return worker
+
+    def _free_slot(self):
+        with self._lock:
+            self._spawned -= 1
+            self._available.notify()
+
+    def _acquire(self):
+        with self._available:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Blender worker pool has been shut down")
+                if self._idle:
+                    worker = self._idle.popleft()
+                    break
+                if self._spawned < self.size:
+                    # Also reached when a recycled or crashed worker freed its slot while we waited
+                    self._spawned += 1
+                    worker = None
+                    break
+                self._available.wait() # Every worker is busy
+
+        if worker is None:
+            try:
+                return self._spawn()
+            except Exception:
+                self._free_slot()
+                raise
+
+        # Health check: dead processes are replaced, long-idle ones are pinged
+        stale = time.monotonic() - worker.last_used > self.health_check_interval
+        if not worker.is_alive() or (stale and not worker.ping()):
+            worker.stop()
+            try:
+                return self._spawn()
+            except Exception:
+                self._free_slot()
+                raise
+        return worker
+
+    def _release(self, worker):
+        with self._lock:
+            recycle = (
+                self._closed
+                or not worker.is_alive()
+                or worker.jobs_run >= self.max_jobs_per_worker
+            )
+            if recycle:
+                self._spawned -= 1
+            else:
+                self._idle.append(worker)
+            self._available.notify()
+        if recycle:
+            worker.stop()
+
+    def _discard(self, worker):
+        worker.process.kill()
+        self._free_slot()
+
+    def run_python_script(self, script_path, blend_file=None, extra_args=None):
+        """Same contract as BlenderLauncher.run_python_script: (returncode, stdout, stderr)."""
+        try:
+            worker = self._acquire()
+        except Exception as e:
+            return -1, "", f"Could not start Blender worker: {e}"
+
+        job = {
+            "op": "run",
+            "script": script_path,
+            "blend_file": blend_file,
+            "args": list(extra_args or []),
+        }
+
+        try:
+            response = worker.request(job, self.job_timeout)
+        except TimeoutError:
+            self._discard(worker)
+            return -1, "", f"Blender job timed out after {self.job_timeout:.0f}s"
+        except ConnectionError as e:
+            self._discard(worker)
+            return -1, "", str(e)
+
+        worker.jobs_run += 1
+        self._release(worker)
+        return response.get("returncode", 1), response.get("stdout", ""), response.get("stderr", "")
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._available.notify_all() # Waiting callers fail instead of hanging
+        for worker in idle:
+            worker.stop()
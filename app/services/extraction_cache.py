@@ -0,0 +1,157 @@
+import os
+import json
+import shutil
+import time
+import hashlib
+import threading
+from app.core.mesh_payload import map_payload
+
+class ExtractionCache:
+    """
+    Content-addressed on-disk cache of Blender extraction payloads.
+
+    Entries are keyed on the FBX content hash plus whatever else changes the
+    output (extractor script hash, Blender version, extraction mode) and are
+    stored as MLPX payload files that are memory-mapped on read. A size+mtime
+    pre-check avoids re-hashing unchanged files, and the total size is kept
+    under `max_bytes` by evicting the least recently used entries.
+    """
+
+    DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+    # Cache hits only refresh LRU timestamps; those reach disk at most this often
+    # (or with the next put/eviction, or flush()) instead of on every hit
+    INDEX_SAVE_INTERVAL = 30.0
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        if not cache_dir:
+            cache_dir = os.path.join(os.path.expanduser("~"), ".mechalaunchpad", "cache", "extractions")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = {"files": {}, "entries": {}}
+        self._load_index()
+
+    def _load_index(self):
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r") as f:
+                    data = json.load(f)
+                # Forget hashes of files that no longer exist
+                self.index["files"] = {
+                    path: info for path, info in data.get("files", {}).items() if os.path.exists(path)
+                }
+                self.index["entries"] = data.get("entries", {})
+            except Exception as e:
+                print(f"Failed to load extraction cache index: {e}")
+
+    def _save_index(self):
+        # Caller holds the lock
+        self._dirty = False
+        self._last_save = time.monotonic()
+        tmp_path = self.index_path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(self.index, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"Failed to save extraction cache index: {e}")
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.mlpx")
+
+    def file_hash(self, path):
+        """SHA-256 of a file's content, reusing the last hash while size and mtime are unchanged."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            known = self.index["files"].get(path)
+            if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+                return known["sha256"]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        sha = digest.hexdigest()
+
+        with self._lock:
+            self.index["files"][path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha}
+            self._save_index()
+        return sha
+
+    def make_key(self, fbx_path, *parts):
+        """Cache key for an FBX plus anything else that affects the extracted output."""
+        digest = hashlib.sha256(self.file_hash(fbx_path).encode("utf-8"))
+        for part in parts:
+            digest.update(b"\0" + str(part).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Returns the decoded payload for `key`, or None on a miss."""
+        path = self._entry_path(key)
+        with self._lock:
+            entry = self.index["entries"].get(key)
+            if entry is None or not os.path.exists(path):
+                return None
+            entry["last_access"] = time.time()
+            self._dirty = True
+            if time.monotonic() - self._last_save >= self.INDEX_SAVE_INTERVAL:
+                self._save_index()
+        try:
+            return map_payload(path)
+        except (OSError, ValueError) as e:
+            print(f"Discarding unreadable cache entry {key}: {e}")
+            self._remove(key)
+            return None
+
+    def put(self, key, payload_path):
+        """Moves a freshly written payload into the cache and returns its new path."""
+        path = self._entry_path(key)
+        if os.path.exists(path):
+            # Same key means same content; keep the copy that may already be mapped
+            os.remove(payload_path)
+        else:
+            # shutil.move falls back to copy + delete when the payload sits on another filesystem
+            shutil.move(payload_path, path)
+        with self._lock:
+            self.index["entries"][key] = {"size": os.path.getsize(path), "last_access": time.time()}
+            self._evict(keep=key)
+            self._save_index()
+        return path
+
+    def flush(self):
+        """Writes LRU bookkeeping from cache hits that hasn't been saved yet."""
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def _remove(self, key):
+        with self._lock:
+            self.index["entries"].pop(key, None)
+            self._save_index()
+        try:
+            os.remove(self._entry_path(key))
+        except OSError:
+            pass
+
+    def _evict(self, keep=None):
+        # Caller holds the lock
+        entries = self.index["entries"]
+        total = sum(e["size"] for e in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                os.remove(self._entry_path(key))
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue  # Still mapped somewhere (Windows); try again next time
+            total -= entries.pop(key)["size"]
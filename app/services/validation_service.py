@@ -1,58 +1,302 @@
 import json
+import shutil
+import hashlib
+import tempfile
+from app.core.mesh_payload import read_payload, map_payload
 from app.services.blender_launcher import BlenderLauncher
+from app.services.extraction_cache import ExtractionCache
 from validation import ValidationRunner
-from validation.models import FBXData, Severity
+from validation.models import FBXData
 import os
 
 class ValidationService:
-    def __init__(self, launcher: BlenderLauncher):
+    def __init__(self, launcher: BlenderLauncher, cache: ExtractionCache = None):
         self.launcher = launcher
         self.runner = ValidationRunner()
+        self.cache = cache or ExtractionCache()
         self.base_dir = os.path.dirname(os.path.dirname(__file__))
-        self.extract_script = os.path.join(self.base_dir, "scripts", "blender_extract_validate.py")
+        project_root = os.path.dirname(self.base_dir)
+        self.extract_script = os.path.join(project_root, "scripts", "blender_extract_validate.py")
+        self.digest_script = os.path.join(project_root, "scripts", "blender_digest.py")
+        self._extractor_hash = None
 
-    def validate_fbx(self, fbx_path, part_category):
-        """Extracts data using Blender then runs the validation logical rules."""
-        # 1. Extract data using Blender
-        success, stdout, stderr = self.launcher.run_python_script(
-            self.extract_script,
-            extra_args=[fbx_path]
-        )
-        
-        if success != 0:
-            print(f"DEBUG: Blender process failed with return code {success}")
-            print(f"DEBUG: Stderr: {stderr}")
-            return [], None, f"Blender extraction failed: {stderr}"
-            
-        # Parse JSON from stdout
-        fbx_json = None
-        try:
-            # Blender output might have noise, find the marker
-            lines = stdout.splitlines()
-            if "RESULT_START" not in lines:
-                print(f"DEBUG: RESULT_START marker not found in stdout.")
-                print(f"DEBUG: Full Stdout: {stdout}")
-                return [], None, "Blender extraction failed: Missing result marker."
-                
-            start_idx = lines.index("RESULT_START")
-            json_str = lines[start_idx + 1]
-            fbx_json = json.loads(json_str)
-        except (ValueError, IndexError, json.JSONDecodeError) as e:
-            print(f"DEBUG: JSON Parse Error: {e}")
-            return [], None, f"Failed to parse Blender output: {e}"
-
-        if "error" in fbx_json:
-            return [], None, fbx_json["error"]
-
-        # 2. Build FBXData object
-        fbx_data = FBXData(
+    @staticmethod
+    def _parse_records(stdout):
+        """Returns every JSON record printed between RESULT_START/RESULT_END markers."""
+        records = []
+        lines = stdout.splitlines()
+        for idx, line in enumerate(lines):
+            if line == "RESULT_START" and idx + 1 < len(lines):
+                records.append(json.loads(lines[idx + 1]))
+        return records
+
+    @staticmethod
+    def _build_fbx_data(fbx_json):
+        return FBXData(
             filename=fbx_json["filename"],
             tris=fbx_json["tris"],
             meshes=fbx_json["meshes"],
             armature_name=fbx_json["armature_name"],
             bones=fbx_json["bones"]
         )
-        
-        # 3. Run logical rules
-        results, filtered_fbx, = self.runner.validate(fbx_path, fbx_data, part_category)
+
+    def _new_payload_path(self):
+        # Next to the cache entries, so caching the payload is a rename
+        fd, path = tempfile.mkstemp(suffix=".mlpx", prefix="mlp_mesh_", dir=self.cache.cache_dir)
+        os.close(fd)
+        return path
+
+    @staticmethod
+    def _discard(path):
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _cache_key(self, fbx_path, stats_only, category=None):
+        """Extraction cache key: FBX content + extractor version + Blender version + mode."""
+        try:
+            if self._extractor_hash is None:
+                with open(self.extract_script, "rb") as f:
+                    self._extractor_hash = hashlib.sha256(f.read()).hexdigest()
+            mode = "stats" if stats_only else "full"
+            if category:
+                # Scoped output depends on the category's bone list, not just its name
+                bones = self.runner.registry.get(category, {}).get("bones", [])
+                mode += f":{category}:{','.join(sorted(bones))}"
+            return self.cache.make_key(fbx_path, self._extractor_hash, self.launcher.version, mode)
+        except OSError as e:
+            print(f"DEBUG: Extraction cache unavailable for {fbx_path}: {e}")
+            return None
+
+    def _from_cache(self, cache_key):
+        cached = self.cache.get(cache_key) if cache_key else None
+        return self._build_fbx_data(cached) if cached else None
+
+    def _load_record(self, record, cache_key=None):
+        """Turns one result record into (fbx_data, error), decoding its binary payload if any."""
+        if record is None:
+            return None, "Blender extraction failed: Missing result marker."
+        if "error" in record:
+            return None, record["error"]
+        if "payload" in record:
+            try:
+                if cache_key:
+                    record = map_payload(self.cache.put(cache_key, record["payload"]))
+                else:
+                    record = read_payload(record["payload"])
+            except (OSError, ValueError) as e:
+                return None, f"Failed to read extracted mesh data: {e}"
+        return self._build_fbx_data(record), None
+
+    def extract_fbx(self, fbx_path, stats_only=False, category=None):
+        """
+        Extracts an FBX with Blender. Returns (fbx_data, error).
+        With stats_only, meshes carry names, parent bones and tri counts but no geometry.
+        With a category, only meshes on that category's bones (or loose ones) carry geometry.
+        Results are served from the on-disk extraction cache when the FBX is unchanged.
+        """
+        cache_key = self._cache_key(fbx_path, stats_only, category)
+        cached = self._from_cache(cache_key)
+        if cached:
+            return cached, None
+
+        payload_path = self._new_payload_path()
+        extra_args = [fbx_path, "--out", payload_path]
+        if stats_only:
+            extra_args.append("--stats-only")
+        if category:
+            extra_args.extend(["--category", category])
+        try:
+            success, stdout, stderr = self.launcher.run_python_script(
+                self.extract_script,
+                extra_args=extra_args
+            )
+
+            if success != 0:
+                print(f"DEBUG: Blender process failed with return code {success}")
+                print(f"DEBUG: Stderr: {stderr}")
+                return None, f"Blender extraction failed: {stderr}"
+
+            # Parse the small JSON record from stdout, geometry comes through the payload file
+            try:
+                # Blender output might have noise, find the marker
+                records = self._parse_records(stdout)
+                if not records:
+                    print(f"DEBUG: RESULT_START marker not found in stdout.")
+                    print(f"DEBUG: Full Stdout: {stdout}")
+                    return None, "Blender extraction failed: Missing result marker."
+            except (ValueError, IndexError, json.JSONDecodeError) as e:
+                print(f"DEBUG: JSON Parse Error: {e}")
+                return None, f"Failed to parse Blender output: {e}"
+
+            return self._load_record(records[0], cache_key)
+        finally:
+            self._discard(payload_path)
+
+    def extract_many(self, fbx_paths, categories=None, stats_only=False):
+        """
+        Extracts several FBX files in a single Blender session.
+        Cached files are skipped; only the misses go to Blender. Each file can
+        be scoped to a category, as in extract_fbx.
+        Returns a list of (fbx_data, error) tuples in input order.
+        """
+        if not fbx_paths:
+            return []
+
+        extracted = [None] * len(fbx_paths)
+        # The same file can be requested for several categories; each (path, category)
+        # pair is one manifest entry, and inputs map to entries by manifest index
+        positions = {} # (fbx_path, category) -> manifest index
+        entry_of = {} # input index -> manifest index
+        cache_keys = [] # manifest index -> cache key
+        manifest = []
+        for idx, fbx_path in enumerate(fbx_paths):
+            category = categories[idx] if categories else None
+            if (fbx_path, category) in positions:
+                entry_of[idx] = positions[(fbx_path, category)]
+                continue
+            cache_key = self._cache_key(fbx_path, stats_only, category)
+            cached = self._from_cache(cache_key)
+            if cached:
+                extracted[idx] = (cached, None)
+                continue
+            entry = {"fbx_path": fbx_path, "out": self._new_payload_path()}
+            if category:
+                entry["category"] = category
+            positions[(fbx_path, category)] = entry_of[idx] = len(manifest)
+            cache_keys.append(cache_key)
+            manifest.append(entry)
+
+        if not manifest:
+            return extracted
+
+        fd, manifest_path = tempfile.mkstemp(suffix=".json", prefix="mlp_batch_")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(manifest, f)
+
+            extra_args = ["--batch", manifest_path]
+            if stats_only:
+                extra_args.append("--stats-only")
+            success, stdout, stderr = self.launcher.run_python_script(
+                self.extract_script,
+                extra_args=extra_args
+            )
+
+            records = {}
+            batch_error = None
+            if success != 0:
+                print(f"DEBUG: Blender batch failed with return code {success}")
+                print(f"DEBUG: Stderr: {stderr}")
+                batch_error = f"Blender extraction failed: {stderr}"
+            else:
+                try:
+                    records = {r.get("index"): r for r in self._parse_records(stdout)}
+                except (ValueError, json.JSONDecodeError) as e:
+                    print(f"DEBUG: JSON Parse Error: {e}")
+                    batch_error = f"Failed to parse Blender output: {e}"
+
+            loaded = {} # manifest index -> (fbx_data, error)
+            for idx, position in entry_of.items():
+                if batch_error:
+                    extracted[idx] = (None, batch_error)
+                    continue
+                if position not in loaded:
+                    loaded[position] = self._load_record(records.get(position), cache_keys[position])
+                extracted[idx] = loaded[position]
+            return extracted
+        finally:
+            os.remove(manifest_path)
+            for entry in manifest:
+                self._discard(entry["out"])
+
+    def digest(self, fbx_path, products, category=None, out_dir=None):
+        """
+        Imports an FBX once and writes each requested product ("stats", "geometry",
+        "rig", "anim", "thumbnail") into out_dir (a fresh temp dir by default).
+        Returns (manifest, error); product paths in the manifest are absolute.
+        """
+        out_dir = out_dir or tempfile.mkdtemp(prefix="mlp_digest_")
+        extra_args = [fbx_path, "--out-dir", out_dir, "--products", ",".join(products)]
+        if category:
+            extra_args.extend(["--category", category])
+
+        success, stdout, stderr = self.launcher.run_python_script(self.digest_script, extra_args=extra_args)
+        try:
+            records = self._parse_records(stdout)
+        except json.JSONDecodeError as e:
+            return None, f"Failed to parse Blender output: {e}"
+        if not records:
+            return None, f"Blender digest failed: {stderr or 'Missing result marker.'}"
+
+        manifest = records[0]
+        if "error" in manifest:
+            return manifest, manifest["error"]
+        for product in manifest["products"].values():
+            if "path" in product:
+                paths = product["path"] if isinstance(product["path"], list) else [product["path"]]
+                paths = [os.path.join(out_dir, path) for path in paths]
+                product["path"] = paths if isinstance(product["path"], list) else paths[0]
+        return manifest, None
+
+    def load_digest_geometry(self, manifest, cache_key=None):
+        """
+        Loads the geometry product of a digest manifest. Returns (fbx_data, error).
+        With a cache key the payload is moved into the extraction cache.
+        """
+        product = manifest["products"].get("geometry")
+        if not product or not product.get("ok"):
+            return None, (product or {}).get("error", "Geometry was not digested.")
+        return self._load_record({"payload": product["path"]}, cache_key)
+
+    def digest_geometry(self, fbx_path, category=None):
+        """
+        Geometry of an FBX through the digest script, scoped to `category`.
+        Shares the extraction cache with extract_fbx. Returns (fbx_data, error).
+        """
+        cache_key = self._cache_key(fbx_path, False, category)
+        cached = self._from_cache(cache_key)
+        if cached:
+            return cached, None
+
+        out_dir = tempfile.mkdtemp(prefix="mlp_digest_", dir=self.cache.cache_dir)
+        try:
+            manifest, error = self.digest(fbx_path, ["geometry"], category=category, out_dir=out_dir)
+            if error:
+                return None, error
+            return self.load_digest_geometry(manifest, cache_key)
+        finally:
+            shutil.rmtree(out_dir, ignore_errors=True)
+
+    def validate_fbx(self, fbx_path, part_category, stats_only=False, on_result=None):
+        """
+        Extracts data using Blender then runs the validation logical rules.
+        `on_result` receives each ValidationResult as its rule finishes.
+        """
+        # 1. Extract data using Blender
+        fbx_data, error = self.extract_fbx(fbx_path, stats_only=stats_only, category=part_category)
+        if error:
+            return [], None, error
+
+        # 2. Run logical rules
+        results, filtered_fbx = self.runner.validate(fbx_path, fbx_data, part_category, on_result=on_result)
         return results, filtered_fbx, None
+
+    def validate_many(self, items, stats_only=False):
+        """
+        Validates several (fbx_path, part_category) pairs for the cost of one Blender startup.
+        Returns a list of (results, filtered_fbx, error) tuples in input order.
+        """
+        extracted = self.extract_many(
+            [fbx_path for fbx_path, _ in items],
+            categories=[part_category for _, part_category in items],
+            stats_only=stats_only
+        )
+
+        validated = []
+        for (fbx_path, part_category), (fbx_data, error) in zip(items, extracted):
+            if error:
+                validated.append(([], None, error))
+                continue
+            results, filtered_fbx = self.runner.validate(fbx_path, fbx_data, part_category)
+            validated.append((results, filtered_fbx, None))
+        return validated
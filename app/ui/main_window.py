@@ -1,16 +1,19 @@
 import os
-import json
 from PySide6.QtWidgets import (
     QMainWindow, QTabWidget, QWidget, QVBoxLayout, QLabel, 
     QStatusBar, QPushButton, QHBoxLayout, QComboBox, QFileDialog, QMessageBox,
-    QListWidget, QListWidgetItem, QGraphicsDropShadowEffect
+    QListWidget, QListWidgetItem, QGraphicsDropShadowEffect, QCheckBox
 )
-from PySide6.QtGui import QColor, QIcon
-from PySide6.QtCore import Qt, QThread, Signal
+from PySide6.QtGui import QColor, QIcon, QPixmap
+from PySide6.QtCore import Qt, QThread, QTimer, Signal, QSize
 from app.core.resources import QSS_STYLE, StyleTokens
 from app.services.blender_launcher import BlenderLauncher
 from app.services.template_service import TemplateService
 from app.services.validation_service import ValidationService
+from app.core.lod import MAX_LOD_LEVELS
+from app.core.render_target import INTERACTION_SCALES
+from app.core.mesh_manager import pack_fbx_data
+from app.core.software_renderer import mesh_data_items, render_thumbnail, encode_png
 from app.ui.viewport import ModularViewport
 from validation.models import Severity, FBXData
 
@@ -18,6 +21,7 @@ from validation.models import Severity, FBXData
 # Its functionality is now integrated into the PreviewTab.
 
 class ValidationWorker(QThread):
+    result_ready = Signal(object) # ValidationResult, streamed as each rule finishes
     finished = Signal(list, object, str) # results, fbx_data, error
 
     def __init__(self, service, fbx_path, category):
@@ -27,57 +31,78 @@ class ValidationWorker(QThread):
         self.category = category
 
     def run(self):
-        results, fbx_data, error = self.service.validate_fbx(self.fbx_path, self.category)
+        # A passing part goes straight to the viewport, so import it once with
+        # geometry (scoped to the category) and validate that same data
+        results, fbx_data, error = self.service.validate_fbx(
+            self.fbx_path, self.category, on_result=self.result_ready.emit
+        )
+        
+        passed = not error and all(r.passed for r in results if r.severity == Severity.ERROR)
+        if passed and fbx_data:
+            pack_fbx_data(fbx_data)
         self.finished.emit(results, fbx_data, error)
 
 class RobotAssemblyWorker(QThread):
-    """Loads the base robot model and extracts all parts."""
+    """
+    Loads the base robot model and extracts all parts. Restored validated
+    parts are re-extracted from their files in the same Blender session.
+    """
     finished = Signal(dict, str) # category -> fbx_data, error
+    parts_refreshed = Signal(dict) # category -> (filepath, fbx_data) of restored parts
 
-    def __init__(self, service, base_fbx):
+    def __init__(self, service, base_fbx, parts=None):
         super().__init__()
         self.service = service
         self.base_fbx = base_fbx
+        self.parts = dict(parts or {}) # category -> filepath
 
     def run(self):
-        # We use the same service but iterate through all categories
-        results = {}
-        error_msg = None
-        
-        # Load the FBX once to get raw data
-        success, stdout, stderr = self.service.launcher.run_python_script(
-            self.service.extract_script,
-            extra_args=[self.base_fbx]
+        # One batch: the whole base robot, then each restored part scoped to its category
+        categories = list(self.parts)
+        extracted = self.service.extract_many(
+            [self.base_fbx] + [self.parts[category] for category in categories],
+            categories=[None] + categories
         )
-        
-        if success != 0:
-            self.finished.emit({}, f"Failed to load base robot: {stderr}")
+
+        refreshed = {}
+        for category, (fbx_data, error) in zip(categories, extracted[1:]):
+            try:
+                if error:
+                    raise RuntimeError(error[:200])
+                filtered = self.service.runner.filter_category(fbx_data, category)
+                pack_fbx_data(filtered)
+                refreshed[category] = (self.parts[category], filtered)
+            except Exception as e:
+                # The saved geometry stays in place
+                print(f"DEBUG: Could not re-extract restored {category} part: {e}")
+        if refreshed:
+            self.parts_refreshed.emit(refreshed)
+
+        raw_data, error = extracted[0]
+        if error:
+            self.finished.emit({}, f"Failed to load base robot: {error}")
             return
 
-        # Parse JSON
         try:
-            lines = stdout.splitlines()
-            start_idx = lines.index("RESULT_START")
-            fbx_json = json.loads(lines[start_idx + 1])
-            
-            raw_data = FBXData(
-                filename=fbx_json["filename"],
-                tris=fbx_json["tris"],
-                meshes=fbx_json["meshes"],
-                armature_name=fbx_json["armature_name"],
-                bones=fbx_json["bones"]
-            )
-            
-            # Now split by category based on registry
-            categories = ["LeftArm", "RightArm", "Torso", "Head", "Legs"]
-            for cat in categories:
-                _, filtered_fbx = self.service.runner.validate(self.base_fbx, raw_data, cat)
-                results[cat] = filtered_fbx
-                
+            # Split by category based on registry, in one pass over the meshes
+            results = self.service.runner.partition_by_category(raw_data)
+            for fbx_data in results.values():
+                pack_fbx_data(fbx_data)
             self.finished.emit(results, "")
         except Exception as e:
             self.finished.emit({}, f"Error processing base robot: {e}")
 
+class MeshPackWorker(QThread):
+    """Converts restored parts' geometry lists into upload-ready arrays off the UI thread."""
+
+    def __init__(self, fbx_datas):
+        super().__init__()
+        self.fbx_datas = fbx_datas
+
+    def run(self):
+        for fbx_data in self.fbx_datas:
+            pack_fbx_data(fbx_data)
+
 class RemoteSyncWorker(QThread):
     """Background worker that queries GitLab for all remote parts across all categories."""
     finished = Signal(dict, str)  # {category: [versions]}, latest_sha
@@ -119,38 +144,41 @@ class PartDownloadWorker(QThread):
                 self.finished.emit(self.category, self.version, None, "Download failed")
                 return
             
-            # Extract mesh data via Blender
-            import json as json_mod
-            success, stdout, stderr = self.validation_service.launcher.run_python_script(
-                self.validation_service.extract_script,
-                extra_args=[local_path]
-            )
-            
-            if success != 0:
-                self.finished.emit(self.category, self.version, None, f"Blender extraction failed: {stderr[:200]}")
+            # Digest mesh data via Blender, geometry only for this limb
+            fbx_data, error = self.validation_service.digest_geometry(local_path, category=self.category)
+            if error:
+                self.finished.emit(self.category, self.version, None, f"Blender extraction failed: {error[:200]}")
                 return
             
-            # Parse JSON output
-            lines = stdout.splitlines()
-            start_idx = lines.index("RESULT_START")
-            fbx_json = json.loads(lines[start_idx + 1])
-            
-            fbx_data = FBXData(
-                filename=fbx_json["filename"],
-                tris=fbx_json["tris"],
-                meshes=fbx_json["meshes"],
-                armature_name=fbx_json["armature_name"],
-                bones=fbx_json["bones"]
-            )
-            
             # Filter to just this category's meshes
-            _, filtered = self.validation_service.runner.validate(local_path, fbx_data, self.category)
+            filtered = self.validation_service.runner.filter_category(fbx_data, self.category)
+            pack_fbx_data(filtered)
             
             self.finished.emit(self.category, self.version, filtered, "")
         except Exception as e:
             self.finished.emit(self.category, self.version, None, str(e))
 
 
+class ThumbnailWorker(QThread):
+    """Renders part thumbnails for the dropdowns with the software renderer."""
+    thumbnail_ready = Signal(str, str, object) # category, item text, PNG bytes
+
+    def __init__(self, jobs, bone_names, pose_matrices, root):
+        super().__init__()
+        self.jobs = jobs # [(category, item text, fbx_data)]
+        self.bone_names = bone_names
+        self.pose_matrices = pose_matrices
+        self.root = root
+
+    def run(self):
+        for category, item_text, fbx_data in self.jobs:
+            try:
+                items = mesh_data_items(fbx_data.meshes, self.bone_names, self.pose_matrices, self.root)
+                self.thumbnail_ready.emit(category, item_text, encode_png(render_thumbnail(items)))
+            except Exception as e:
+                print(f"DEBUG: Thumbnail failed for {category} ({item_text}): {e}")
+
+
 class PreviewTab(QWidget):
     def __init__(self, viewport: ModularViewport, template_service: TemplateService, gitlab_service=None, validation_service=None):
         super().__init__()
@@ -159,9 +187,12 @@ class PreviewTab(QWidget):
         self.gitlab_service = gitlab_service
         self.validation_service = validation_service
         self.custom_parts = {} # category -> fbx_data
+        self.custom_part_paths = {} # category -> FBX path of the custom part
         self.default_parts = {} # category -> fbx_data
         self.server_parts = {} # category -> {version: fbx_data_or_None}
         self._download_workers = []  # Keep references alive
+        self._thumbnail_jobs = [] # (category, item text, fbx_data) waiting for a render
+        self._thumbnail_worker = None
         
         layout = QHBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -200,6 +231,7 @@ class PreviewTab(QWidget):
             group_layout.addWidget(label)
             
             combo = QComboBox()
+            combo.setIconSize(QSize(32, 32))
             combo.addItem("⚪ Default")
             combo.setEnabled(False) # Enable once we have alternate parts
             combo.currentIndexChanged.connect(lambda idx, c=cat: self.on_part_swapped(c, idx))
@@ -278,9 +310,107 @@ class PreviewTab(QWidget):
         controls.setStyleSheet(f"background-color: {StyleTokens.BG_LEVEL_2}; border-bottom: 1px solid {StyleTokens.BORDER}; color: {StyleTokens.TEXT_SECONDARY}; padding: 8px; font-weight: bold;")
         view_layout.addWidget(controls)
         
+        # Level-of-detail inspection: force a level and watch what is drawn
+        lod_row = QWidget()
+        lod_row.setStyleSheet(f"background-color: {StyleTokens.BG_LEVEL_2};")
+        lod_layout = QHBoxLayout(lod_row)
+        lod_layout.setContentsMargins(10, 4, 10, 4)
+        lod_layout.setSpacing(8)
+        
+        lod_label = QLabel("LOD")
+        lod_label.setStyleSheet("font-weight: bold;")
+        lod_layout.addWidget(lod_label)
+        
+        self.lod_combo = QComboBox()
+        self.lod_combo.addItem("Auto")
+        for level in range(MAX_LOD_LEVELS + 1):
+            self.lod_combo.addItem(f"LOD {level}")
+        self.lod_combo.currentIndexChanged.connect(self.on_lod_forced)
+        lod_layout.addWidget(self.lod_combo)
+        
+        self.lod_stats_label = QLabel("")
+        self.lod_stats_label.setStyleSheet(f"color: {StyleTokens.TEXT_SECONDARY}; font-size: 11px;")
+        lod_layout.addWidget(self.lod_stats_label, 1)
+        
+        quality_label = QLabel("Orbit quality")
+        lod_layout.addWidget(quality_label)
+        self.interaction_scale_combo = QComboBox()
+        for scale in INTERACTION_SCALES:
+            self.interaction_scale_combo.addItem("Full" if scale >= 1.0 else f"{scale:.0%}", scale)
+        self.interaction_scale_combo.setCurrentIndex(
+            self.interaction_scale_combo.findData(self.viewport.interaction_scale)
+        )
+        self.interaction_scale_combo.currentIndexChanged.connect(self.on_interaction_scale_changed)
+        lod_layout.addWidget(self.interaction_scale_combo)
+        
+        self.stats_overlay_check = QCheckBox("Frame stats")
+        self.stats_overlay_check.toggled.connect(self.viewport.set_stats_overlay)
+        lod_layout.addWidget(self.stats_overlay_check)
+        view_layout.addWidget(lod_row)
+        
+        self.lod_stats_timer = QTimer(self)
+        self.lod_stats_timer.timeout.connect(self.refresh_lod_stats)
+        self.lod_stats_timer.timeout.connect(self.start_thumbnails)
+        self.lod_stats_timer.start(500)
+        
         view_layout.addWidget(self.viewport, 1)
         layout.addWidget(view_container, 1)
 
+    def on_lod_forced(self, index):
+        self.viewport.set_forced_lod(None if index == 0 else index - 1)
+
+    def on_interaction_scale_changed(self, index):
+        self.viewport.set_interaction_scale(self.interaction_scale_combo.itemData(index))
+
+    def refresh_lod_stats(self):
+        stats = self.viewport.mesh_manager.lod_stats
+        cull = self.viewport.mesh_manager.cull_stats
+        if not self.isVisible() or not stats["meshes"]:
+            return
+        levels = "  ".join(f"L{level}: {count}" for level, count in enumerate(stats["levels"]))
+        shared = self.viewport.mesh_manager.geometry_stats()
+        text = (f"{levels}   |   {stats['triangles']:,} / {stats['full_triangles']:,} tris"
+                f"   |   {cull['drawn']} drawn, {cull['culled']} culled"
+                f"   |   {shared['unique']} unique / {shared['meshes']} meshes, {shared['instanced']} instanced")
+        if stats["pending"]:
+            text += f"   |   building {stats['pending']} LOD chain(s)..."
+        if text != self.lod_stats_label.text():
+            self.lod_stats_label.setText(text)
+
+    def request_thumbnail(self, category, item_text, fbx_data):
+        """Queues a dropdown thumbnail for the item showing fbx_data."""
+        if fbx_data and fbx_data.meshes:
+            self._thumbnail_jobs.append((category, item_text, fbx_data))
+            self.start_thumbnails()
+
+    def start_thumbnails(self):
+        """Renders queued thumbnails in the background once the rest pose to draw them in is known."""
+        if not self._thumbnail_jobs or self._thumbnail_worker is not None:
+            return
+        if self.viewport.bind_pose is None and self.viewport.anim_loader is not None:
+            return # Retried by the stats timer
+        bone_names, pose_matrices = self.viewport.bind_pose or ([], [])
+        jobs, self._thumbnail_jobs = self._thumbnail_jobs, []
+        self._thumbnail_worker = ThumbnailWorker(jobs, bone_names, pose_matrices, self.viewport.scene_root())
+        self._thumbnail_worker.thumbnail_ready.connect(self.on_thumbnail_ready)
+        self._thumbnail_worker.finished.connect(self.on_thumbnails_finished)
+        self._thumbnail_worker.start()
+
+    def on_thumbnails_finished(self):
+        self._thumbnail_worker = None
+        self.start_thumbnails()
+
+    def on_thumbnail_ready(self, category, item_text, png):
+        combo = self.selectors.get(category)
+        if not combo:
+            return
+        index = combo.findText(item_text)
+        if index < 0:
+            return # The item was replaced meanwhile
+        pixmap = QPixmap()
+        pixmap.loadFromData(png, "PNG")
+        combo.setItemIcon(index, QIcon(pixmap))
+
     def start_remote_sync(self):
         """Kicks off background sync with GitLab to populate server parts."""
         if not self.gitlab_service or not self.gitlab_service.token:
@@ -392,6 +522,7 @@ class PreviewTab(QWidget):
             if category not in self.server_parts:
                 self.server_parts[category] = {}
             self.server_parts[category][version] = fbx_data
+            self.request_thumbnail(category, f"\U0001f7e2 Server: {version}", fbx_data)
             
             # Load into viewport if this is still the selected item
             combo = self.selectors.get(category)
@@ -404,11 +535,13 @@ class PreviewTab(QWidget):
 
     def set_default_assembly(self, assembly):
         self.default_parts = assembly
-        for cat, data in assembly.items():
-            self.viewport.load_fbx_data(cat, data)
+        self.viewport.load_assembly(assembly)
+        for category, fbx_data in assembly.items():
+            self.request_thumbnail(category, "⚪ Default", fbx_data)
             
     def add_custom_part(self, category, fbx_data, filename="Custom", filepath=None):
         self.custom_parts[category] = fbx_data
+        self.custom_part_paths[category] = filepath
         combo = self.selectors.get(category)
         if combo:
             combo.setEnabled(True)
@@ -428,12 +561,29 @@ class PreviewTab(QWidget):
             else:
                 # Insert after Default (index 0)
                 combo.insertItem(1, local_text)
+            self.request_thumbnail(category, local_text, fbx_data)
             
             # Auto-switch to custom when validated
             target_idx = 1 if local_idx < 0 else local_idx
             combo.setCurrentIndex(target_idx)
             self.on_part_swapped(category, target_idx)
 
+    def refresh_custom_parts(self, parts):
+        """Swaps restored parts' saved geometry for a fresh extraction of their files."""
+        for category, (filepath, fbx_data) in parts.items():
+            if self.custom_part_paths.get(category) != filepath:
+                continue # Replaced by a newer validation meanwhile
+            self.custom_parts[category] = fbx_data
+            combo = self.selectors.get(category)
+            if not combo:
+                continue
+            for i in range(combo.count()):
+                if combo.itemText(i).startswith("🟡"):
+                    self.request_thumbnail(category, combo.itemText(i), fbx_data)
+                    break
+            if combo.currentText().startswith("🟡"):
+                self.viewport.load_fbx_data(category, fbx_data)
+
 class ValidateTab(QWidget):
     validation_success = Signal(str, object, str, str) # category, fbx_data, filename, filepath
     
@@ -505,9 +655,26 @@ class ValidateTab(QWidget):
         
         # Run validation in background
         self.worker = ValidationWorker(self.service, self.fbx_path, category)
+        self.worker.result_ready.connect(self.add_result)
         self.worker.finished.connect(self.on_validation_finished)
         self.worker.start()
 
+    def add_result(self, res):
+        color = QColor(StyleTokens.TEXT_MAIN)
+        prefix = "✓" if res.passed else "✗"
+        
+        if not res.passed:
+            color = QColor(StyleTokens.ERROR) if res.severity == Severity.ERROR else QColor(StyleTokens.WARNING)
+        
+        item = QListWidgetItem(f"{prefix} [{res.rule_id}] {res.message}")
+        item.setForeground(color)
+        self.results_list.addItem(item)
+        
+        if res.fix_hint:
+            hint = QListWidgetItem(f"   ↳ Fix: {res.fix_hint}")
+            hint.setForeground(QColor(StyleTokens.TEXT_SECONDARY))
+            self.results_list.addItem(hint)
+
     def on_validation_finished(self, results, fbx_data, error):
         self.validate_btn.setEnabled(True)
         self.validate_btn.setText("Run Preflight Check")
@@ -520,24 +687,9 @@ class ValidateTab(QWidget):
             self.results_list.addItem(item)
             return
 
+        # Results were listed as they streamed in
         all_passed = all(r.passed for r in results if r.severity == Severity.ERROR)
         
-        for res in results:
-            color = QColor(StyleTokens.TEXT_MAIN)
-            prefix = "✓" if res.passed else "✗"
-            
-            if not res.passed:
-                color = QColor(StyleTokens.ERROR) if res.severity == Severity.ERROR else QColor(StyleTokens.WARNING)
-            
-            item = QListWidgetItem(f"{prefix} [{res.rule_id}] {res.message}")
-            item.setForeground(color)
-            self.results_list.addItem(item)
-            
-            if res.fix_hint:
-                hint = QListWidgetItem(f"   ↳ Fix: {res.fix_hint}")
-                hint.setForeground(QColor(StyleTokens.TEXT_SECONDARY))
-                self.results_list.addItem(hint)
-        
         if fbx_data and all_passed:
             fname = os.path.basename(self.fbx_path)
             self.validation_success.emit(category, fbx_data, fname, self.fbx_path)
@@ -581,7 +733,9 @@ class MainWindow(QMainWindow):
         
         # Initialize Services
         try:
-            self.launcher = BlenderLauncher()
+            # Warm Blender workers skip the cold start on every extraction/export
+            pool_size = int(os.getenv("MECHA_BLENDER_POOL_SIZE", "2"))
+            self.launcher = BlenderLauncher(pool_size=pool_size)
             self.template_service = TemplateService(self.launcher)
             self.validation_service = ValidationService(self.launcher)
             self.gitlab_service = GitLabService() # Loads from env if available
@@ -670,6 +824,12 @@ class MainWindow(QMainWindow):
                 filename=part.get("filename"),
                 filepath=part.get("filepath")
             )
+        
+        # Saved geometry comes back as plain lists; convert it before it is previewed
+        restored = [data for data in self.preview_tab.custom_parts.values() if data]
+        if restored:
+            self.pack_worker = MeshPackWorker(restored)
+            self.pack_worker.start()
             
         # Clear stale CI tracking from previous sessions
         # Pipelines are only useful to track during the session they were published
@@ -685,8 +845,15 @@ class MainWindow(QMainWindow):
             self.statusBar().showMessage("Warning: Basic_Model.fbx not found.")
             return
             
+        # Restored validated parts whose files are still around ride along in the same Blender batch
+        restored = {
+            category: path for category, path in self.preview_tab.custom_part_paths.items()
+            if path and os.path.exists(path)
+        }
+
         self.statusBar().showMessage("Loading base robot assembly...")
-        self.robot_worker = RobotAssemblyWorker(self.validation_service, base_path)
+        self.robot_worker = RobotAssemblyWorker(self.validation_service, base_path, parts=restored)
+        self.robot_worker.parts_refreshed.connect(self.preview_tab.refresh_custom_parts)
         self.robot_worker.finished.connect(self.on_base_robot_loaded)
         self.robot_worker.start()
 
@@ -706,6 +873,11 @@ class MainWindow(QMainWindow):
             else:
                 self.statusBar().showMessage("Robot assembly complete. | Ready — GitLab credentials missing (.env)")
 
+    def closeEvent(self, event):
+        self.launcher.shutdown()
+        self.validation_service.cache.flush()
+        super().closeEvent(event)
+
     def on_validation_success(self, category, fbx_data):
         """Deprecated: Now handled by preview_tab.add_custom_part"""
         pass
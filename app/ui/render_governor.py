@@ -0,0 +1,135 @@
+from PySide6.QtCore import QObject, QTimer, QElapsedTimer, QEvent, Qt
+
+# Frame rate assumed when the screen doesn't report one (offscreen, some VMs)
+FALLBACK_REFRESH_RATE = 60.0
+# Quiet time after the last input event before an interaction counts as over
+DEFAULT_INTERACTION_IDLE_MS = 150
+
+
+class RenderGovernor(QObject):
+    """
+    Decides when a widget repaints.
+
+    A tick callback runs at `active_fps` while something is animating and at
+    `idle_fps` otherwise; ticking stops entirely while the widget is hidden
+    (another tab, minimized window). Repaint requests from ticks and user
+    input are coalesced so the widget never repaints faster than
+    `interaction_fps`, which by default follows the refresh rate of the
+    widget's screen: one repaint per vsync.
+
+    Input handlers call begin_interaction(); `interacting` then stays True
+    until no input has arrived for `interaction_idle_ms`, after which one
+    more repaint is requested so the widget can redraw at full quality.
+    """
+
+    def __init__(self, widget, tick, active_fps=60, idle_fps=2, interaction_fps=None,
+                 interaction_idle_ms=DEFAULT_INTERACTION_IDLE_MS):
+        super().__init__(widget)
+        self.widget = widget
+        self.tick = tick # tick(dt_seconds) -> True if the scene changed
+        self.active_fps = active_fps
+        self.idle_fps = idle_fps
+        self.interaction_fps = interaction_fps # None: the screen's refresh rate
+        self.animating = False
+        self.interacting = False
+
+        self.clock = QElapsedTimer()
+        self.clock.start()
+        self.last_tick_ms = None
+        self.last_update_ms = None
+
+        self.tick_timer = QTimer(self)
+        self.tick_timer.setTimerType(Qt.PreciseTimer)
+        self.tick_timer.timeout.connect(self._on_tick)
+
+        self.update_timer = QTimer(self)
+        self.update_timer.setSingleShot(True)
+        self.update_timer.timeout.connect(self._flush_update)
+
+        self.interaction_timer = QTimer(self)
+        self.interaction_timer.setSingleShot(True)
+        self.interaction_timer.setInterval(interaction_idle_ms)
+        self.interaction_timer.timeout.connect(self._end_interaction)
+
+        widget.installEventFilter(self)
+        self._watched_window = None
+
+    def set_animating(self, animating):
+        self.animating = animating
+        self._reschedule()
+
+    def is_visible(self):
+        window = self.widget.window()
+        return (
+            self.widget.isVisible()
+            and not window.isMinimized()
+            and not self.widget.visibleRegion().isEmpty()
+        )
+
+    def frame_interval_ms(self):
+        """Minimum time between repaints."""
+        fps = self.interaction_fps
+        if not fps:
+            screen = self.widget.screen()
+            fps = screen.refreshRate() if screen is not None else 0.0
+            fps = fps if fps > 0 else FALLBACK_REFRESH_RATE
+        return 1000.0 / fps
+
+    def request_update(self):
+        """Repaints now, or once the interaction frame budget allows it."""
+        if self.update_timer.isActive() or not self.is_visible():
+            return
+        now = self.clock.elapsed()
+        interval = self.frame_interval_ms()
+        if self.last_update_ms is None or now - self.last_update_ms >= interval:
+            self._flush_update()
+        else:
+            self.update_timer.start(max(1, int(interval - (now - self.last_update_ms))))
+
+    def begin_interaction(self):
+        """Marks user input (orbit, pan, zoom) and requests a repaint; restarts the idle timeout."""
+        self.interacting = True
+        self.interaction_timer.start()
+        self.request_update()
+
+    def _end_interaction(self):
+        self.interacting = False
+        self.request_update()
+
+    def _flush_update(self):
+        self.last_update_ms = self.clock.elapsed()
+        self.widget.update()
+
+    def _on_tick(self):
+        now = self.clock.elapsed()
+        dt = 0.0 if self.last_tick_ms is None else (now - self.last_tick_ms) / 1000.0
+        self.last_tick_ms = now
+        if self.tick(dt):
+            self.request_update()
+
+    def _reschedule(self):
+        if not self.is_visible():
+            self.tick_timer.stop()
+            # Don't count hidden time as elapsed playback
+            self.last_tick_ms = None
+            return
+        fps = self.active_fps if self.animating else self.idle_fps
+        interval = int(1000 / fps)
+        if not self.tick_timer.isActive() or self.tick_timer.interval() != interval:
+            self.tick_timer.start(interval)
+
+    def eventFilter(self, obj, event):
+        if event.type() in (QEvent.Show, QEvent.Hide, QEvent.WindowStateChange):
+            if obj is self.widget and event.type() == QEvent.Show:
+                self._watch_window()
+            # Visibility settles after the event is delivered
+            QTimer.singleShot(0, self._reschedule)
+        return False
+
+    def _watch_window(self):
+        window = self.widget.window()
+        if window is not self.widget and window is not self._watched_window:
+            if self._watched_window is not None:
+                self._watched_window.removeEventFilter(self)
+            window.installEventFilter(self)
+            self._watched_window = window
@@ -1,11 +1,44 @@
-import json
 import os
 import math
+import numpy as np
 from PySide6.QtOpenGLWidgets import QOpenGLWidget
-from PySide6.QtCore import Qt, QPoint, QTimer
+from PySide6.QtCore import Qt, QPoint, QThread, Signal
+from PySide6.QtGui import QPainter, QColor, QFont
 from OpenGL.GL import *
 from OpenGL.GLU import *
 from app.core.mesh_manager import MeshManager
+from app.core.animation_clip import map_clip, clip_from_arrays
+from app.core.render_stats import RenderStats
+from app.core.upload_queue import DEFAULT_UPLOAD_BUDGET_MS
+from app.core.render_target import ScaledRenderTarget, DEFAULT_INTERACTION_SCALE, scaled_size
+from app.core import software_renderer
+from app.ui.render_governor import RenderGovernor
+
+FIELD_OF_VIEW = 45.0 # Vertical, degrees
+
+ANIMATION_CLIP_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "validation", "animation.clip"
+)
+
+class AnimationLoadWorker(QThread):
+    """Memory-maps an animation clip off the UI thread, bind pose first."""
+    bind_pose_ready = Signal(object) # AnimationClip holding only the rest pose
+    clip_ready = Signal(object, str) # AnimationClip, error
+
+    def __init__(self, clip_path):
+        super().__init__()
+        self.clip_path = clip_path
+
+    def run(self):
+        try:
+            header, arrays = map_clip(self.clip_path)
+            self.bind_pose_ready.emit(clip_from_arrays(header, arrays, keys=False))
+
+            clip = clip_from_arrays(header, arrays)
+            clip.bake() # Per-frame playback becomes array slicing
+            self.clip_ready.emit(clip, "")
+        except Exception as e:
+            self.clip_ready.emit(None, str(e))
 
 class ModularViewport(QOpenGLWidget):
     """Interactive 3D viewport for previewing mech parts."""
@@ -17,43 +50,140 @@ class ModularViewport(QOpenGLWidget):
         self.camera_dist = 5.0 # Zoomed in
         self.camera_pan = QPoint(0, -75) # Panned up slightly
         self.last_mouse_pos = QPoint()
+        self.pixel_scale = 1.0 # Pixels per view-space unit at distance 1, for LOD selection
+        self.aspect = 1.0
+        self.render_stats = RenderStats() # Always recorded; the overlay is optional
+        self.upload_budget_ms = DEFAULT_UPLOAD_BUDGET_MS # Per-frame time for staged GPU uploads
+        self.show_stats_overlay = False
+        # Resolution scale while orbiting/panning/zooming; 1.0 always renders at full resolution
+        self.interaction_scale = DEFAULT_INTERACTION_SCALE
+        self.scaled_target = ScaledRenderTarget()
         
         # Animation
-        self.animation_data = None
-        self.current_frame = 0
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.on_anim_timer)
+        self.animation_clip = None
+        self.armature_world_matrix = None
+        self.bind_pose = None # (bone names, (B, 16) matrices) of the rest pose, for thumbnails
+        self.current_frame = 0.0 # Fractional; poses interpolate between keys
+        self.playback_time = 0.0 # Seconds of playback, advanced by wall-clock ticks
+        self.governor = RenderGovernor(self, self.on_anim_tick)
+        self.anim_loader = None
         self.load_animation()
 
-    def load_animation(self):
-        anim_path = os.path.join("validation", "animation.json")
-        if os.path.exists(anim_path):
-            try:
-                with open(anim_path, "r") as f:
-                    self.animation_data = json.load(f)
-                self.timer.start(33) # ~30 FPS
-                print(f"DEBUG: Loaded animation with {len(self.animation_data['frames'])} frames.")
-            except Exception as e:
-                print(f"DEBUG: Failed to load animation: {e}")
-
-    def on_anim_timer(self):
-        if not self.animation_data:
+    def load_animation(self, clip_path=ANIMATION_CLIP_PATH):
+        """Starts loading a clip in the background; the bind pose shows until it is ready."""
+        if not os.path.exists(clip_path):
             return
-            
-        frames = self.animation_data["frames"]
-        self.current_frame = (self.current_frame + 1) % len(frames)
+        self.anim_loader = AnimationLoadWorker(clip_path)
+        self.anim_loader.bind_pose_ready.connect(self.on_bind_pose_ready)
+        self.anim_loader.clip_ready.connect(self.on_animation_loaded)
+        # Only QThread.finished says run() has returned and the worker can be dropped
+        self.anim_loader.finished.connect(self.on_anim_loader_finished)
+        self.anim_loader.start()
+
+    def on_anim_loader_finished(self):
+        if self.anim_loader is not None and self.anim_loader.isFinished():
+            self.anim_loader = None
+
+    def on_bind_pose_ready(self, bind_clip):
+        if self.animation_clip:
+            return
+        self.armature_world_matrix = bind_clip.armature_world_matrix
+        bind_matrices = bind_clip.bind_matrices().transpose(0, 2, 1).reshape(-1, 16).astype(np.float32)
+        self.bind_pose = (list(bind_clip.bone_names), bind_matrices)
+        self.mesh_manager.set_skeleton(bind_clip.bone_names)
+        self.mesh_manager.set_pose_matrices(bind_matrices)
+        self.update()
+
+    def on_animation_loaded(self, clip, error):
+        if error:
+            print(f"DEBUG: Failed to load animation: {error}")
+            return
+
+        # Swap the whole clip in at once; ticks only ever see a complete clip
+        self.current_frame = 0.0
+        self.playback_time = 0.0
+        self.animation_clip = clip
+        self.armature_world_matrix = clip.armature_world_matrix
+        self.mesh_manager.set_skeleton(clip.bone_names)
+        self.mesh_manager.set_pose_matrices(clip.baked_pose(0.0))
+        self.governor.set_animating(True)
+        self.update()
+        print(f"DEBUG: Loaded animation with {clip.frame_count} frames.")
+
+    def on_anim_tick(self, dt):
+        """Advances playback by `dt` seconds of wall-clock time. Returns True if the pose changed."""
+        # Staged uploads and LOD chains progress on repaints; keep them coming at the active rate
+        busy = self.mesh_manager.has_pending_work()
+        clip = self.animation_clip
+        self.governor.set_animating(bool(clip) or busy)
+        if not clip:
+            return busy
+
+        self.playback_time += dt
+        self.current_frame = (self.playback_time * clip.fps) % clip.frame_count
         
         # Update MeshManager pose
-        self.mesh_manager.set_pose(frames[self.current_frame])
-        self.update()
+        self.mesh_manager.set_pose_matrices(clip.baked_pose(self.current_frame))
+        return True
 
     def load_fbx_data(self, category, fbx_data):
         """Loads mesh data into the mesh manager and updates the viewport."""
-        self.mesh_manager.clear_part(category)
-        self.mesh_manager.add_part_meshes(category, fbx_data.meshes)
-        self.update()
+        self.load_assembly({category: fbx_data})
+
+    def load_assembly(self, assembly):
+        """
+        Loads a category -> FBXData mapping. Uploads are staged over the next
+        frames; each category keeps showing its old part until the new one is
+        ready, so swapping never stalls a frame.
+        """
+        # Cancelled uploads free their buffers, so the context must be current
+        if self.mesh_manager.gl_ready:
+            self.makeCurrent()
+        try:
+            for category, fbx_data in assembly.items():
+                self.mesh_manager.add_part_meshes(category, fbx_data.meshes)
+        finally:
+            if self.mesh_manager.gl_ready:
+                self.doneCurrent()
+        self.governor.set_animating(True)
+        self.governor.request_update()
+
+    def set_forced_lod(self, level):
+        """Draws every mesh at `level` (clamped to its chain), or picks per mesh again with None."""
+        self.mesh_manager.forced_lod = level
+        self.governor.request_update()
+
+    def set_stats_overlay(self, enabled):
+        self.show_stats_overlay = enabled
+        self.governor.request_update()
+
+    def set_interaction_scale(self, scale):
+        """Fraction of full resolution rendered while the camera moves; 1.0 turns scaling off."""
+        self.interaction_scale = min(max(float(scale), 0.0), 1.0)
+        if self.interaction_scale >= 1.0 and self.scaled_target.framebuffer is not None:
+            self.makeCurrent()
+            self.scaled_target.release()
+            self.doneCurrent()
+        self.governor.request_update()
+
+    def render_scale(self):
+        """Resolution scale for the frame about to be drawn."""
+        if not self.governor.interacting or self.interaction_scale >= 1.0:
+            return 1.0
+        # A scaled blit into a multisampled framebuffer is invalid
+        if self.format().samples() > 1:
+            return 1.0
+        return self.interaction_scale
         
     def initializeGL(self):
+        # A re-created context has lost the old framebuffer
+        self.scaled_target.forget_buffers()
+        self.apply_gl_state()
+        self.mesh_manager.initialize_gl()
+        self.render_stats.initialize_gl()
+
+    def apply_gl_state(self):
+        """Fixed GL state the scene relies on; QPainter overlays change it, so it is re-applied after them."""
         glClearColor(0.1, 0.1, 0.12, 1.0) # Match GitHub Desktop-ish background
         glEnable(GL_DEPTH_TEST)
         glEnable(GL_LIGHTING)
@@ -69,13 +199,58 @@ class ModularViewport(QOpenGLWidget):
 
     def resizeGL(self, w, h):
         glViewport(0, 0, w, h)
+        self.aspect = w / h if h > 0 else 1
+        self.pixel_scale = self.height() * self.devicePixelRatioF() / (2.0 * math.tan(math.radians(FIELD_OF_VIEW) / 2.0))
+        self.apply_projection()
+
+    def apply_projection(self):
         glMatrixMode(GL_PROJECTION)
         glLoadIdentity()
-        aspect = w / h if h > 0 else 1
-        gluPerspective(45, aspect, 0.1, 200.0) # Increased far plane
+        gluPerspective(FIELD_OF_VIEW, self.aspect, 0.1, 200.0) # Increased far plane
         glMatrixMode(GL_MODELVIEW)
 
     def paintGL(self):
+        self.render_stats.begin_frame()
+        self.mesh_manager.process_uploads(self.upload_budget_ms)
+        scale = self.render_scale()
+        if scale < 1.0:
+            scale = self.draw_scaled_scene(scale)
+        else:
+            self.draw_scene()
+        self.render_stats.end_frame(
+            draw_calls=self.mesh_manager.draw_stats["draw_calls"],
+            triangles=self.mesh_manager.draw_stats["triangles"],
+            meshes_drawn=self.mesh_manager.cull_stats["drawn"],
+            meshes_culled=self.mesh_manager.cull_stats["culled"],
+            buffer_bytes=self.mesh_manager.buffer_bytes() + self.scaled_target.buffer_bytes(),
+            render_scale=scale,
+            animation_frame=self.current_frame if self.animation_clip else None,
+        )
+        if self.show_stats_overlay:
+            self.draw_stats_overlay()
+
+    def draw_scaled_scene(self, scale):
+        """
+        Draws the scene into the reduced-resolution target and stretches it over
+        the widget. LODs are picked for the reduced size too. Returns the scale used.
+        """
+        dpr = self.devicePixelRatioF()
+        full_width, full_height = int(self.width() * dpr), int(self.height() * dpr)
+        width, height = scaled_size(full_width, full_height, scale)
+        try:
+            self.scaled_target.bind(width, height)
+        except Exception as e:
+            print(f"Reduced-resolution rendering unavailable: {e}")
+            self.interaction_scale = 1.0
+            glBindFramebuffer(GL_FRAMEBUFFER, self.defaultFramebufferObject())
+            glViewport(0, 0, full_width, full_height)
+            self.draw_scene()
+            return 1.0
+        self.draw_scene(self.pixel_scale * height / full_height)
+        self.scaled_target.blit(self.defaultFramebufferObject(), full_width, full_height)
+        return height / full_height
+
+    def draw_scene(self, pixel_scale=None):
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         glLoadIdentity()
         
@@ -98,14 +273,70 @@ class ModularViewport(QOpenGLWidget):
         glRotatef(-90, 1, 0, 0)
         
         # 6. Apply the overall Armature world transform (handles FBX 100x scale)
-        if self.animation_data and "armature_world_matrix" in self.animation_data:
-            mat = self.animation_data["armature_world_matrix"]
-            glMultMatrixf(mat)
+        if self.armature_world_matrix:
+            glMultMatrixf(self.armature_world_matrix)
         
-        # 7. Draw MeshManager parts
+        # 7. Draw MeshManager parts inside the frustum, each at the LOD its distance calls for
+        self.mesh_manager.prepare_frame(
+            glGetFloatv(GL_MODELVIEW_MATRIX), glGetFloatv(GL_PROJECTION_MATRIX),
+            self.pixel_scale if pixel_scale is None else pixel_scale
+        )
         self.mesh_manager.draw_all()
         glPopMatrix()
 
+    def view_matrix(self):
+        """Row-major camera transform draw_scene builds with glTranslate/glRotate."""
+        return (software_renderer.translation(0, 0, -self.camera_dist)
+                @ software_renderer.translation(self.camera_pan.x() * 0.01, self.camera_pan.y() * 0.01, 0)
+                @ software_renderer.rotation_x(self.camera_rot.x())
+                @ software_renderer.rotation_y(self.camera_rot.y()))
+
+    def scene_root(self):
+        """Row-major transform from armature space into the Y-up scene, as applied in draw_scene."""
+        root = software_renderer.rotation_x(-90)
+        if self.armature_world_matrix:
+            root = root @ np.asarray(self.armature_world_matrix, dtype=np.float64).reshape(4, 4).T
+        return root
+
+    def snapshot(self, width=None, height=None, supersample=1):
+        """
+        Renders the current parts, pose and camera with the software renderer,
+        without touching the GL context. Returns an (H, W, 3) uint8 image;
+        the grid and axes are left out.
+        """
+        width = width or self.width()
+        height = height or self.height()
+        positions, normals, colors = software_renderer.gather_triangles(
+            software_renderer.manager_items(self.mesh_manager, self.scene_root())
+        )
+        projection = software_renderer.perspective(FIELD_OF_VIEW, width / height, 0.1, 200.0)
+        return software_renderer.render(positions, normals, colors, self.view_matrix(), projection,
+                                        width, height, supersample=supersample)
+
+    def draw_stats_overlay(self):
+        lines = self.render_stats.overlay_lines()
+        if not lines:
+            return
+        painter = QPainter(self)
+        font = QFont("Consolas")
+        font.setStyleHint(QFont.Monospace)
+        font.setPointSize(9)
+        painter.setFont(font)
+        line_height = painter.fontMetrics().height()
+        width = max(painter.fontMetrics().horizontalAdvance(line) for line in lines) + 16
+        painter.fillRect(8, 8, width, line_height * len(lines) + 10, QColor(0, 0, 0, 160))
+        painter.setPen(QColor(220, 220, 220))
+        for i, line in enumerate(lines):
+            painter.drawText(16, 13 + line_height * (i + 1) - painter.fontMetrics().descent(), line)
+        painter.end()
+
+        # Hand the context back in the state the scene expects
+        glUseProgram(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        self.apply_gl_state()
+        self.apply_projection()
+
     def draw_grid(self, size=10, step=1):
         glDisable(GL_LIGHTING)
         glColor3f(0.3, 0.3, 0.3)
@@ -148,11 +379,11 @@ class ModularViewport(QOpenGLWidget):
             self.camera_pan.setX(self.camera_pan.x() + delta.x())
             self.camera_pan.setY(self.camera_pan.y() - delta.y())
             
-        self.update()
+        self.governor.begin_interaction()
 
     def wheelEvent(self, event):
         # Zoom
         delta = event.angleDelta().y()
         self.camera_dist -= delta * 0.01
         self.camera_dist = max(0.1, min(self.camera_dist, 50.0))
-        self.update()
+        self.governor.begin_interaction()
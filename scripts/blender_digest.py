@@ -0,0 +1,169 @@
+import bpy
+import sys
+import os
+import json
+import time
+import argparse
+
+# Product modules live next to this script; they are only imported when requested
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from blender_extract_validate import (
+    import_fbx, collect_data, load_category_bones, write_payload, emit_result, GEOMETRY_KEYS
+)
+
+# Scene-mutating products (the thumbnail hides objects and adds a camera) run last
+PRODUCTS = ("stats", "geometry", "rig", "anim", "thumbnail")
+
+PRODUCT_FILES = {
+    "stats": "stats.json",
+    "geometry": "geometry.mlpx",
+    "rig": "rig.json",
+    "anim": "animation.clip",
+    "thumbnail": "thumbnail.png",
+}
+
+def write_stats(data, out_path):
+    """Writes the extraction result without geometry, as ci_validate.py reads it."""
+    stats = {key: value for key, value in data.items() if key != "meshes"}
+    stats["meshes"] = [
+        {key: value for key, value in mesh.items() if key not in GEOMETRY_KEYS}
+        for mesh in data.get("meshes", [])
+    ]
+    with open(out_path, "w") as f:
+        json.dump(stats, f, indent=2)
+
+def digest_extraction(fbx_path, requested, out_dir, bone_filter):
+    """stats and geometry share one pass over the scene."""
+    data = collect_data(fbx_path, stats_only="geometry" not in requested, bone_filter=bone_filter)
+    if "error" in data:
+        raise RuntimeError(data["error"])
+    written = {}
+    if "stats" in requested:
+        write_stats(data, os.path.join(out_dir, PRODUCT_FILES["stats"]))
+        written["stats"] = PRODUCT_FILES["stats"]
+    if "geometry" in requested:
+        write_payload(data, os.path.join(out_dir, PRODUCT_FILES["geometry"]))
+        written["geometry"] = PRODUCT_FILES["geometry"]
+    return written
+
+def digest_rig(out_dir):
+    from blender_extract_rig import collect_rig_transforms
+    bone_data = collect_rig_transforms()
+    if bone_data is None:
+        raise RuntimeError("No armature found")
+    with open(os.path.join(out_dir, PRODUCT_FILES["rig"]), "w") as f:
+        json.dump(bone_data, f, indent=2)
+    return PRODUCT_FILES["rig"]
+
+def digest_anim(out_dir, options):
+    from blender_extract_anim import bake_clips
+    paths = bake_clips(os.path.join(out_dir, PRODUCT_FILES["anim"]), **options)
+    if not paths:
+        raise RuntimeError("No animation baked")
+    return [os.path.relpath(path, out_dir) for path in paths] if len(paths) > 1 else os.path.relpath(paths[0], out_dir)
+
+def digest_thumbnail(out_dir, category):
+    if not category:
+        raise RuntimeError("The thumbnail product needs --category")
+    from blender_render_thumbnail import render_category_thumbnail
+    output_path = os.path.join(out_dir, PRODUCT_FILES["thumbnail"])
+    if not render_category_thumbnail(category, output_path):
+        raise RuntimeError("Thumbnail render failed")
+    return PRODUCT_FILES["thumbnail"]
+
+def digest(fbx_path, out_dir, products, category=None, bone_filter=None, anim_options=None):
+    """
+    Imports fbx_path once and writes each requested product into out_dir.
+    A failing product is recorded in the manifest without stopping the others.
+    Product paths in the manifest are relative to out_dir.
+    """
+    unknown = [name for name in products if name not in PRODUCTS]
+    if unknown:
+        raise ValueError(f"Unknown products: {', '.join(unknown)}")
+    requested = [name for name in PRODUCTS if name in products]
+    os.makedirs(out_dir, exist_ok=True)
+
+    manifest = {
+        "source": fbx_path,
+        "category": category,
+        "blender_version": bpy.app.version_string,
+        "products": {},
+    }
+
+    start = time.perf_counter()
+    error = import_fbx(fbx_path)
+    manifest["import_seconds"] = round(time.perf_counter() - start, 3)
+    if error:
+        manifest["error"] = error
+        for name in requested:
+            manifest["products"][name] = {"ok": False, "error": "Import failed"}
+        return manifest
+
+    if bone_filter is None and category:
+        bone_filter = load_category_bones(category)
+
+    def record(names, produce):
+        start = time.perf_counter()
+        try:
+            written = produce()
+        except Exception as e:
+            for name in names:
+                manifest["products"][name] = {"ok": False, "error": str(e)}
+            return
+        seconds = round(time.perf_counter() - start, 3)
+        if not isinstance(written, dict):
+            written = {names[0]: written}
+        for name, path in written.items():
+            manifest["products"][name] = {"ok": True, "path": path, "seconds": seconds}
+
+    extraction = [name for name in ("stats", "geometry") if name in requested]
+    if extraction:
+        record(extraction, lambda: digest_extraction(fbx_path, extraction, out_dir, bone_filter))
+    if "rig" in requested:
+        record(["rig"], lambda: digest_rig(out_dir))
+    if "anim" in requested:
+        record(["anim"], lambda: digest_anim(out_dir, anim_options or {}))
+    if "thumbnail" in requested:
+        record(["thumbnail"], lambda: digest_thumbnail(out_dir, category))
+
+    manifest["seconds"] = round(time.perf_counter() - start, 3)
+    return manifest
+
+if __name__ == "__main__":
+    try:
+        idx = sys.argv.index("--")
+        args = sys.argv[idx + 1:]
+
+        parser = argparse.ArgumentParser()
+        parser.add_argument("fbx_path", help="FBX file to digest")
+        parser.add_argument("--out-dir", required=True, help="Directory for the products and manifest.json")
+        parser.add_argument("--products", default="stats",
+                            help=f"Comma-separated subset of: {','.join(PRODUCTS)}")
+        parser.add_argument("--category", help="Part category (filters geometry, required for the thumbnail)")
+        parser.add_argument("--bones", help="Comma-separated bone whitelist (overrides --category)")
+        parser.add_argument("--action", action="append", dest="actions", help="Action to bake (repeatable)")
+        parser.add_argument("--all-actions", action="store_true")
+        parser.add_argument("--no-reduce", action="store_true")
+        parsed_args = parser.parse_known_args(args)[0]
+
+        products = [name.strip() for name in parsed_args.products.split(",") if name.strip()]
+        bone_filter = set(parsed_args.bones.split(",")) if parsed_args.bones else None
+        anim_options = {
+            "actions": parsed_args.actions,
+            "all_actions": parsed_args.all_actions,
+            "reduce": not parsed_args.no_reduce,
+        }
+
+        manifest = digest(parsed_args.fbx_path, parsed_args.out_dir, products, category=parsed_args.category,
+                          bone_filter=bone_filter, anim_options=anim_options)
+        with open(os.path.join(parsed_args.out_dir, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+        emit_result(manifest)
+        if "error" in manifest:
+            sys.exit(1)
+    except SystemExit:
+        raise
+    except Exception as e:
+        print(f"FAILED: {e}")
+        sys.exit(1)
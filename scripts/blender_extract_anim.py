@@ -1,56 +1,282 @@
 import bpy
 import sys
 import os
-import json
-import mathutils
+import re
+import argparse
+import numpy as np
 
-def extract_animation(fbx_path, output_json):
+# The clip format lives in the app package; Blender ships its own Python + NumPy
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app.core.animation_clip import (
+    AnimationClip, write_clip, reduce_keys,
+    quat_multiply, quat_rotate, decompose_matrices
+)
+
+EULER_ORDERS = {'XYZ', 'XZY', 'YXZ', 'YZX', 'ZXY', 'ZYX'}
+
+class FCurveBakeUnsupported(Exception):
+    """The rig uses something F-curve sampling can't reproduce; bake through the depsgraph."""
+
+def ordered_bones(armature):
+    """Pose bones with every parent before its children."""
+    ordered = []
+    def visit(bone):
+        ordered.append(armature.pose.bones[bone.name])
+        for child in bone.children:
+            visit(child)
+    for bone in armature.data.bones:
+        if bone.parent is None:
+            visit(bone)
+    return ordered
+
+def decompose(matrix):
+    loc, rot, scale = matrix.decompose()
+    return tuple(loc), (rot.w, rot.x, rot.y, rot.z), tuple(scale)
+
+def rest_relative(pb):
+    """Rest matrix of a bone relative to its parent's rest (armature space for roots)."""
+    rest = pb.bone.matrix_local
+    if pb.parent:
+        rest = pb.parent.bone.matrix_local.inverted() @ rest
+    return rest
+
+def sample_frames(start, end, step):
+    count = int(np.floor((end - start) / step + 1e-6)) + 1
+    return start + np.arange(count) * step
+
+def action_fcurves(action, armature):
+    """F-curves of an action, for both legacy and layered (Blender 4.4+) actions."""
+    layers = getattr(action, "layers", None)
+    if layers:
+        slot = armature.animation_data.action_slot if armature.animation_data else None
+        for layer in layers:
+            for strip in layer.strips:
+                channelbag = strip.channelbag(slot) if slot else None
+                if channelbag:
+                    return list(channelbag.fcurves)
+    return list(action.fcurves)
+
+def euler_to_quaternion(angles, order):
+    """(F, 4) wxyz quaternions from (F, 3) Euler angles in Blender's rotation order."""
+    half = angles / 2.0
+    axes = {}
+    for i, axis in enumerate("XYZ"):
+        q = np.zeros((len(angles), 4))
+        q[:, 0] = np.cos(half[:, i])
+        q[:, 1 + i] = np.sin(half[:, i])
+        axes[axis] = q
+    # 'XYZ' applies X first, so it is Z * Y * X
+    return quat_multiply(quat_multiply(axes[order[2]], axes[order[1]]), axes[order[0]])
+
+def check_fcurve_bakeable(armature):
+    if armature.animation_data and armature.animation_data.drivers:
+        raise FCurveBakeUnsupported("armature has drivers")
+    for pb in armature.pose.bones:
+        if pb.constraints:
+            raise FCurveBakeUnsupported(f"bone '{pb.name}' has constraints")
+        if pb.rotation_mode not in EULER_ORDERS and pb.rotation_mode != 'QUATERNION':
+            raise FCurveBakeUnsupported(f"bone '{pb.name}' uses {pb.rotation_mode} rotation")
+        if not pb.bone.use_inherit_rotation or pb.bone.inherit_scale != 'FULL':
+            raise FCurveBakeUnsupported(f"bone '{pb.name}' does not fully inherit its parent transform")
+
+def bake_fcurves(armature, action, pose_bones, frames):
+    """
+    Local TRS for every bone by evaluating the action's F-curves directly:
+    local = rest_relative @ basis, composed in NumPy. No scene.frame_set.
+    """
+    check_fcurve_bakeable(armature)
+    curves = {(fc.data_path, fc.array_index): fc for fc in action_fcurves(action, armature)}
+
+    def channel(pb, prop, size, default):
+        path = f'pose.bones["{bpy.utils.escape_identifier(pb.name)}"].{prop}'
+        values = np.empty((len(frames), size))
+        for i in range(size):
+            fc = curves.get((path, i))
+            values[:, i] = [fc.evaluate(f) for f in frames] if fc else default[i]
+        return values
+
+    count = len(frames)
+    translations = np.empty((count, len(pose_bones), 3))
+    rotations = np.empty((count, len(pose_bones), 4))
+    scales = np.empty((count, len(pose_bones), 3))
+    for b_idx, pb in enumerate(pose_bones):
+        location = channel(pb, "location", 3, pb.location)
+        if pb.rotation_mode == 'QUATERNION':
+            rotation = channel(pb, "rotation_quaternion", 4, pb.rotation_quaternion)
+            rotation /= np.linalg.norm(rotation, axis=1, keepdims=True)
+        else:
+            rotation = euler_to_quaternion(channel(pb, "rotation_euler", 3, pb.rotation_euler), pb.rotation_mode)
+        scale = channel(pb, "scale", 3, pb.scale)
+
+        # Rest matrices carry no scale, so rest @ basis stays a plain TRS
+        rest_t, rest_r, _ = decompose(rest_relative(pb))
+        rest_t = np.array(rest_t)
+        rest_r = np.array(rest_r)
+        translations[:, b_idx] = rest_t + quat_rotate(rest_r, location)
+        rotations[:, b_idx] = quat_multiply(rest_r, rotation)
+        scales[:, b_idx] = scale
+    return translations, rotations, scales
+
+def bake_depsgraph(armature, pose_bones, parents, frames):
+    """Local TRS for every bone by evaluating the scene, reading pose matrices in bulk."""
+    scene = bpy.context.scene
+    pose_order = {pb.name: i for i, pb in enumerate(armature.pose.bones)}
+    order = np.array([pose_order[pb.name] for pb in pose_bones])
+    parents = np.asarray(parents)
+    has_parent = parents >= 0
+
+    bone_count = len(armature.pose.bones)
+    flat = np.empty(bone_count * 16, dtype=np.float32)
+    local = np.empty((len(frames), len(pose_bones), 4, 4))
+    for f_idx, f in enumerate(frames):
+        frame = int(np.floor(f))
+        scene.frame_set(frame, subframe=float(f - frame))
+        armature.pose.bones.foreach_get("matrix", flat)
+        # RNA matrices are column-major
+        arm = flat.reshape(bone_count, 4, 4).transpose(0, 2, 1)[order].astype(np.float64)
+        local[f_idx] = arm
+        local[f_idx, has_parent] = np.linalg.inv(arm[parents[has_parent]]) @ arm[has_parent]
+
+    translations, rotations, scales = decompose_matrices(local.reshape(-1, 4, 4))
+    shape = (len(frames), len(pose_bones))
+    return translations.reshape(*shape, 3), rotations.reshape(*shape, 4), scales.reshape(*shape, 3)
+
+def bake_action(armature, action, pose_bones, parents, method, frame_start=None, frame_end=None, sample_rate=None):
+    scene = bpy.context.scene
+    fps = scene.render.fps / scene.render.fps_base
+    start = frame_start if frame_start is not None else float(action.frame_range[0])
+    end = frame_end if frame_end is not None else float(action.frame_range[1])
+    step = fps / sample_rate if sample_rate else 1.0
+    frames = sample_frames(start, end, step)
+
+    armature.animation_data_create()
+    armature.animation_data.action = action
+
+    if method == "fcurve":
+        try:
+            return frames, start, end, fps, bake_fcurves(armature, action, pose_bones, frames)
+        except FCurveBakeUnsupported as e:
+            print(f"F-curve bake unavailable for '{action.name}' ({e}); using depsgraph")
+    return frames, start, end, fps, bake_depsgraph(armature, pose_bones, parents, frames)
+
+def safe_filename(name):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_") or "clip"
+
+def extract_animation(fbx_path, output_path, actions=None, all_actions=False, method="fcurve",
+                      frame_start=None, frame_end=None, sample_rate=None,
+                      reduce=True, position_tolerance=1e-4, rotation_tolerance=0.05):
+    """
+    Bakes one or more actions from an FBX in a single Blender session.
+    A single clip is written to output_path; several clips are written into
+    the output_path directory as <action>.clip. Returns the written paths.
+    """
     bpy.ops.wm.read_factory_settings(use_empty=True)
     bpy.ops.import_scene.fbx(filepath=fbx_path)
-    
+    return bake_clips(
+        output_path, actions=actions, all_actions=all_actions, method=method,
+        frame_start=frame_start, frame_end=frame_end, sample_rate=sample_rate,
+        reduce=reduce, position_tolerance=position_tolerance, rotation_tolerance=rotation_tolerance
+    )
+
+def bake_clips(output_path, actions=None, all_actions=False, method="fcurve",
+               frame_start=None, frame_end=None, sample_rate=None,
+               reduce=True, position_tolerance=1e-4, rotation_tolerance=0.05):
+    """Same as extract_animation, for an FBX that is already imported into the scene."""
     armatures = [obj for obj in bpy.data.objects if obj.type == 'ARMATURE']
     if not armatures:
         print("Error: No armature found.")
-        return
-    
+        return []
+
     armature = armatures[0]
-    
-    scene = bpy.context.scene
-    start_frame = int(scene.frame_start)
-    end_frame = int(scene.frame_end)
-    
-    animation_data = {
-        "start_frame": start_frame,
-        "end_frame": end_frame,
-        "frames": []
-    }
-    
-    # We also want to know if the Armature has a world scale/rotation
-    arm_world_mat = list(armature.matrix_world.col[0]) + list(armature.matrix_world.col[1]) + \
-                    list(armature.matrix_world.col[2]) + list(armature.matrix_world.col[3])
-    animation_data["armature_world_matrix"] = arm_world_mat
-
-    for f in range(start_frame, end_frame + 1):
-        scene.frame_set(f)
-        frame_bones = {}
-        for bone in armature.pose.bones:
-            # Raw armature-space matrix
-            mat = bone.matrix
-            # Flatten to column-major for OpenGL
-            col_major = []
-            for i in range(4):
-                for j in range(4):
-                    col_major.append(mat[j][i])
-            frame_bones[bone.name] = col_major
-            
-        animation_data["frames"].append(frame_bones)
-        
-    with open(output_json, "w") as f:
-        json.dump(animation_data, f)
-    print(f"Animation extracted to {output_json}")
+
+    if actions:
+        selected = [bpy.data.actions[name] for name in actions]
+    elif all_actions:
+        selected = list(bpy.data.actions)
+    else:
+        active = armature.animation_data.action if armature.animation_data else None
+        selected = [active] if active else list(bpy.data.actions)[:1]
+    if not selected:
+        print("Error: No action found.")
+        return []
+
+    pose_bones = ordered_bones(armature)
+    index = {pb.name: i for i, pb in enumerate(pose_bones)}
+    parents = [index[pb.parent.name] if pb.parent else -1 for pb in pose_bones]
+
+    # Rest pose, local to the parent bone
+    bind = {"translation": [], "rotation": [], "scale": []}
+    for pb in pose_bones:
+        for key, value in zip(("translation", "rotation", "scale"), decompose(rest_relative(pb))):
+            bind[key].append(value)
+
+    mat = armature.matrix_world
+    arm_world_mat = [mat[j][i] for i in range(4) for j in range(4)] # column-major
+
+    if len(selected) > 1:
+        os.makedirs(output_path, exist_ok=True)
+
+    written = []
+    for action in selected:
+        frames, start, end, fps, (translations, rotations, scales) = bake_action(
+            armature, action, pose_bones, parents, method, frame_start, frame_end, sample_rate
+        )
+        clip = AnimationClip.from_samples(
+            [pb.name for pb in pose_bones], parents, frames,
+            translations, rotations, scales, bind,
+            start_frame=start,
+            end_frame=end,
+            fps=fps,
+            armature_world_matrix=arm_world_mat,
+            name=action.name
+        )
+        if reduce:
+            clip, report = reduce_keys(
+                clip,
+                position_tolerance=position_tolerance,
+                rotation_tolerance=rotation_tolerance,
+                scale_tolerance=position_tolerance
+            )
+            print(
+                f"Key reduction ({action.name}): {report['keys_before']} -> {report['keys_after']} keys "
+                f"({report['ratio']:.1f}x), max error {report['max_translation_error']:.2e} units / "
+                f"{report['max_rotation_error']:.3f} deg local, {report['max_world_error']:.2e} units armature space"
+            )
+
+        path = output_path
+        if len(selected) > 1:
+            path = os.path.join(output_path, safe_filename(action.name) + ".clip")
+        write_clip(path, clip, position_tolerance=position_tolerance, scale_tolerance=position_tolerance)
+        written.append(path)
+        print(f"Animation '{action.name}' extracted to {path} ({len(pose_bones)} bones, {len(frames)} samples)")
+    return written
 
 if __name__ == "__main__":
-    idx = sys.argv.index("--")
-    fbx_path = sys.argv[idx + 1]
-    output_json = sys.argv[idx + 2]
-    extract_animation(fbx_path, output_json)
+    parser = argparse.ArgumentParser(description="Extract FBX animations into binary clips.")
+    parser.add_argument("fbx_path")
+    parser.add_argument("output_path", help="Clip file, or a directory when several actions are extracted")
+    parser.add_argument("--action", action="append", dest="actions", help="Action to extract (repeatable)")
+    parser.add_argument("--all-actions", action="store_true", help="Extract every action in the file")
+    parser.add_argument("--method", choices=("fcurve", "depsgraph"), default="fcurve",
+                        help="Sample F-curves directly (falls back automatically) or evaluate the scene")
+    parser.add_argument("--frame-start", type=float, help="First frame to sample (default: action range)")
+    parser.add_argument("--frame-end", type=float, help="Last frame to sample (default: action range)")
+    parser.add_argument("--sample-rate", type=float, help="Samples per second (default: scene FPS)")
+    parser.add_argument("--no-reduce", action="store_true", help="Keep a key on every sample")
+    parser.add_argument("--position-tolerance", type=float, default=1e-4,
+                        help="Max translation/scale error per dropped key, in scene units")
+    parser.add_argument("--rotation-tolerance", type=float, default=0.05,
+                        help="Max rotation error per dropped key, in degrees")
+    args = parser.parse_args(sys.argv[sys.argv.index("--") + 1:])
+    extract_animation(
+        args.fbx_path, args.output_path,
+        actions=args.actions,
+        all_actions=args.all_actions,
+        method=args.method,
+        frame_start=args.frame_start,
+        frame_end=args.frame_end,
+        sample_rate=args.sample_rate,
+        reduce=not args.no_reduce,
+        position_tolerance=args.position_tolerance,
+        rotation_tolerance=args.rotation_tolerance
+    )
@@ -7,10 +7,20 @@ def extract_rig_transforms(fbx_path, output_json):
     bpy.ops.wm.read_factory_settings(use_empty=True)
     bpy.ops.import_scene.fbx(filepath=fbx_path)
     
-    armatures = [obj for obj in bpy.data.objects if obj.type == 'ARMATURE']
-    if not armatures:
+    bone_data = collect_rig_transforms()
+    if bone_data is None:
         print("Error: No armature found.")
         return
+        
+    with open(output_json, "w") as f:
+        json.dump(bone_data, f, indent=2)
+    print(f"Bones extracted to {output_json}")
+
+def collect_rig_transforms():
+    """Armature-space bone matrices of the imported scene, or None without an armature."""
+    armatures = [obj for obj in bpy.data.objects if obj.type == 'ARMATURE']
+    if not armatures:
+        return None
     
     armature = armatures[0]
     bone_data = {}
@@ -28,10 +38,7 @@ def extract_rig_transforms(fbx_path, output_json):
         bone_data[bone.name] = {
             "matrix": matrix_list 
         }
-        
-    with open(output_json, "w") as f:
-        json.dump(bone_data, f, indent=2)
-    print(f"Bones extracted to {output_json}")
+    return bone_data
 
 if __name__ == "__main__":
     try:
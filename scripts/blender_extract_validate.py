@@ -2,21 +2,131 @@ import bpy
 import sys
 import os
 import json
+import argparse
+import struct
+import numpy as np
 
-def extract_data(fbx_path):
+# Binary payload format, must match app/core/mesh_payload.py
+PAYLOAD_MAGIC = b"MLPX"
+PAYLOAD_VERSION = 1
+PAYLOAD_ALIGN = 16
+GEOMETRY_BUFFERS = (("vertices", "<f4"), ("normals", "<f4"), ("indices", "<u4"))
+GEOMETRY_KEYS = {key for key, _ in GEOMETRY_BUFFERS}
+
+def count_triangles(mesh_eval):
+    """Triangle count of an evaluated mesh without touching its vertices."""
+    loop_total = np.empty(len(mesh_eval.polygons), dtype=np.int64)
+    mesh_eval.polygons.foreach_get("loop_total", loop_total)
+    return int((loop_total - 2).sum())
+
+def extract_geometry(obj, mesh_eval):
+    """
+    Pulls bone-relative vertices, normals and triangle indices out of an
+    evaluated mesh using bulk foreach_get buffers instead of per-vertex Python.
+    Returns flat (vertices, normals, indices) arrays plus the triangle count.
+    """
+    bone_matrix_inv = None
+    if obj.parent and obj.parent_type == 'BONE':
+        # Armature-space matrix of the bone
+        # pose_bones[parent_bone].matrix is in armature space
+        bone_matrix_inv = obj.parent.pose.bones[obj.parent_bone].matrix.inverted()
+
+    # Use mesh_eval (has modifiers applied)
+    # vertices are in local space. obj.matrix_world converts to global.
+    # Armature might have its own orientation. 
+    # We want everything in Armature Space.
+    armature = obj.parent if obj.parent and obj.parent.type == 'ARMATURE' else None
+    if armature:
+        # v_arm = arm.inv @ obj.world @ v.co
+        matrix_to_arm = armature.matrix_world.inverted() @ obj.matrix_world
+    else:
+        matrix_to_arm = obj.matrix_world
+
+    n_verts = len(mesh_eval.vertices)
+    co = np.empty(n_verts * 3, dtype=np.float32)
+    vert_normals = np.empty(n_verts * 3, dtype=np.float32)
+    mesh_eval.vertices.foreach_get("co", co)
+    mesh_eval.vertices.foreach_get("normal", vert_normals)
+
+    # 1. Vertices: mesh -> armature -> bone space folded into one affine transform
+    if bone_matrix_inv:
+        to_local = bone_matrix_inv @ matrix_to_arm
+        normal_rot = bone_matrix_inv.to_quaternion().to_matrix() @ matrix_to_arm.to_quaternion().to_matrix()
+    else:
+        to_local = matrix_to_arm
+        normal_rot = matrix_to_arm.to_quaternion().to_matrix()
+
+    to_local = np.array(to_local, dtype=np.float32)
+    vertices = co.reshape(-1, 3) @ to_local[:3, :3].T + to_local[:3, 3]
+
+    # 2. Normals: rotation part only, as a single precomputed 3x3
+    normals = vert_normals.reshape(-1, 3) @ np.array(normal_rot, dtype=np.float32).T
+
+    # 3. Indices: fan triangulation of every polygon, done on the loop buffers.
+    # (loop_triangles picks its own split diagonals, so it would not reproduce
+    # the previous index output for quads/n-gons.)
+    n_polys = len(mesh_eval.polygons)
+    loop_start = np.empty(n_polys, dtype=np.int64)
+    loop_total = np.empty(n_polys, dtype=np.int64)
+    mesh_eval.polygons.foreach_get("loop_start", loop_start)
+    mesh_eval.polygons.foreach_get("loop_total", loop_total)
+    loop_verts = np.empty(len(mesh_eval.loops), dtype=np.int64)
+    mesh_eval.loops.foreach_get("vertex_index", loop_verts)
+
+    tri_count = int((loop_total - 2).sum()) if n_polys else 0
+
+    tris_per_poly = np.maximum(loop_total - 2, 0)
+    first_loop = np.repeat(loop_start, tris_per_poly)
+    # Position of each triangle within its polygon's fan: 1 .. loop_total - 2
+    fan_step = np.arange(len(first_loop)) - np.repeat(np.cumsum(tris_per_poly) - tris_per_poly, tris_per_poly) + 1
+    indices = np.stack([
+        loop_verts[first_loop],
+        loop_verts[first_loop + fan_step],
+        loop_verts[first_loop + fan_step + 1],
+    ], axis=1).astype(np.uint32)
+
+    return vertices.ravel(), normals.ravel(), indices.ravel(), tri_count
+
+def load_category_bones(category):
+    """Bone whitelist for a part category, read from validation/part_registry.json."""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    registry_path = os.path.join(script_dir, "..", "validation", "part_registry.json")
+    with open(registry_path, "r") as f:
+        registry = json.load(f)
+    if category not in registry:
+        raise ValueError(f"Unknown part category: {category}")
+    return set(registry[category].get("bones", []))
+
+def import_fbx(fbx_path):
+    """Resets to an empty scene and imports an FBX. Returns an error message or None."""
     bpy.ops.wm.read_factory_settings(use_empty=True)
     
     try:
         bpy.ops.import_scene.fbx(filepath=fbx_path)
     except Exception as e:
-        return {"error": str(e)}
+        return str(e)
+    return None
 
+def extract_data(fbx_path, stats_only=False, bone_filter=None):
+    """
+    Imports an FBX and extracts armature, mesh stats and (unless stats_only)
+    bone-relative geometry. With a bone_filter, meshes parented to other bones
+    only report their counts, so category filtering can still report them.
+    """
+    error = import_fbx(fbx_path)
+    if error:
+        return {"error": error}
+    return collect_data(fbx_path, stats_only=stats_only, bone_filter=bone_filter)
+
+def collect_data(fbx_path, stats_only=False, bone_filter=None):
+    """Same as extract_data, for an FBX that is already imported into the scene."""
     data = {
         "filename": os.path.basename(fbx_path),
         "tris": 0,
         "meshes": [],
         "armature_name": "",
-        "bones": []
+        "bones": [],
+        "stats_only": stats_only
     }
 
     # Identify Armature
@@ -27,93 +137,162 @@ def extract_data(fbx_path):
         data["bones"] = [bone.name for bone in armature.data.bones]
 
     # Process Meshes
+    # One evaluated depsgraph (modifiers applied) serves every mesh in the file
+    dg = bpy.context.evaluated_depsgraph_get()
     total_tris = 0
     for obj in bpy.data.objects:
         if obj.type == 'MESH':
-            # Get triangle count (evaluated depsgraph for modifiers)
-            dg = bpy.context.evaluated_depsgraph_get()
             obj_eval = obj.evaluated_get(dg)
             mesh_eval = obj_eval.to_mesh()
-            tri_count = sum(len(p.vertices) - 2 for p in mesh_eval.polygons)
-            total_tris += tri_count
             
             # Find parent bone if any
             parent_bone = ""
-            bone_matrix_inv = None
             if obj.parent and obj.parent_type == 'BONE':
                 parent_bone = obj.parent_bone
-                # Armature-space matrix of the bone
-                # pose_bones[parent_bone].matrix is in armature space
-                bone_matrix_inv = obj.parent.pose.bones[parent_bone].matrix.inverted()
-            
-            # Extract Vertex Data for Viewport
-            vertices = []
-            normals = []
-            indices = []
-            
-            # Use mesh_eval (has modifiers applied)
-            # vertices are in local space. obj.matrix_world converts to global.
-            # Armature might have its own orientation. 
-            # We want everything in Armature Space.
-            armature = obj.parent if obj.parent and obj.parent.type == 'ARMATURE' else None
-            if armature:
-                # v_arm = arm.inv @ obj.world @ v.co
-                matrix_to_arm = armature.matrix_world.inverted() @ obj.matrix_world
-            else:
-                matrix_to_arm = obj.matrix_world
-            
-            for v in mesh_eval.vertices:
-                # 1. Transform vertex to armature space
-                v_arm = matrix_to_arm @ v.co
-                
-                # 2. If parented to bone, transform to bone-relative space
-                if bone_matrix_inv:
-                    v_local = bone_matrix_inv @ v_arm
-                else:
-                    v_local = v_arm
-                
-                # 3. Use raw Blender Z-up coordinates
-                vertices.extend([v_local.x, v_local.y, v_local.z])
-                
-                # Transform normal too (rotation part only)
-                n_arm = matrix_to_arm.to_quaternion() @ v.normal
-                if bone_matrix_inv:
-                    n_local = bone_matrix_inv.to_quaternion() @ n_arm
-                else:
-                    n_local = n_arm
-                normals.extend([n_local.x, n_local.y, n_local.z])
-            
-            for p in mesh_eval.polygons:
-                # Simple fan triangulation for n-gons
-                if len(p.vertices) >= 3:
-                    for i in range(1, len(p.vertices) - 1):
-                        indices.extend([p.vertices[0], p.vertices[i], p.vertices[i+1]])
 
-            data["meshes"].append({
+            mesh_data = {
                 "name": obj.name,
                 "parent_bone": parent_bone,
-                "tris": tri_count,
+                "tris": 0,
                 # location/rotation in JSON are now less relevant but kept for debug
                 "location": list(obj.location),
                 "rotation": list(obj.rotation_euler),
                 "scale": list(obj.scale),
-                "vertices": vertices,
-                "normals": normals,
-                "indices": indices
-            })
+            }
+
+            # Loose meshes stay in scope, the runner keeps them for every category
+            in_scope = bone_filter is None or not parent_bone or parent_bone in bone_filter
+
+            if stats_only or not in_scope:
+                # Validation only needs counts; skip every per-vertex buffer
+                tri_count = count_triangles(mesh_eval)
+            else:
+                vertices, normals, indices, tri_count = extract_geometry(obj, mesh_eval)
+                mesh_data["vertices"] = vertices
+                mesh_data["normals"] = normals
+                mesh_data["indices"] = indices
+
+            mesh_data["tris"] = tri_count
+            total_tris += tri_count
+            data["meshes"].append(mesh_data)
             
             obj_eval.to_mesh_clear()
 
     data["tris"] = total_tris
     return data
 
+def _json_default(value):
+    # Geometry stays in NumPy arrays until it is serialized
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def emit_result(result):
+    """Prints one result record between the markers the app and CI look for."""
+    print("RESULT_START")
+    print(json.dumps(result, default=_json_default))
+    print("RESULT_END")
+
+def write_payload(data, out_path):
+    """
+    Writes the extraction result as a compact binary payload: a JSON header
+    with the mesh metadata followed by raw little-endian geometry buffers.
+    """
+    header = {key: value for key, value in data.items() if key != "meshes"}
+    header["meshes"] = []
+    blobs = []
+    offset = 0
+
+    for mesh in data["meshes"]:
+        entry = {key: value for key, value in mesh.items() if key not in GEOMETRY_KEYS}
+        entry["buffers"] = {}
+        for key, dtype in GEOMETRY_BUFFERS:
+            if key not in mesh:
+                continue
+            array = np.ascontiguousarray(mesh[key], dtype=dtype)
+            blob = array.tobytes()
+            blob += b"\0" * (-len(blob) % PAYLOAD_ALIGN)
+            entry["buffers"][key] = {"offset": offset, "count": int(array.size), "dtype": dtype}
+            blobs.append(blob)
+            offset += len(blob)
+        header["meshes"].append(entry)
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    preamble_size = struct.calcsize("<4sII")
+    header_bytes += b" " * (-(preamble_size + len(header_bytes)) % PAYLOAD_ALIGN)
+
+    with open(out_path, "wb") as f:
+        f.write(struct.pack("<4sII", PAYLOAD_MAGIC, PAYLOAD_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for blob in blobs:
+            f.write(blob)
+
+def emit_or_write(result, out_path=None):
+    """Sends the result over stdout as JSON, or as a binary payload at out_path."""
+    if out_path and "error" not in result:
+        write_payload(result, out_path)
+        record = {"payload": out_path}
+        for key in ("source", "index"):
+            if key in result:
+                record[key] = result[key]
+        emit_result(record)
+    else:
+        emit_result(result)
+
+def extract_batch(manifest_path, stats_only=False):
+    """
+    Extracts every FBX listed in a manifest within this one Blender session.
+    The manifest is a JSON list of paths or {"fbx_path": ..., "category": ..., "out": ...}
+    entries; one result record is emitted per entry, in manifest order and
+    tagged with the entry's position as "index". Entries
+    with a category only get geometry for that limb, and entries with an
+    "out" path get a binary payload instead of inline JSON.
+    """
+    with open(manifest_path, "r") as f:
+        entries = json.load(f)
+
+    for index, entry in enumerate(entries):
+        if isinstance(entry, str):
+            entry = {"fbx_path": entry}
+        fbx_path = entry["fbx_path"]
+
+        # extract_data resets to an empty scene before each import
+        try:
+            bone_filter = load_category_bones(entry["category"]) if entry.get("category") else None
+            result = extract_data(fbx_path, stats_only=stats_only, bone_filter=bone_filter)
+        except Exception as e:
+            result = {"error": str(e)}
+
+        result["source"] = fbx_path
+        result["index"] = index
+        if entry.get("category"):
+            result["category"] = entry["category"]
+        emit_or_write(result, entry.get("out"))
+
 if __name__ == "__main__":
     try:
         idx = sys.argv.index("--")
-        fbx_path = sys.argv[idx + 1]
-        result = extract_data(fbx_path)
-        print("RESULT_START")
-        print(json.dumps(result))
-        print("RESULT_END")
+        args = sys.argv[idx + 1:]
+
+        parser = argparse.ArgumentParser()
+        parser.add_argument("fbx_path", nargs="?", help="FBX file to extract")
+        parser.add_argument("--batch", help="JSON manifest of FBX files to extract in one session")
+        parser.add_argument("--out", help="Write a binary payload here instead of JSON on stdout")
+        parser.add_argument("--stats-only", action="store_true",
+                            help="Only report names, parent bones and counts (no geometry)")
+        parser.add_argument("--category", help="Only extract geometry for meshes on this category's bones")
+        parser.add_argument("--bones", help="Comma-separated bone whitelist (overrides --category)")
+        parsed_args = parser.parse_known_args(args)[0]
+
+        if parsed_args.batch:
+            extract_batch(parsed_args.batch, stats_only=parsed_args.stats_only)
+        else:
+            bone_filter = None
+            if parsed_args.bones:
+                bone_filter = set(parsed_args.bones.split(","))
+            elif parsed_args.category:
+                bone_filter = load_category_bones(parsed_args.category)
+            result = extract_data(parsed_args.fbx_path, stats_only=parsed_args.stats_only, bone_filter=bone_filter)
+            emit_or_write(result, parsed_args.out)
     except Exception as e:
         print(f"FAILED: {e}")
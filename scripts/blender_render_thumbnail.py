@@ -220,6 +220,15 @@ def render_thumbnail(fbx_path, category, output_path):
         print(f"  ERROR: Failed to import FBX: {e}")
         return False
     
+    return render_category_thumbnail(category, output_path)
+
+
+def render_category_thumbnail(category, output_path):
+    """
+    Isolates, frames and renders one category of the already imported scene.
+    Hides objects and adds a camera and lights, so run it after anything else
+    that reads the scene.
+    """
     # 3. Load registry and isolate meshes
     print("  Isolating category meshes...")
     registry = load_part_registry()
@@ -0,0 +1,118 @@
+"""
+Persistent Blender Worker — request loop for the warm worker pool.
+
+Runs inside a long-lived `blender --background` process and executes the
+pipeline scripts (extract, export, render...) on demand, so callers skip
+Blender's cold start on every job.
+
+Protocol (one JSON object per line):
+    stdin  -> {"op": "run", "id": 3, "script": "...", "blend_file": null, "args": [...]}
+              {"op": "ping", "id": 4}
+              {"op": "quit"}
+    stdout <- @@MLP_WORKER@@ {"id": 3, "returncode": 0, "stdout": "...", "stderr": "..."}
+
+Anything Blender itself prints is ignored by the pool; only lines carrying
+the response prefix are part of the protocol.
+
+Usage (launched by app/services/blender_pool.py):
+    blender --background --python blender_worker.py
+"""
+
+import bpy
+import sys
+import io
+import json
+import runpy
+import contextlib
+import traceback
+
+RESPONSE_PREFIX = "@@MLP_WORKER@@ "
+
+
+def send(message):
+    """Writes a protocol line to the real stdout (never the job capture)."""
+    sys.__stdout__.write(RESPONSE_PREFIX + json.dumps(message) + "\n")
+    sys.__stdout__.flush()
+
+
+def run_job(job):
+    """Runs one pipeline script as if Blender had been launched for it."""
+    script_path = job["script"]
+    argv = [sys.argv[0], "--background", "--python", script_path]
+    if job.get("args"):
+        argv.append("--")
+        argv.extend(job["args"])
+
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    returncode = 0
+    saved_argv = sys.argv
+
+    try:
+        # Match the scene a fresh `blender --background [file]` would start with
+        if job.get("blend_file"):
+            bpy.ops.wm.open_mainfile(filepath=job["blend_file"])
+        else:
+            bpy.ops.wm.read_homefile()
+
+        sys.argv = argv
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                runpy.run_path(script_path, run_name="__main__")
+            except SystemExit as e:
+                if e.code is None:
+                    returncode = 0
+                elif isinstance(e.code, int):
+                    returncode = e.code
+                else:
+                    print(e.code, file=sys.stderr)
+                    returncode = 1
+            except Exception:
+                # A cold Blender would print this and still exit 0; report it as a failure instead
+                traceback.print_exc()
+                returncode = 1
+    except Exception:
+        stderr.write(traceback.format_exc())
+        returncode = 1
+    finally:
+        sys.argv = saved_argv
+
+    return {
+        "returncode": returncode,
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue(),
+    }
+
+
+def main():
+    send({"event": "ready", "version": bpy.app.version_string})
+
+    while True:
+        line = sys.stdin.readline()
+        if not line:
+            break  # Pool closed our stdin
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            job = json.loads(line)
+        except ValueError:
+            continue
+
+        op = job.get("op")
+        if op == "quit":
+            break
+        elif op == "ping":
+            send({"id": job.get("id"), "pong": True})
+        elif op == "run":
+            try:
+                result = run_job(job)
+            except Exception:
+                result = {"returncode": 1, "stdout": "", "stderr": traceback.format_exc()}
+            result["id"] = job.get("id")
+            send(result)
+
+
+if __name__ == "__main__":
+    main()
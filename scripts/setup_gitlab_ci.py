@@ -2,12 +2,15 @@
 GitLab CI Setup Script — Pushes pipeline configuration and validation scripts 
 to the MechAssets GitLab repository.
 
-Pushes 5 files to the remote repo's `main` branch via the GitLab Files API:
+Pushes these files to the remote repo's `main` branch via the GitLab Files API:
   1. .gitlab-ci.yml          — The real CI pipeline
-  2. scripts/blender_extract_validate.py — Headless Blender FBX extractor
-  3. scripts/ci_validate.py  — Standalone validation runner
-  4. scripts/blender_render_thumbnail.py — Headless thumbnail renderer
-  5. validation/part_registry.json — Part definitions + tri limits
+  2. scripts/blender_digest.py — Single-import digest (stats + thumbnail in one Blender run)
+  3. scripts/blender_extract_validate.py — Headless Blender FBX extractor
+  4. scripts/ci_validate.py  — Standalone validation runner
+  5. scripts/blender_render_thumbnail.py — Headless thumbnail renderer
+  6. validation/part_registry.json — Part definitions + tri limits
+  7. validation/*.py, validation/rules/*.py — The rule engine and rules
+     ci_validate.py runs (the same ones the app runs)
 
 Usage:
     python scripts/setup_gitlab_ci.py
@@ -15,6 +18,7 @@ Usage:
 
 import os
 import sys
+import glob
 import requests
 from dotenv import load_dotenv
 
@@ -34,7 +38,8 @@ validate_asset:
   rules:
     - if: '$CI_COMMIT_REF_NAME =~ /^submit\//'
   before_script:
-    - apt-get update -qq && apt-get install -y -qq python3 git > /dev/null 2>&1
+    # Ubuntu 18.04's python3 is 3.6; the validation package needs 3.7+ (dataclasses)
+    - apt-get update -qq && apt-get install -y -qq python3.8 git > /dev/null 2>&1
   script:
     - |
       echo "============================================"
@@ -61,17 +66,16 @@ validate_asset:
       echo "FBX Path: $FBX_PATH"
       echo ""
       
-      # Step 1: Extract FBX data using headless Blender
-      echo "Running Blender extraction..."
-      EXTRACT_OUTPUT=$(blender --background --python scripts/blender_extract_validate.py -- "$FBX_PATH" 2>/dev/null)
+      # Step 1: Import the FBX once in headless Blender and digest both the stats
+      # validation needs and the thumbnail; generate_thumbnail publishes the latter
+      echo "Running Blender digest..."
+      mkdir -p digest
+      blender --background --python scripts/blender_digest.py -- "$FBX_PATH" --out-dir digest --products stats,thumbnail --category "$CATEGORY" > digest/blender.log 2>&1 || true
       
-      # Save extracted JSON to a temp file
-      echo "$EXTRACT_OUTPUT" | sed -n '/RESULT_START/,/RESULT_END/p' | grep -v 'RESULT_START\|RESULT_END' > /tmp/extracted.json
-      
-      if [ ! -s /tmp/extracted.json ]; then
+      if [ ! -s digest/stats.json ]; then
         echo "❌ ERROR: Blender extraction produced no output"
         echo "Blender output:"
-        echo "$EXTRACT_OUTPUT"
+        cat digest/blender.log
         exit 1
       fi
       
@@ -79,26 +83,34 @@ validate_asset:
       echo ""
       
       # Step 2: Run validation checks
-      python3 scripts/ci_validate.py /tmp/extracted.json "$CATEGORY" "$FBX_PATH"
+      python3.8 scripts/ci_validate.py digest/stats.json "$CATEGORY" "$FBX_PATH"
+  artifacts:
+    when: always
+    paths:
+      - digest/
+    expire_in: 1 day
 
-# ── Stage 2: Generate a thumbnail of the validated part ──────────
+# ── Stage 2: Publish the thumbnail of a validated part ──────────
 generate_thumbnail:
   stage: thumbnail
-  image: nytimes/blender:3.3.1-cpu-ubuntu18.04
+  image: alpine:latest
   rules:
     - if: '$CI_COMMIT_REF_NAME =~ /^submit\//'
+  # Only runs once validate_asset has passed; the thumbnail comes from its digest/ artifact
+  needs:
+    - job: validate_asset
+      artifacts: true
   before_script:
-    - apt-get update -qq && apt-get install -y -qq python3 git > /dev/null 2>&1
+    - apk add --no-cache git
   script:
     - |
       BRANCH="$CI_COMMIT_REF_NAME"
       CATEGORY=$(echo "$BRANCH" | cut -d'/' -f2)
       VERSION=$(echo "$BRANCH" | cut -d'/' -f3)
-      FBX_PATH="parts/${CATEGORY}/${VERSION}/${CATEGORY}_${VERSION}.fbx"
       THUMB_PATH="parts/${CATEGORY}/${VERSION}/thumbnail.png"
       
-      echo "Generating thumbnail for $CATEGORY $VERSION..."
-      blender --background --python scripts/blender_render_thumbnail.py -- "$FBX_PATH" "$CATEGORY" "$THUMB_PATH" 2>/dev/null || true
+      echo "Publishing thumbnail for $CATEGORY $VERSION..."
+      cp digest/thumbnail.png "$THUMB_PATH" 2>/dev/null || true
       
       if [ ! -f "$THUMB_PATH" ]; then
         echo "WARNING: Thumbnail generation failed, continuing without thumbnail."
@@ -277,6 +289,11 @@ def setup_gitlab_ci():
             "content": GITLAB_CI_YAML.strip(),
             "message": "CI: Update pipeline with real validation + thumbnail generation",
         },
+        {
+            "remote_path": "scripts/blender_digest.py",
+            "local_path": os.path.join(project_root, "scripts", "blender_digest.py"),
+            "message": "CI: Add single-import Blender digest script",
+        },
         {
             "remote_path": "scripts/blender_extract_validate.py",
             "local_path": os.path.join(project_root, "scripts", "blender_extract_validate.py"),
@@ -299,6 +316,18 @@ def setup_gitlab_ci():
         },
     ]
     
+    # The validation package ci_validate.py imports; stdlib-only, so it runs as-is in CI
+    validation_sources = sorted(
+        glob.glob(os.path.join(project_root, "validation", "*.py"))
+        + glob.glob(os.path.join(project_root, "validation", "rules", "*.py"))
+    )
+    for local_path in validation_sources:
+        files_to_push.append({
+            "remote_path": os.path.relpath(local_path, project_root).replace(os.sep, "/"),
+            "local_path": local_path,
+            "message": "CI: Sync validation rules",
+        })
+    
     print(f"\n{'=' * 50}")
     print(f"  Pushing CI Pipeline to GitLab")
     print(f"  Project ID: {project_id}")
@@ -0,0 +1,243 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from app.core.animation_clip import (
+    AnimationClip, encode_clip, decode_clip, compose_matrices, slerp, reduce_keys,
+    write_clip, map_clip, clip_from_arrays, decode_arrays, decompose_matrices, quat_multiply, quat_rotate
+)
+
+def axis_angle(axis, angle):
+    axis = np.asarray(axis, dtype=np.float64) / np.linalg.norm(axis)
+    return np.concatenate(([np.cos(angle / 2)], axis * np.sin(angle / 2)))
+
+def build_clip():
+    """Three-bone chain swinging its middle bone 90 degrees over frames 1..3."""
+    frames = [1, 2, 3]
+    bones = ["Hips", "Spine", "Head"]
+    translations = np.tile([[0, 0, 0], [0, 1, 0], [0, 1, 0]], (3, 1, 1))
+    rotations = np.tile(axis_angle([0, 0, 1], 0), (3, 3, 1))
+    for f, angle in enumerate([0, np.pi / 4, np.pi / 2]):
+        rotations[f, 1] = axis_angle([0, 0, 1], angle)
+    scales = np.ones((3, 3, 3))
+    bind = {
+        "translation": translations[0],
+        "rotation": rotations[0],
+        "scale": scales[0],
+    }
+    return AnimationClip.from_samples(bones, [-1, 0, 1], frames, translations, rotations, scales, bind,
+                                      start_frame=1, end_frame=3, fps=30.0)
+
+class TestAnimationClip(unittest.TestCase):
+    def test_forward_kinematics_at_keys(self):
+        clip = build_clip()
+        world = clip.evaluate(3)
+        # Spine turned 90 degrees about Z, so Head's offset (0, 1, 0) points along -X
+        np.testing.assert_allclose(world[2][:3, 3], [-1, 1, 0], atol=1e-6)
+        np.testing.assert_allclose(clip.evaluate(1)[2][:3, 3], [0, 2, 0], atol=1e-6)
+
+    def test_slerp_between_keys(self):
+        clip = build_clip()
+        _, rotations, _ = clip.local_pose(1.5)
+        np.testing.assert_allclose(rotations[1], axis_angle([0, 0, 1], np.pi / 8), atol=1e-6)
+        # Outside the key range the ends are held
+        np.testing.assert_allclose(clip.local_pose(10)[1][1], axis_angle([0, 0, 1], np.pi / 2), atol=1e-6)
+
+    def test_slerp_takes_short_path(self):
+        q0 = axis_angle([0, 1, 0], 0.1)[None]
+        q1 = -axis_angle([0, 1, 0], 0.3)[None]
+        np.testing.assert_allclose(np.abs(slerp(q0, q1, np.array([0.5]))[0]),
+                                   np.abs(axis_angle([0, 1, 0], 0.2)), atol=1e-6)
+
+    def test_round_trip(self):
+        clip = build_clip()
+        decoded = decode_clip(encode_clip(clip))
+        self.assertEqual(decoded.bone_names, clip.bone_names)
+        self.assertEqual(decoded.frame_count, 3)
+        # Rotations are stored as int16 components
+        np.testing.assert_allclose(decoded.evaluate(2.5), clip.evaluate(2.5), atol=1e-4)
+        pose = decoded.pose(3)
+        np.testing.assert_allclose(pose["Head"], clip.evaluate(3)[2].T.reshape(16), atol=1e-4)
+
+    def test_mapped_bind_pose_and_clip(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, ignore_errors=True)
+        path = os.path.join(tmp_dir, "animation.clip")
+        clip = build_clip()
+        write_clip(path, clip)
+
+        header, arrays = map_clip(path)
+        bind = clip_from_arrays(header, arrays, keys=False)
+        # The rest pose ignores keys entirely
+        np.testing.assert_allclose(bind.evaluate(3), clip.bind_matrices(), atol=1e-6)
+        np.testing.assert_allclose(clip_from_arrays(header, arrays).evaluate(3), clip.evaluate(3), atol=1e-4)
+
+    def test_keys_are_quantized(self):
+        frames = np.arange(10, 130)
+        rng = np.random.default_rng(3)
+        translations = np.cumsum(rng.normal(scale=0.5, size=(120, 2, 3)), axis=0)
+        translations[:, 1] = [0, 5, 0] # A constant channel quantizes exactly
+        rotations = np.tile([1.0, 0, 0, 0], (120, 2, 1))
+        bind = {"translation": translations[0], "rotation": rotations[0], "scale": np.ones((2, 3))}
+        clip = AnimationClip.from_samples(["Root", "Child"], [-1, 0], frames, translations, rotations,
+                                          np.ones((120, 2, 3)), bind, start_frame=10, end_frame=129)
+
+        header, arrays = decode_arrays(encode_clip(clip))
+        self.assertEqual(arrays["translation_times"].dtype, np.uint16)
+        self.assertEqual(arrays["translation_values"].dtype, np.uint16)
+        self.assertEqual(arrays["rotation_values"].dtype, np.int16)
+        np.testing.assert_array_equal(arrays["translation_exact"], [0, 0])
+        decoded = clip_from_arrays(header, arrays)
+        np.testing.assert_array_equal(decoded.channels["translation"][1], clip.channels["translation"][1])
+        extent = np.ptp(translations[:, 0], axis=0)
+        error = np.abs(decoded.channels["translation"][2][:120] - clip.channels["translation"][2][:120])
+        self.assertTrue(np.all(error <= extent / 65535 + 1e-5))
+        self.assertLessEqual(error.max(), 1e-4)
+        np.testing.assert_array_equal(decoded.channels["translation"][2][120:], clip.channels["translation"][2][120:])
+
+        # A range too wide for uint16 steps within the tolerance keeps float32 keys
+        wide = AnimationClip(clip.bone_names, clip.parents, clip.bind_pose,
+                             dict(clip.channels, translation=(clip.channels["translation"][0],
+                                                               clip.channels["translation"][1],
+                                                               clip.channels["translation"][2] * [50, 1, 1])),
+                             start_frame=10, end_frame=129)
+        header, arrays = decode_arrays(encode_clip(wide, position_tolerance=1e-4))
+        np.testing.assert_array_equal(arrays["translation_exact"], [1, 0])
+        decoded = clip_from_arrays(header, arrays)
+        np.testing.assert_array_equal(decoded.channels["translation"][2],
+                                      wide.channels["translation"][2].astype(np.float32))
+
+        # Keys between frames keep float times
+        reduced = AnimationClip(clip.bone_names, clip.parents, clip.bind_pose,
+                                {key: (offsets, times + 0.5, values) for key, (offsets, times, values) in clip.channels.items()},
+                                start_frame=10, end_frame=130)
+        _, arrays = decode_arrays(encode_clip(reduced))
+        self.assertEqual(arrays["translation_times"].dtype, np.float32)
+
+    def test_baked_pose_matches_evaluation(self):
+        clip = build_clip()
+        tensor = clip.bake()
+        self.assertEqual(tensor.shape, (3, 3, 4, 4))
+        self.assertEqual(tensor.dtype, np.float32)
+        np.testing.assert_allclose(clip.baked_pose(2.0)[2], clip.pose(3)["Head"], atol=1e-6)
+        # Between frames the matrices blend linearly
+        expected = (clip.evaluate(1) + clip.evaluate(2)) / 2
+        np.testing.assert_allclose(clip.baked_pose(0.5).reshape(3, 4, 4).transpose(0, 2, 1), expected, atol=1e-6)
+
+    def test_compose_matches_scale_then_rotate(self):
+        m = compose_matrices(np.array([[1.0, 2.0, 3.0]]), axis_angle([1, 0, 0], np.pi / 2)[None], np.array([[2.0, 2.0, 2.0]]))
+        np.testing.assert_allclose(m[0] @ [0, 1, 0, 1], [1, 2, 5, 1], atol=1e-6)
+
+class TestTransformHelpers(unittest.TestCase):
+    def test_decompose_inverts_compose(self):
+        rng = np.random.default_rng(3)
+        rotations = rng.normal(size=(50, 4))
+        rotations /= np.linalg.norm(rotations, axis=1, keepdims=True)
+        translations = rng.normal(size=(50, 3))
+        scales = rng.uniform(0.5, 2.0, size=(50, 3))
+
+        t, r, s = decompose_matrices(compose_matrices(translations, rotations, scales))
+        np.testing.assert_allclose(t, translations, atol=1e-9)
+        np.testing.assert_allclose(s, scales, atol=1e-9)
+        # q and -q are the same rotation
+        np.testing.assert_allclose(np.abs(np.einsum("ij,ij->i", r, rotations)), 1.0, atol=1e-9)
+
+    def test_rest_times_basis_as_trs(self):
+        rest = axis_angle([0, 0, 1], np.pi / 2)
+        basis = axis_angle([1, 0, 0], np.pi / 2)
+        combined = compose_matrices(np.array([[0.0, 1.0, 0.0]]), rest[None], np.ones((1, 3)))[0] @ \
+            compose_matrices(np.array([[1.0, 0.0, 0.0]]), basis[None], np.ones((1, 3)))[0]
+        # rest @ basis == T(rest_t + rest_r * basis_t) R(rest_r * basis_r)
+        translation = np.array([0.0, 1.0, 0.0]) + quat_rotate(rest, np.array([1.0, 0.0, 0.0]))
+        rotation = quat_multiply(rest, basis)
+        np.testing.assert_allclose(compose_matrices(translation[None], rotation[None], np.ones((1, 3)))[0], combined, atol=1e-9)
+
+class TestKeyReduction(unittest.TestCase):
+    def test_linear_motion_and_constant_channels_collapse(self):
+        frames = np.arange(60)
+        translations = np.zeros((60, 2, 3))
+        translations[:, 1, 0] = frames * 0.1 # Straight line: only the end keys matter
+        rotations = np.tile([1.0, 0, 0, 0], (60, 2, 1))
+        rotations[:, 0] = [axis_angle([0, 0, 1], a) for a in np.linspace(0, np.pi, 60)]
+        bind = {"translation": np.zeros((2, 3)), "rotation": rotations[0], "scale": np.ones((2, 3))}
+        clip = AnimationClip.from_samples(["Root", "Child"], [-1, 0], frames, translations, rotations,
+                                          np.ones((60, 2, 3)), bind, start_frame=0, end_frame=59)
+
+        reduced, report = reduce_keys(clip)
+        offsets = reduced.channels["translation"][0]
+        self.assertEqual(list(np.diff(offsets)), [1, 2])
+        self.assertEqual(list(np.diff(reduced.channels["scale"][0])), [1, 1])
+        # Constant-speed rotation about one axis is exactly what slerp rebuilds
+        self.assertEqual(np.diff(reduced.channels["rotation"][0])[0], 2)
+        self.assertGreater(report["ratio"], 20)
+
+        for frame in (0, 17.5, 59):
+            np.testing.assert_allclose(reduced.evaluate(frame), clip.evaluate(frame), atol=1e-4)
+
+    def test_error_stays_within_tolerance(self):
+        frames = np.arange(100)
+        rng = np.random.default_rng(7)
+        translations = np.cumsum(rng.normal(scale=0.01, size=(100, 1, 3)), axis=0)
+        rotations = np.tile([1.0, 0, 0, 0], (100, 1, 1))
+        bind = {"translation": np.zeros((1, 3)), "rotation": rotations[0], "scale": np.ones((1, 3))}
+        clip = AnimationClip.from_samples(["Root"], [-1], frames, translations, rotations,
+                                          np.ones((100, 1, 3)), bind, start_frame=0, end_frame=99)
+
+        reduced, report = reduce_keys(clip, position_tolerance=0.02)
+        self.assertLess(report["keys_after"], report["keys_before"])
+        # The report describes the clip as written, quantization included
+        stored = decode_clip(encode_clip(reduced, position_tolerance=0.02))
+        deviation = max(np.linalg.norm(stored.evaluate(f)[0, :3, 3] - translations[f, 0]) for f in frames)
+        self.assertLessEqual(deviation, 0.02 + 1e-4)
+        self.assertAlmostEqual(report["max_translation_error"], deviation, places=5)
+        self.assertAlmostEqual(report["max_world_error"], deviation, places=5)
+
+    def test_report_includes_quantization(self):
+        # Already minimal, so every reported error comes from quantization
+        frames = np.arange(3)
+        translations = np.array([[[0, 0, 0]], [[10, 0, 0]], [[1 / 3, 0, 0]]], dtype=np.float64)
+        rotations = np.stack([axis_angle([0, 0, 1], a) for a in (0.0, 1.0, 0.0)])[:, None]
+        bind = {"translation": np.zeros((1, 3)), "rotation": rotations[0], "scale": np.ones((1, 3))}
+        clip = AnimationClip.from_samples(["Root"], [-1], frames, translations, rotations,
+                                          np.ones((3, 1, 3)), bind, start_frame=0, end_frame=2)
+
+        reduced, report = reduce_keys(clip, position_tolerance=1e-3)
+        self.assertEqual(len(reduced.channels["translation"][1]), 3)
+        stored = decode_clip(encode_clip(reduced, position_tolerance=1e-3))
+        step_error = np.abs(stored.channels["translation"][2] - clip.channels["translation"][2]).max()
+        self.assertGreater(step_error, 0.0)
+        self.assertAlmostEqual(report["max_translation_error"], step_error, places=6)
+        self.assertGreater(report["max_rotation_error"], 0.0)
+
+class TestAnimationLoadWorker(unittest.TestCase):
+    def test_clip_ready_leaves_qthread_finished_alone(self):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PySide6.QtWidgets import QApplication
+        from app.ui.viewport import AnimationLoadWorker
+        # A QApplication, so widget tests sharing the process can reuse it
+        app = QApplication.instance() or QApplication([])
+
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, ignore_errors=True)
+        path = os.path.join(tmp_dir, "animation.clip")
+        write_clip(path, build_clip())
+
+        worker = AnimationLoadWorker(path)
+        loaded, finished = [], []
+        worker.clip_ready.connect(lambda clip, error: loaded.append((clip, error)))
+        worker.finished.connect(lambda: finished.append(worker.isFinished()))
+        worker.start()
+        self.assertTrue(worker.wait(10000))
+        app.processEvents()
+
+        self.assertEqual(len(loaded), 1)
+        self.assertEqual(loaded[0][1], "")
+        self.assertEqual(loaded[0][0].frame_count, 3)
+        # QThread.finished fires once run() has returned
+        self.assertEqual(finished, [True])
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,130 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import stat
+import shutil
+import tempfile
+import threading
+import unittest
+from app.services.blender_pool import BlenderWorkerPool, RESPONSE_PREFIX
+from app.services.blender_launcher import BlenderLauncher
+
+# Stands in for `blender --background --python blender_worker.py`: speaks the
+# worker protocol, and a job's first argument can make it crash or hang
+FAKE_BLENDER = f"""#!{sys.executable}
+import json, os, sys, time
+if "--version" in sys.argv:
+    print("Blender 9.9.9 (hash 0000)")
+    sys.exit(0)
+def send(message):
+    sys.stdout.write({RESPONSE_PREFIX!r} + json.dumps(message) + "\\n")
+    sys.stdout.flush()
+send({{"event": "ready", "version": "9.9.9"}})
+for line in sys.stdin:
+    job = json.loads(line)
+    if job["op"] == "quit":
+        break
+    if job["op"] == "ping":
+        send({{"id": job["id"], "pong": True}})
+        continue
+    args = job.get("args") or [""]
+    if args[0] == "crash":
+        os._exit(1)
+    if args[0] == "hang":
+        time.sleep(30)
+    send({{"id": job["id"], "returncode": 0, "stdout": "pid %d" % os.getpid(), "stderr": ""}})
+"""
+
+BROKEN_BLENDER = f"""#!{sys.executable}
+import sys
+sys.exit(1)
+"""
+
+@unittest.skipIf(os.name == "nt", "Fake worker relies on a shebang executable")
+class TestBlenderWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.pools = []
+
+    def tearDown(self):
+        for pool in self.pools:
+            pool.shutdown()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def make_pool(self, source=FAKE_BLENDER, **kwargs):
+        path = os.path.join(self.tmp, f"blender{len(self.pools)}")
+        with open(path, "w") as f:
+            f.write(source)
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+        pool = BlenderWorkerPool(path, startup_timeout=10.0, **kwargs)
+        self.pools.append(pool)
+        return pool
+
+    def run_concurrently(self, pool, job_args):
+        results = [None] * len(job_args)
+        def run(i):
+            results[i] = pool.run_python_script("job.py", extra_args=job_args[i])
+        threads = [threading.Thread(target=run, args=(i,), daemon=True) for i in range(len(job_args))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=20)
+        self.assertFalse(any(thread.is_alive() for thread in threads), "A caller is stuck waiting for a worker")
+        return results
+
+    def test_waiting_caller_gets_a_replacement_for_a_recycled_worker(self):
+        pool = self.make_pool(size=1, max_jobs_per_worker=1)
+        results = self.run_concurrently(pool, [["a"], ["b"], ["c"]])
+        self.assertEqual([code for code, _, _ in results], [0, 0, 0])
+        # Every job ran on its own process
+        self.assertEqual(len({out for _, out, _ in results}), 3)
+
+    def test_crash_and_timeout_free_their_slot(self):
+        pool = self.make_pool(size=1, job_timeout=1.0)
+        results = self.run_concurrently(pool, [["crash"], ["hang"], ["ok"], ["ok"]])
+        codes = sorted(code for code, _, _ in results)
+        self.assertEqual(codes, [-1, -1, 0, 0])
+
+    def test_workers_are_reused(self):
+        pool = self.make_pool(size=1)
+        first = pool.run_python_script("job.py", extra_args=["a"])
+        second = pool.run_python_script("job.py", extra_args=["b"])
+        self.assertEqual(first[1], second[1])
+        self.assertEqual(pool.version, "9.9.9")
+
+    def test_spawn_failure_does_not_strand_waiters(self):
+        pool = self.make_pool(BROKEN_BLENDER, size=1)
+        results = self.run_concurrently(pool, [["a"], ["b"]])
+        for code, _, error in results:
+            self.assertEqual(code, -1)
+            self.assertIn("Could not start Blender worker", error)
+
+    def test_shutdown_wakes_waiters(self):
+        pool = self.make_pool(size=1, job_timeout=5.0)
+        outcome = []
+        busy = threading.Thread(target=lambda: pool.run_python_script("job.py", extra_args=["hang"]), daemon=True)
+        busy.start()
+        while not pool._spawned:
+            threading.Event().wait(0.01)
+        waiter = threading.Thread(target=lambda: outcome.append(pool.run_python_script("job.py")), daemon=True)
+        waiter.start()
+        threading.Event().wait(0.2)
+        pool.shutdown()
+        waiter.join(timeout=5)
+        self.assertFalse(waiter.is_alive())
+        self.assertIn("shut down", outcome[0][2])
+        busy.join(timeout=10)
+
+    def test_launcher_version_does_not_depend_on_pool_state(self):
+        path = self.make_pool(size=1).executable_path
+        cold = BlenderLauncher(path).version
+        warm_launcher = BlenderLauncher(path, pool_size=1)
+        self.pools.append(warm_launcher.pool)
+        # Once a worker has booted, the pool knows bpy's version string too
+        warm_launcher.run_python_script(os.path.abspath(__file__), extra_args=["a"])
+        self.assertEqual(warm_launcher.pool.version, "9.9.9")
+        self.assertEqual(warm_launcher.version, cold)
+        self.assertEqual(cold, "Blender 9.9.9 (hash 0000)")
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
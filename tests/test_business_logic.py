@@ -99,5 +99,20 @@ class TestBusinessLogic(unittest.TestCase):
         # Restore push
         __import__("git").remote.Remote.push = original_push
 
+    def test_03_digest_single_import(self):
+        fbx_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data", "RightArm_v001.fbx"))
+        if not os.path.exists(fbx_path):
+            self.skipTest("RightArm_v001.fbx not found for test")
+
+        manifest, error = self.validation.digest(fbx_path, ["stats", "geometry", "rig"], category="RightArm")
+        self.assertIsNone(error)
+        for name in ("stats", "geometry", "rig"):
+            self.assertTrue(manifest["products"][name]["ok"], manifest["products"][name])
+            self.assertTrue(os.path.exists(manifest["products"][name]["path"]))
+
+        fbx_data, error = self.validation.load_digest_geometry(manifest)
+        self.assertIsNone(error)
+        self.assertEqual(fbx_data.filename, "RightArm_v001.fbx")
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -0,0 +1,81 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import math
+import unittest
+import numpy as np
+from app.core.culling import frustum_planes, spheres_outside, boxes_outside, transform_bounds
+from app.core.mesh_manager import MeshManager
+
+def perspective(fov_y, aspect, near, far):
+    """Column-major matrix matching gluPerspective."""
+    f = 1.0 / math.tan(math.radians(fov_y) / 2.0)
+    m = np.zeros((4, 4), dtype=np.float32)
+    m[0, 0] = f / aspect
+    m[1, 1] = f
+    m[2, 2] = (far + near) / (near - far)
+    m[2, 3] = 2 * far * near / (near - far)
+    m[3, 2] = -1.0
+    return m.T.ravel()
+
+def translation(x, y, z):
+    m = np.identity(4, dtype=np.float32)
+    m[:3, 3] = (x, y, z)
+    return m.T.ravel()
+
+def cube(offset):
+    corners = np.array([[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype=np.float32) + offset
+    return {"name": f"cube{offset}", "vertices": corners.ravel(), "normals": corners.ravel(), "indices": [0, 1, 2, 1, 3, 2]}
+
+class TestFrustum(unittest.TestCase):
+    def setUp(self):
+        self.planes = frustum_planes(perspective(45.0, 1.0, 0.1, 200.0))
+
+    def test_spheres(self):
+        centers = np.array([[0, 0, -5], [0, 0, 5], [100, 0, -5], [0, 0, -300], [2.5, 0, -5]], dtype=np.float32)
+        radii = np.array([1, 1, 1, 1, 1], dtype=np.float32)
+        np.testing.assert_array_equal(spheres_outside(self.planes, centers, radii), [False, True, True, True, False])
+
+    def test_boxes_are_tighter_than_spheres(self):
+        # A long thin box beside the frustum: its sphere reaches in, the box does not
+        centers = np.array([[5.0, 0.0, -5.0]], dtype=np.float32)
+        extents = np.array([[0.1, 0.1, 4.0]], dtype=np.float32)
+        self.assertFalse(spheres_outside(self.planes, centers, np.linalg.norm(extents, axis=1))[0])
+        self.assertTrue(boxes_outside(self.planes, centers, extents)[0])
+
+    def test_transform_bounds_scales_and_rotates(self):
+        transform = np.identity(4, dtype=np.float32)
+        transform[:3, :3] = [[0, -2, 0], [2, 0, 0], [0, 0, 2]] # 90 degrees about Z, scaled by 2
+        transform[:3, 3] = (1, 2, 3)
+        centers, extents, radii = transform_bounds(
+            transform[None], np.array([[1.0, 0.0, 0.0]]), np.array([[1.0, 0.5, 0.25]]), np.array([1.5])
+        )
+        np.testing.assert_allclose(centers, [[1, 4, 3]])
+        np.testing.assert_allclose(extents, [[1.0, 2.0, 0.5]])
+        np.testing.assert_allclose(radii, [3.0])
+
+class TestMeshManagerCulling(unittest.TestCase):
+    def test_meshes_outside_are_culled_by_pose(self):
+        manager = MeshManager()
+        first, second = cube((0, 0, 0)), cube((0, 0, 0))
+        second["parent_bone"] = "Hand"
+        manager.add_part_meshes("RightArm", [first, second])
+        manager.set_skeleton(["Hand"])
+        projection = perspective(45.0, 1.0, 0.1, 200.0)
+
+        manager.prepare_frame(translation(0, 0, -5), projection, pixel_scale=300.0)
+        self.assertEqual(manager.cull_stats, {"drawn": 2, "culled": 0})
+
+        # Posing the hand far to the side moves only its bounds out of view
+        manager.set_pose_matrices(translation(50, 0, 0)[None])
+        manager.prepare_frame(translation(0, 0, -5), projection, pixel_scale=300.0)
+        self.assertEqual(manager.cull_stats, {"drawn": 1, "culled": 1})
+        self.assertEqual([m.culled for m in manager.parts["RightArm"]], [False, True])
+
+        # Hidden meshes count as neither
+        manager.parts["RightArm"][0].visible = False
+        manager.prepare_frame(translation(0, 0, -5), projection, pixel_scale=300.0)
+        self.assertEqual(manager.cull_stats, {"drawn": 0, "culled": 1})
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
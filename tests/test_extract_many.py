@@ -0,0 +1,123 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import json
+import struct
+import shutil
+import tempfile
+import unittest
+from app.core.mesh_payload import PAYLOAD_MAGIC, PAYLOAD_VERSION
+from app.services.extraction_cache import ExtractionCache
+from app.services.validation_service import ValidationService
+
+class StubLauncher:
+    """
+    Answers batch extractions the way blender_extract_validate.py does, and
+    geometry digests the way blender_digest.py does, without Blender.
+    """
+    version = "Blender 0.0 (stub)"
+
+    def __init__(self):
+        self.manifests = []
+        self.digests = []
+
+    def run_python_script(self, script_path, blend_file=None, extra_args=None):
+        if "--out-dir" in extra_args:
+            return self._digest(extra_args)
+        with open(extra_args[extra_args.index("--batch") + 1]) as f:
+            manifest = json.load(f)
+        self.manifests.append(manifest)
+        lines = []
+        for index, entry in enumerate(manifest):
+            category = entry.get("category")
+            record = {
+                "filename": os.path.basename(entry["fbx_path"]), "tris": 1, "armature_name": "Armature",
+                "bones": [], "meshes": [{"name": f"{category}_mesh", "parent_bone": "", "tris": 1}],
+                "source": entry["fbx_path"], "index": index,
+            }
+            lines += ["RESULT_START", json.dumps(record), "RESULT_END"]
+        return 0, "\n".join(lines), ""
+
+    def _digest(self, extra_args):
+        fbx_path = extra_args[0]
+        out_dir = extra_args[extra_args.index("--out-dir") + 1]
+        category = extra_args[extra_args.index("--category") + 1]
+        self.digests.append((fbx_path, category))
+        header = json.dumps({
+            "filename": os.path.basename(fbx_path), "tris": 1, "armature_name": "Armature", "bones": [],
+            "meshes": [{"name": f"{category}_mesh", "parent_bone": "", "tris": 1}]
+        }).encode("utf-8")
+        with open(os.path.join(out_dir, "geometry.mlpx"), "wb") as f:
+            f.write(struct.pack("<4sII", PAYLOAD_MAGIC, PAYLOAD_VERSION, len(header)) + header)
+        manifest = {"source": fbx_path, "category": category,
+                    "products": {"geometry": {"ok": True, "path": "geometry.mlpx"}}}
+        return 0, "\n".join(["RESULT_START", json.dumps(manifest), "RESULT_END"]), ""
+
+class TestExtractMany(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.launcher = StubLauncher()
+        self.service = ValidationService(self.launcher, ExtractionCache(os.path.join(self.tmp_dir, "cache")))
+        self.fbx_path = os.path.join(self.tmp_dir, "Robot_v001.fbx")
+        with open(self.fbx_path, "wb") as f:
+            f.write(b"fbx-bytes")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_same_file_for_several_categories(self):
+        paths = [self.fbx_path, self.fbx_path, self.fbx_path]
+        extracted = self.service.extract_many(paths, categories=["RightArm", "Head", "RightArm"], stats_only=True)
+        names = [fbx_data.meshes[0]["name"] for fbx_data, error in extracted]
+        self.assertEqual(names, ["RightArm_mesh", "Head_mesh", "RightArm_mesh"])
+        # The repeated (file, category) pair is extracted once
+        self.assertEqual([entry["category"] for entry in self.launcher.manifests[0]], ["RightArm", "Head"])
+
+    def test_validate_many_matches_inputs(self):
+        items = [(self.fbx_path, "RightArm"), (self.fbx_path, "Head")]
+        validated = self.service.validate_many(items, stats_only=True)
+        self.assertEqual(len(validated), 2)
+        for (results, filtered, error), (_, category) in zip(validated, items):
+            self.assertIsNone(error)
+            self.assertEqual(filtered.meshes[0]["name"], f"{category}_mesh")
+            self.assertTrue(results)
+
+    def test_digest_geometry_shares_the_extraction_cache(self):
+        fbx_data, error = self.service.digest_geometry(self.fbx_path, category="RightArm")
+        self.assertIsNone(error)
+        self.assertEqual(fbx_data.meshes[0]["name"], "RightArm_mesh")
+        # The payload moved into the cache and the digest's temp dir is gone
+        leftovers = [name for name in os.listdir(self.service.cache.cache_dir) if name.startswith("mlp_")]
+        self.assertEqual(leftovers, [])
+
+        # Later loads of the same file and category, either way, are cache hits
+        for load in (self.service.digest_geometry, self.service.extract_fbx):
+            fbx_data, error = load(self.fbx_path, category="RightArm")
+            self.assertIsNone(error)
+            self.assertEqual(fbx_data.meshes[0]["name"], "RightArm_mesh")
+        self.assertEqual(self.launcher.digests, [(self.fbx_path, "RightArm")])
+        self.assertEqual(self.launcher.manifests, [])
+
+    def test_assembly_and_restored_parts_share_one_batch(self):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from app.ui.main_window import RobotAssemblyWorker
+        part_path = os.path.join(self.tmp_dir, "RightArm_v001.fbx")
+        with open(part_path, "wb") as f:
+            f.write(b"part-bytes")
+
+        worker = RobotAssemblyWorker(self.service, self.fbx_path, parts={"RightArm": part_path})
+        refreshed, finished = [], []
+        worker.parts_refreshed.connect(refreshed.append)
+        worker.finished.connect(lambda assembly, error: finished.append(error))
+        worker.run()
+
+        self.assertEqual(len(self.launcher.manifests), 1)
+        self.assertEqual([entry["fbx_path"] for entry in self.launcher.manifests[0]], [self.fbx_path, part_path])
+        self.assertEqual(self.launcher.manifests[0][1]["category"], "RightArm")
+        self.assertEqual(finished, [""])
+        path, fbx_data = refreshed[0]["RightArm"]
+        self.assertEqual(path, part_path)
+        self.assertEqual(fbx_data.filename, "RightArm_v001.fbx")
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
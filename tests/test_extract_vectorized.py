@@ -0,0 +1,52 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import glob
+import unittest
+import numpy as np
+from app.services.validation_service import ValidationService
+
+class TestVectorizedExtraction(unittest.TestCase):
+    """Checks the foreach_get extractor against the original per-vertex implementation."""
+
+    @classmethod
+    def setUpClass(cls):
+        from app.services.blender_launcher import BlenderLauncher
+        try:
+            cls.launcher = BlenderLauncher()
+        except Exception as e:
+            raise unittest.SkipTest(f"Failed to init services: {e}")
+
+        tests_dir = os.path.dirname(os.path.abspath(__file__))
+        cls.reference_script = os.path.join(tests_dir, "blender_extract_reference.py")
+        cls.extract_script = os.path.join(tests_dir, "..", "scripts", "blender_extract_validate.py")
+        cls.fbx_files = sorted(glob.glob(os.path.join(tests_dir, "..", "data", "*.fbx")))
+
+    def _extract(self, script, fbx_path):
+        code, stdout, stderr = self.launcher.run_python_script(script, extra_args=[fbx_path])
+        self.assertEqual(code, 0, stderr)
+        records = ValidationService._parse_records(stdout)
+        self.assertTrue(records, f"No result record for {fbx_path}")
+        return records[0]
+
+    def test_matches_reference_output(self):
+        self.assertTrue(self.fbx_files, "No FBX files found in data/")
+        for fbx_path in self.fbx_files:
+            with self.subTest(fbx=os.path.basename(fbx_path)):
+                expected = self._extract(self.reference_script, fbx_path)
+                actual = self._extract(self.extract_script, fbx_path)
+
+                for key in ("filename", "tris", "armature_name", "bones"):
+                    self.assertEqual(actual[key], expected[key])
+                self.assertEqual(len(actual["meshes"]), len(expected["meshes"]))
+
+                for got, want in zip(actual["meshes"], expected["meshes"]):
+                    self.assertEqual(got["name"], want["name"])
+                    self.assertEqual(got["parent_bone"], want["parent_bone"])
+                    self.assertEqual(got["tris"], want["tris"])
+                    self.assertEqual(got["indices"], want["indices"])
+                    np.testing.assert_allclose(got["vertices"], want["vertices"], rtol=1e-5, atol=1e-5)
+                    np.testing.assert_allclose(got["normals"], want["normals"], rtol=1e-5, atol=1e-5)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,112 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import json
+import struct
+import shutil
+import tempfile
+import unittest
+from app.core.mesh_payload import PAYLOAD_MAGIC, PAYLOAD_VERSION
+from app.services.extraction_cache import ExtractionCache
+
+def write_payload(path, filename, padding=0):
+    header = json.dumps({
+        "filename": filename, "tris": 0, "meshes": [], "armature_name": "", "bones": []
+    }).encode("utf-8") + b" " * padding
+    with open(path, "wb") as f:
+        f.write(struct.pack("<4sII", PAYLOAD_MAGIC, PAYLOAD_VERSION, len(header)) + header)
+
+class TestExtractionCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = ExtractionCache(cache_dir=os.path.join(self.tmp_dir, "cache"), max_bytes=4096)
+        self.fbx_path = os.path.join(self.tmp_dir, "RightArm_v001.fbx")
+        with open(self.fbx_path, "wb") as f:
+            f.write(b"fbx-bytes")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _payload(self, name, padding=0):
+        path = os.path.join(self.tmp_dir, name + ".mlpx")
+        write_payload(path, name, padding)
+        return path
+
+    def test_hits_do_not_rewrite_the_index_until_flushed(self):
+        key = self.cache.make_key(self.fbx_path, "script-hash", "Blender 4.5", "full")
+        self.cache.put(key, self._payload("RightArm_v001.fbx"))
+        saved_at = os.stat(self.cache.index_path).st_mtime_ns
+        os.utime(self.cache.index_path, ns=(saved_at - 10**9, saved_at - 10**9))
+
+        for _ in range(5):
+            self.assertIsNotNone(self.cache.get(key))
+        self.assertEqual(os.stat(self.cache.index_path).st_mtime_ns, saved_at - 10**9)
+
+        self.cache.flush()
+        with open(self.cache.index_path) as f:
+            on_disk = json.load(f)["entries"][key]["last_access"]
+        self.assertEqual(on_disk, self.cache.index["entries"][key]["last_access"])
+
+    def test_round_trip(self):
+        key = self.cache.make_key(self.fbx_path, "script-hash", "Blender 4.5", "full")
+        self.assertIsNone(self.cache.get(key))
+
+        self.cache.put(key, self._payload("RightArm_v001.fbx"))
+        self.assertEqual(self.cache.get(key)["filename"], "RightArm_v001.fbx")
+
+        # The index survives a restart
+        reopened = ExtractionCache(cache_dir=self.cache.cache_dir)
+        self.assertEqual(reopened.get(key)["filename"], "RightArm_v001.fbx")
+
+    def test_put_moves_payload_from_another_filesystem(self):
+        # /dev/shm is usually a tmpfs, so a plain rename into the cache would fail
+        shm = "/dev/shm"
+        if os.path.isdir(shm) and os.access(shm, os.W_OK):
+            source_dir = tempfile.mkdtemp(dir=shm)
+        else:
+            source_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, source_dir, ignore_errors=True)
+        payload = os.path.join(source_dir, "RightArm_v001.mlpx")
+        write_payload(payload, "RightArm_v001.fbx")
+
+        key = self.cache.make_key(self.fbx_path, "script-hash", "Blender 4.5", "full")
+        path = self.cache.put(key, payload)
+        self.assertEqual(os.path.dirname(path), self.cache.cache_dir)
+        self.assertFalse(os.path.exists(payload))
+        self.assertEqual(self.cache.get(key)["filename"], "RightArm_v001.fbx")
+
+    def test_key_tracks_content_and_mode(self):
+        full = self.cache.make_key(self.fbx_path, "script-hash", "Blender 4.5", "full")
+        stats = self.cache.make_key(self.fbx_path, "script-hash", "Blender 4.5", "stats")
+        self.assertNotEqual(full, stats)
+        self.assertEqual(full, self.cache.make_key(self.fbx_path, "script-hash", "Blender 4.5", "full"))
+
+        with open(self.fbx_path, "wb") as f:
+            f.write(b"edited-fbx-bytes")
+        self.assertNotEqual(full, self.cache.make_key(self.fbx_path, "script-hash", "Blender 4.5", "full"))
+
+    def test_unchanged_file_is_not_rehashed(self):
+        first = self.cache.file_hash(self.fbx_path)
+        # Same size and mtime: the pre-check trusts the recorded hash
+        self.cache.index["files"][os.path.abspath(self.fbx_path)]["sha256"] = "recorded"
+        self.assertEqual(self.cache.file_hash(self.fbx_path), "recorded")
+        self.assertNotEqual(first, "recorded")
+
+    def test_lru_eviction_respects_budget(self):
+        keys = []
+        for name in ("a", "b", "c"):
+            key = self.cache.make_key(self.fbx_path, name)
+            self.cache.put(key, self._payload(name, padding=1500))
+            keys.append(key)
+            # Touch the first entry so "b" becomes the least recently used
+            if name == "b":
+                self.cache.get(keys[0])
+
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertIsNotNone(self.cache.get(keys[2]))
+        total = sum(e["size"] for e in self.cache.index["entries"].values())
+        self.assertLessEqual(total, self.cache.max_bytes)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
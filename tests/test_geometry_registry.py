@@ -0,0 +1,100 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import time
+import unittest
+import numpy as np
+from app.core.geometry_registry import GeometryRegistry, geometry_key
+from app.core.mesh_manager import MeshManager
+
+class FakeEntry:
+    def __init__(self, key, nbytes):
+        self.key = key
+        self.nbytes = nbytes
+        self.released = False
+
+    def release(self):
+        self.released = True
+
+    def buffer_bytes(self):
+        return 0 if self.released else self.nbytes
+
+def triangle(name, parent_bone="", offset=0.0):
+    return {"name": name, "parent_bone": parent_bone, "vertices": np.array([0, 0, 0, 1, 0, 0, 0, 1, 0]) + offset,
+            "normals": [0, 0, 1] * 3, "indices": [0, 1, 2]}
+
+class TestGeometryRegistry(unittest.TestCase):
+    def test_key_follows_content_not_dtype(self):
+        a = geometry_key([0, 0, 0, 1, 0, 0, 0, 1, 0], [0, 0, 1] * 3, [0, 1, 2])
+        b = geometry_key(np.array([0, 0, 0, 1, 0, 0, 0, 1, 0], dtype=np.float64), np.tile([0, 0, 1], 3), np.arange(3))
+        c = geometry_key([0, 0, 0, 1, 0, 0, 0, 1, 0], [0, 0, 1] * 3, [0, 2, 1])
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+
+    def test_references_and_keep_alive(self):
+        registry = GeometryRegistry(keep_alive_bytes=100)
+        first = registry.add(FakeEntry("a", 60))
+        self.assertIs(registry.acquire("a"), first)
+        registry.release(first)
+        registry.release(first)
+        # Unreferenced but kept alive, and revived by the next acquire
+        self.assertFalse(first.released)
+        self.assertEqual(registry.stats()["idle"], 1)
+        self.assertIs(registry.acquire("a"), first)
+        registry.release(first)
+
+        # Going over the budget releases the least recently used entry
+        second = registry.add(FakeEntry("b", 60))
+        registry.release(second)
+        self.assertTrue(first.released)
+        self.assertFalse(second.released)
+        self.assertIsNone(registry.acquire("a"))
+
+    def test_adding_a_duplicate_keeps_the_first(self):
+        registry = GeometryRegistry()
+        first = registry.add(FakeEntry("a", 10))
+        duplicate = FakeEntry("a", 10)
+        self.assertIs(registry.add(duplicate), first)
+        self.assertTrue(duplicate.released)
+        self.assertEqual(registry.refs["a"], 2)
+
+class TestMeshManagerSharing(unittest.TestCase):
+    def test_identical_meshes_share_geometry(self):
+        manager = MeshManager()
+        manager.add_part_meshes("LeftHand", [triangle("Thumb", "L1"), triangle("Index", "L2"), triangle("Palm", "", 2.0)])
+        manager.add_part_meshes("RightHand", [triangle("Thumb", "R1")])
+        left, right = manager.parts["LeftHand"], manager.parts["RightHand"]
+        self.assertIs(left[0].geometry, left[1].geometry)
+        self.assertIs(left[0].geometry, right[0].geometry)
+        self.assertIsNot(left[0].geometry, left[2].geometry)
+        self.assertEqual(manager.registry.refs[left[0].key], 3)
+        self.assertEqual(manager.geometry_stats()["unique"], 2)
+
+        manager.clear_part("RightHand")
+        self.assertEqual(manager.registry.refs[left[0].key], 2)
+
+    def test_reloaded_version_reuses_geometry_and_lods(self):
+        xs, ys = np.meshgrid(np.linspace(0, 1, 16), np.linspace(0, 1, 16))
+        vertices = np.stack([xs.ravel(), ys.ravel(), np.zeros(xs.size)], axis=1).ravel()
+        grid = np.arange(256).reshape(16, 16)
+        corners = np.stack([grid[:-1, :-1], grid[:-1, 1:], grid[1:, 1:], grid[1:, :-1]], axis=-1).reshape(-1, 4)
+        indices = np.concatenate([corners[:, [0, 1, 2]], corners[:, [0, 2, 3]]], axis=1).ravel()
+        version = [{"name": "Plate", "vertices": vertices, "normals": [0, 0, 1] * 256, "indices": indices}]
+
+        manager = MeshManager()
+        manager.add_part_meshes("Chest", version)
+        geometry = manager.parts["Chest"][0].geometry
+        deadline = time.time() + 10
+        while manager.lod_jobs and time.time() < deadline:
+            manager.collect_lods()
+            time.sleep(0.01)
+        self.assertIsNotNone(geometry.lod_errors)
+
+        manager.add_part_meshes("Chest", [triangle("Other")])
+        manager.add_part_meshes("Chest", version)
+        # The geometry came back from the keep-alive cache with its chain; nothing to rebuild
+        self.assertIs(manager.parts["Chest"][0].geometry, geometry)
+        self.assertNotIn("Chest", manager.lod_jobs)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
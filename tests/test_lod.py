@@ -0,0 +1,82 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import time
+import unittest
+import numpy as np
+from app.core.lod import cluster_mesh, build_lod_chain, select_levels
+from app.core.mesh_manager import MeshManager
+
+def grid_mesh(size=32):
+    """A flat size x size quad grid in the XY plane, two triangles per quad."""
+    xs, ys = np.meshgrid(np.linspace(0, 1, size + 1), np.linspace(0, 1, size + 1))
+    vertices = np.stack([xs.ravel(), ys.ravel(), np.zeros(xs.size)], axis=1).astype(np.float32)
+    normals = np.tile(np.array([0, 0, 1], dtype=np.float32), (len(vertices), 1))
+    corner = (np.arange(size)[:, None] * (size + 1) + np.arange(size)[None, :]).ravel()
+    quads = np.stack([corner, corner + 1, corner + size + 1, corner + 1, corner + size + 2, corner + size + 1], axis=1)
+    return vertices.ravel(), normals.ravel(), quads.astype(np.uint32).ravel()
+
+class TestLodGeneration(unittest.TestCase):
+    def test_clustering_reduces_and_stays_within_error(self):
+        vertices, normals, indices = grid_mesh()
+        new_vertices, new_normals, new_indices = cluster_mesh(vertices, normals, indices, 0.25)
+
+        self.assertLess(len(new_indices), len(indices))
+        self.assertEqual(new_indices.max() + 1, len(new_vertices) // 3)
+        # Every surviving vertex lies inside the original bounds, normals stay unit length
+        positions = new_vertices.reshape(-1, 3)
+        self.assertTrue(np.all(positions >= -1e-6) and np.all(positions <= 1 + 1e-6))
+        np.testing.assert_allclose(np.linalg.norm(new_normals.reshape(-1, 3), axis=1), 1.0, rtol=1e-5)
+        # No degenerate triangles survive
+        triangles = new_indices.reshape(-1, 3)
+        self.assertTrue(np.all((triangles[:, 0] != triangles[:, 1]) & (triangles[:, 1] != triangles[:, 2])))
+
+    def test_chain_gets_coarser(self):
+        chain = build_lod_chain(*grid_mesh())
+        self.assertGreaterEqual(len(chain), 2)
+        counts = [len(level["indices"]) for level in chain]
+        self.assertEqual(counts, sorted(counts, reverse=True))
+        errors = [level["error"] for level in chain]
+        self.assertEqual(errors, sorted(errors))
+
+    def test_tiny_meshes_are_left_alone(self):
+        self.assertEqual(build_lod_chain(np.zeros(9), np.zeros(9), [0, 1, 2]), [])
+
+    def test_selection_by_projected_error(self):
+        errors = np.array([[0.0, 0.01, 0.1, np.inf]] * 3, dtype=np.float32)
+        levels = select_levels(errors, np.array([0.5, 5.0, 500.0]), pixel_scale=100.0)
+        np.testing.assert_array_equal(levels, [0, 1, 2])
+
+class TestMeshManagerLod(unittest.TestCase):
+    def test_background_chain_is_selected_by_distance(self):
+        vertices, normals, indices = grid_mesh()
+        manager = MeshManager()
+        manager.add_part_meshes("Head", [{"name": "Grid", "vertices": vertices, "normals": normals, "indices": indices}])
+
+        deadline = time.time() + 10
+        while not manager.lods_ready() and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(manager.lods_ready())
+
+        def view_at(distance):
+            view = np.identity(4, dtype=np.float32)
+            view[2, 3] = -distance
+            return view.T.ravel() # column-major, as glGetFloatv returns it
+
+        manager.prepare_frame(view_at(2.0), None, pixel_scale=300.0)
+        mesh = manager.parts["Head"][0]
+        self.assertGreater(len(mesh.lods), 0)
+        self.assertEqual(mesh.lod_level, 0)
+        self.assertEqual(manager.lod_stats["triangles"], manager.lod_stats["full_triangles"])
+
+        manager.prepare_frame(view_at(200.0), None, pixel_scale=300.0)
+        self.assertEqual(mesh.lod_level, len(mesh.lods))
+        self.assertLess(manager.lod_stats["triangles"], manager.lod_stats["full_triangles"])
+
+        manager.forced_lod = 1
+        manager.prepare_frame(view_at(200.0), None, pixel_scale=300.0)
+        self.assertEqual(mesh.lod_level, 1)
+        self.assertEqual(manager.lod_stats["levels"][1], 1)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,52 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import json
+import struct
+import unittest
+import numpy as np
+from app.core.mesh_payload import decode_payload, PAYLOAD_MAGIC, PAYLOAD_VERSION, PAYLOAD_ALIGN
+
+def build_payload(header, buffers):
+    """Packs a payload the same way blender_extract_validate.write_payload does."""
+    data = b""
+    for mesh, arrays in zip(header["meshes"], buffers):
+        mesh["buffers"] = {}
+        for key, array in arrays.items():
+            blob = array.tobytes()
+            mesh["buffers"][key] = {"offset": len(data), "count": int(array.size), "dtype": array.dtype.str}
+            data += blob + b"\0" * (-len(blob) % PAYLOAD_ALIGN)
+    header_bytes = json.dumps(header).encode("utf-8")
+    header_bytes += b" " * (-(12 + len(header_bytes)) % PAYLOAD_ALIGN)
+    return struct.pack("<4sII", PAYLOAD_MAGIC, PAYLOAD_VERSION, len(header_bytes)) + header_bytes + data
+
+class TestMeshPayload(unittest.TestCase):
+    def test_round_trip(self):
+        vertices = np.arange(9, dtype="<f4")
+        indices = np.array([0, 1, 2], dtype="<u4")
+        header = {
+            "filename": "RightArm_v001.fbx",
+            "tris": 1,
+            "armature_name": "Armature",
+            "bones": ["mixamorig:RightHand"],
+            "meshes": [{"name": "Hand", "parent_bone": "mixamorig:RightHand", "tris": 1}],
+        }
+        buffer = build_payload(header, [{"vertices": vertices, "normals": vertices, "indices": indices}])
+
+        decoded = decode_payload(buffer)
+        mesh = decoded["meshes"][0]
+        self.assertEqual(decoded["filename"], "RightArm_v001.fbx")
+        self.assertEqual(mesh["parent_bone"], "mixamorig:RightHand")
+        self.assertNotIn("buffers", mesh)
+        np.testing.assert_array_equal(mesh["vertices"], vertices)
+        np.testing.assert_array_equal(mesh["indices"], indices)
+        self.assertEqual(mesh["indices"].dtype, np.uint32)
+        # Views share memory with the payload instead of copying it
+        self.assertIs(mesh["vertices"].base, buffer)
+
+    def test_rejects_foreign_data(self):
+        with self.assertRaises(ValueError):
+            decode_payload(b"JUNK" + b"\0" * 8)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,65 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+import numpy as np
+from app.core.mesh_manager import MeshObject, MeshManager
+from app.core.palette_renderer import PartBatch
+
+def triangle_mesh(name, parent_bone, offset=0.0):
+    vertices = np.array([0, 0, 0, 1, 0, 0, 0, 1, 0], dtype=np.float32) + offset
+    mesh = MeshObject(name, vertices, np.tile([0, 0, 1], 3), [0, 1, 2])
+    mesh.parent_bone = parent_bone
+    return mesh
+
+class TestPartBatch(unittest.TestCase):
+    def test_packs_meshes_with_palette_slots(self):
+        meshes = [triangle_mesh("Hand", "mixamorig:RightHand"), triangle_mesh("Loose", "", 2.0)]
+        batch = PartBatch(meshes, {"mixamorig:RightHand": 3})
+
+        self.assertEqual(batch.vertex_data.shape, (6, 7))
+        np.testing.assert_array_equal(batch.vertex_data[:, 6], [3, 3, 3, 0, 0, 0])
+        np.testing.assert_array_equal(batch.vertex_data[3, 0:3], [2, 2, 2])
+        # Indices of the second mesh are rebased onto its vertices
+        np.testing.assert_array_equal(batch.index_data, [0, 1, 2, 3, 4, 5])
+        self.assertEqual(batch.ranges, [(0, 3), (3, 3)])
+
+    def test_draw_runs_merge_by_color_and_skip_hidden(self):
+        meshes = [triangle_mesh(name, "") for name in "abcd"]
+        meshes[2].visible = False
+        meshes[3].color = (1.0, 0.0, 0.0)
+        batch = PartBatch(meshes, {})
+
+        runs = batch.draw_runs()
+        self.assertEqual(runs, [[(0.7, 0.7, 0.7), 0, 6], [(1.0, 0.0, 0.0), 9, 3]])
+
+    def test_draw_runs_follow_lod_level(self):
+        meshes = [triangle_mesh("a", ""), triangle_mesh("b", "")]
+        meshes[0].set_lods([MeshObject("a_lod", [0, 0, 0, 1, 0, 0, 0, 1, 0], [0, 0, 1] * 3, [0, 1, 2])], [0.1])
+        batch = PartBatch(meshes, {})
+        self.assertEqual(batch.level_ranges, [[(0, 3), (3, 3)], [(6, 3)]])
+
+        meshes[0].lod_level = 1
+        self.assertEqual(batch.draw_runs(), [[(0.7, 0.7, 0.7), 3, 6]])
+
+class TestMeshManagerPose(unittest.TestCase):
+    def test_palette_gathers_pose_by_bone_index(self):
+        manager = MeshManager()
+        manager.add_part_meshes("RightArm", [
+            {"name": "Hand", "parent_bone": "mixamorig:RightHand", "vertices": [0] * 9, "normals": [0] * 9, "indices": [0, 1, 2]},
+            {"name": "Loose", "parent_bone": "", "vertices": [0] * 9, "normals": [0] * 9, "indices": [0, 1, 2]},
+        ])
+        manager._assign_slots(manager.parts["RightArm"])
+
+        # Skeleton arrives after the meshes: indices are resolved once, here
+        manager.set_skeleton(["mixamorig:Hips", "mixamorig:RightHand"])
+        self.assertEqual([m.bone_index for m in manager.parts["RightArm"]], [1, -1])
+
+        pose = np.arange(32, dtype=np.float32).reshape(2, 16)
+        manager.set_pose_matrices(pose)
+        palette = manager.build_palette()
+        np.testing.assert_array_equal(palette[0], np.identity(4).reshape(16))
+        np.testing.assert_array_equal(palette[1], pose[1])
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
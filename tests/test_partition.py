@@ -0,0 +1,40 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+from validation import ValidationRunner
+from validation.models import FBXData
+
+class TestPartitionByCategory(unittest.TestCase):
+    def setUp(self):
+        self.runner = ValidationRunner()
+        self.fbx_data = FBXData(
+            filename="Basic_Model.fbx",
+            tris=30,
+            meshes=[
+                {"name": "Hand_R", "parent_bone": "mixamorig:RightHand", "tris": 10},
+                {"name": "Head", "parent_bone": "mixamorig:Head", "tris": 10},
+                {"name": "Loose", "parent_bone": "", "tris": 5},
+                {"name": "Prop", "parent_bone": "UnknownBone", "tris": 5},
+            ],
+            armature_name="Armature",
+            bones=["mixamorig:RightHand", "mixamorig:Head"]
+        )
+
+    def test_matches_validate_filtering(self):
+        partitions = self.runner.partition_by_category(self.fbx_data)
+        self.assertEqual(set(partitions), set(self.runner.registry))
+        for category, part in partitions.items():
+            _, filtered = self.runner.validate("Basic_Model.fbx", self.fbx_data, category)
+            with self.subTest(category=category):
+                self.assertEqual([m["name"] for m in part.meshes], [m["name"] for m in filtered.meshes])
+                self.assertEqual(part.armature_name, "Armature")
+
+    def test_shares_mesh_dicts(self):
+        partitions = self.runner.partition_by_category(self.fbx_data)
+        self.assertIs(partitions["RightArm"].meshes[0], self.fbx_data.meshes[0])
+        # Loose meshes land in every category
+        self.assertTrue(all(self.fbx_data.meshes[2] in p.meshes for p in partitions.values()))
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,73 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+import unittest
+from PySide6.QtCore import QElapsedTimer
+from PySide6.QtWidgets import QApplication, QWidget, QTabWidget
+from app.ui.render_governor import RenderGovernor
+
+class TestRenderGovernor(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.tabs = QTabWidget()
+        self.view = QWidget()
+        self.tabs.addTab(self.view, "Preview")
+        self.tabs.addTab(QWidget(), "Publish")
+        self.tabs.resize(200, 200)
+        self.ticks = []
+        self.governor = RenderGovernor(self.view, lambda dt: self.ticks.append(dt) or True,
+                                       active_fps=50, idle_fps=2, interaction_fps=10,
+                                       interaction_idle_ms=30)
+        self.tabs.show()
+        self.app.processEvents()
+
+    def tearDown(self):
+        self.tabs.close()
+
+    def test_tick_rate_follows_animation_state(self):
+        self.governor.set_animating(True)
+        self.assertEqual(self.governor.tick_timer.interval(), 20)
+        self.governor.set_animating(False)
+        self.assertEqual(self.governor.tick_timer.interval(), 500)
+
+    def test_hidden_tab_stops_ticking(self):
+        self.governor.set_animating(True)
+        self.tabs.setCurrentIndex(1)
+        self.app.processEvents()
+        self.assertFalse(self.governor.tick_timer.isActive())
+
+        self.tabs.setCurrentIndex(0)
+        self.app.processEvents()
+        self.assertTrue(self.governor.tick_timer.isActive())
+
+    def test_requests_are_coalesced(self):
+        self.governor.request_update()
+        first = self.governor.last_update_ms
+        # A burst of input inside one frame budget schedules a single deferred repaint
+        for _ in range(20):
+            self.governor.request_update()
+        self.assertEqual(self.governor.last_update_ms, first)
+        self.assertTrue(self.governor.update_timer.isActive())
+
+    def test_interaction_ends_after_idle_timeout(self):
+        self.governor.begin_interaction()
+        self.assertTrue(self.governor.interacting)
+        clock = QElapsedTimer()
+        clock.start()
+        while self.governor.interacting and clock.elapsed() < 1000:
+            self.app.processEvents()
+        self.assertFalse(self.governor.interacting)
+        # The settling repaint at full quality waits out the 100 ms frame budget
+        self.assertTrue(self.governor.update_timer.isActive())
+
+    def test_default_rate_follows_screen(self):
+        governor = RenderGovernor(self.view, lambda dt: False)
+        refresh = self.view.screen().refreshRate()
+        self.assertAlmostEqual(governor.frame_interval_ms(), 1000.0 / (refresh if refresh > 0 else 60.0))
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,50 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+from app.core.render_stats import RenderStats
+
+def record_frames(stats, count, **counters):
+    for _ in range(count):
+        stats.begin_frame()
+        stats.end_frame(**counters)
+
+class TestRenderStats(unittest.TestCase):
+    def test_history_is_rolling(self):
+        stats = RenderStats(history=5)
+        record_frames(stats, 8, draw_calls=3, triangles=900)
+        self.assertEqual(len(stats.history), 5)
+        self.assertEqual(stats.latest()["draw_calls"], 3)
+        self.assertIsNone(stats.latest()["gpu_ms"]) # No GL context, no timer queries
+
+    def test_summary_and_compare_marks(self):
+        stats = RenderStats()
+        record_frames(stats, 10, draw_calls=12, triangles=50000, meshes_drawn=12, meshes_culled=0, buffer_bytes=1024)
+        before = stats.mark("fixed-function", frames=10)
+        self.assertEqual(before["frames"], 10)
+        self.assertEqual(before["draw_calls"], 12)
+        self.assertGreaterEqual(before["cpu_ms"]["max"], before["cpu_ms"]["mean"])
+        self.assertIsNone(before["gpu_ms"])
+
+        record_frames(stats, 10, draw_calls=2, triangles=20000, meshes_drawn=8, meshes_culled=4, buffer_bytes=4096)
+        stats.mark("batched", frames=10)
+        delta = stats.compare("fixed-function", "batched")
+        self.assertEqual(delta["draw_calls"], -10)
+        self.assertEqual(delta["triangles"], -30000)
+        self.assertEqual(delta["meshes_culled"], 4)
+        self.assertNotIn("gpu_ms", delta)
+
+    def test_overlay_lines(self):
+        stats = RenderStats()
+        self.assertEqual(stats.overlay_lines(), [])
+        record_frames(stats, 3, draw_calls=2, triangles=1500, meshes_drawn=2, meshes_culled=1,
+                      buffer_bytes=2 * 1024 * 1024, animation_frame=12.5)
+        text = "\n".join(stats.overlay_lines())
+        self.assertIn("2 draws, 1,500 tris", text)
+        self.assertIn("1 culled", text)
+        self.assertIn("2.0 MiB", text)
+        self.assertIn("anim frame 12.5", text)
+        self.assertIn("GPU n/a", text)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,24 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+from app.core.render_target import ScaledRenderTarget, scaled_size, MIN_RENDER_SCALE
+
+class TestScaledSize(unittest.TestCase):
+    def test_scales_and_rounds(self):
+        self.assertEqual(scaled_size(1920, 1080, 0.5), (960, 540))
+        self.assertEqual(scaled_size(1000, 700, 0.33), (330, 231))
+
+    def test_scale_is_clamped(self):
+        self.assertEqual(scaled_size(800, 600, 2.0), (800, 600))
+        self.assertEqual(scaled_size(800, 600, 0.0), scaled_size(800, 600, MIN_RENDER_SCALE))
+        self.assertEqual(scaled_size(1, 1, MIN_RENDER_SCALE), (1, 1))
+
+    def test_unallocated_target_holds_nothing(self):
+        target = ScaledRenderTarget()
+        self.assertEqual(target.buffer_bytes(), 0)
+        target.release() # No GL calls without a framebuffer
+        self.assertIsNone(target.framebuffer)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,136 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+import json
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stdout
+from validation import ValidationRunner
+from validation.engine import (
+    Rule, RuleEngine, RuleContext, order_rules, INPUT_FILENAME, INPUT_GEOMETRY
+)
+from validation.models import FBXData, ValidationResult, Severity
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+import ci_validate
+
+def result(rule_id, passed=True):
+    return ValidationResult(rule_id=rule_id, passed=passed, severity=Severity.INFO if passed else Severity.ERROR)
+
+def context(meshes=()):
+    return RuleContext("Head_v001.fbx", "Head", {}, FBXData(filename="Head_v001.fbx", tris=0, meshes=list(meshes)))
+
+class TestRuleEngine(unittest.TestCase):
+    def test_dependencies_run_first(self):
+        rules = [
+            Rule("b", lambda ctx: result("B"), depends_on=("a",)),
+            Rule("a", lambda ctx: result("A")),
+            Rule("c", lambda ctx: result("C"), inputs=INPUT_FILENAME),
+        ]
+        self.assertEqual([r.name for r in order_rules(rules)], ["a", "c", "b"])
+        self.assertEqual([r.rule_id for r in RuleEngine(rules).run(context())], ["A", "C", "B"])
+
+    def test_bad_graphs_are_rejected(self):
+        with self.assertRaises(ValueError):
+            order_rules([Rule("a", None, depends_on=("missing",))])
+        with self.assertRaises(ValueError):
+            order_rules([Rule("a", None, depends_on=("b",)), Rule("b", None, depends_on=("a",))])
+
+    def test_blocking_failure_skips_dependents(self):
+        rules = [
+            Rule("gate", lambda ctx: result("GATE", passed=False)),
+            Rule("soft", lambda ctx: result("SOFT", passed=False), blocking=False),
+            Rule("after_gate", lambda ctx: result("X"), depends_on=("gate",)),
+            Rule("after_after", lambda ctx: result("Y"), depends_on=("after_gate",)),
+            Rule("after_soft", lambda ctx: result("Z"), depends_on=("soft",)),
+        ]
+        results = list(RuleEngine(rules).run(context()))
+        self.assertEqual([r.rule_id for r in results], ["GATE", "SOFT", "RULE_SKIPPED", "Z", "RULE_SKIPPED"])
+        self.assertEqual(results[4].details, {"rule": "after_after", "blocked_by": "gate"})
+
+    def test_rules_needing_missing_inputs_are_left_out(self):
+        rules = [
+            Rule("geometry", lambda ctx: result("GEO"), inputs=INPUT_GEOMETRY),
+            Rule("after", lambda ctx: result("AFTER"), depends_on=("geometry",)),
+            Rule("stats", lambda ctx: result("STATS")),
+        ]
+        stats_only = [{"name": "m", "tris": 1}]
+        self.assertEqual([r.rule_id for r in RuleEngine(rules).run(context(stats_only))], ["STATS"])
+        with_geometry = [{"name": "m", "tris": 1, "vertices": [0.0] * 9}]
+        self.assertEqual(len(list(RuleEngine(rules).run(context(with_geometry)))), 3)
+
+    def test_geometry_rules_run_in_parallel_and_stream(self):
+        barrier = threading.Barrier(2, timeout=5)
+        def geometry_check(name):
+            def check(ctx):
+                barrier.wait() # Both rules must be running at once to get past this
+                return result(name)
+            return check
+        rules = [
+            Rule("g1", geometry_check("G1"), inputs=INPUT_GEOMETRY),
+            Rule("g2", geometry_check("G2"), inputs=INPUT_GEOMETRY),
+            Rule("cheap", lambda ctx: result("CHEAP"), inputs=INPUT_FILENAME),
+        ]
+        stream = RuleEngine(rules, max_workers=2).run(context(), inputs=INPUT_GEOMETRY)
+        self.assertEqual(next(stream).rule_id, "CHEAP") # Doesn't wait for the pool
+        self.assertEqual({r.rule_id for r in stream}, {"G1", "G2"})
+
+    def test_exceptions_become_results(self):
+        rules = [Rule("broken", lambda ctx: 1 / 0)]
+        (failure,) = RuleEngine(rules).run(context())
+        self.assertEqual((failure.rule_id, failure.passed, failure.severity), ("RULE_ERROR", False, Severity.ERROR))
+
+class TestDefaultRules(unittest.TestCase):
+    def setUp(self):
+        self.fbx_data = FBXData(
+            filename="Head_v001.fbx",
+            tris=25,
+            meshes=[
+                {"name": "Head", "parent_bone": "mixamorig:Head", "tris": 20},
+                {"name": "Hand_R", "parent_bone": "mixamorig:RightHand", "tris": 5},
+            ],
+        )
+
+    def test_app_results_stream_in_order(self):
+        streamed = []
+        results, filtered = ValidationRunner().validate("Head_v001.fbx", self.fbx_data, "Head", on_result=streamed.append)
+        self.assertEqual(streamed, results)
+        self.assertEqual([r.rule_id for r in results], ["BONE_SET_FILTER", "NAMING_VALID", "BONE_SET_VALID", "TRI_COUNT"])
+        self.assertEqual([m["name"] for m in filtered.meshes], ["Head"])
+
+    def test_geometry_rule_runs_on_extracted_geometry(self):
+        head, hand = self.fbx_data.meshes
+        head.update(vertices=[0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0, 0.0], normals=[0.0, 0.0, 1.0] * 3, indices=[0, 1, 2])
+        results, _ = ValidationRunner().validate("Head_v001.fbx", self.fbx_data, "Head")
+        self.assertEqual(results[-1].rule_id, "GEOMETRY_VALID")
+        self.assertTrue(results[-1].passed)
+
+        head["indices"] = [0, 1, 3]
+        head["normals"] = [0.0, 0.0, float("nan")] * 3
+        results, _ = ValidationRunner().validate("Head_v001.fbx", self.fbx_data, "Head")
+        failure = results[-1]
+        self.assertFalse(failure.passed)
+        self.assertEqual(failure.details["mesh"], "Head")
+        self.assertEqual(len(failure.details["problems"]), 2)
+
+    def test_stats_only_data_skips_geometry_rule(self):
+        results, _ = ValidationRunner().validate("Head_v001.fbx", self.fbx_data, "Head")
+        self.assertNotIn("GEOMETRY_VALID", [r.rule_id for r in results])
+
+    def test_ci_runner_uses_the_same_rules(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = os.path.join(tmp, "stats.json")
+            with open(json_path, "w") as f:
+                json.dump({"filename": "head.fbx", "tris": 25, "meshes": self.fbx_data.meshes,
+                           "armature_name": "Armature", "bones": []}, f)
+            out = io.StringIO()
+            with redirect_stdout(out):
+                self.assertEqual(ci_validate.run_validation(json_path, "Head", "head.fbx"), 1)
+        results, _ = ValidationRunner().validate("head.fbx", self.fbx_data, "Head")
+        for r in results:
+            self.assertIn(f"[{r.rule_id}]: {r.message}", out.getvalue())
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,97 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+import math
+import tempfile
+import unittest
+from types import SimpleNamespace
+import numpy as np
+from app.core import software_renderer as sr
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+# Set UPDATE_GOLDEN=1 to rewrite the reference images after an intended rendering change
+UPDATE_GOLDEN = os.environ.get("UPDATE_GOLDEN") == "1"
+
+def sphere(radius=1.0, offset=(0.0, 0.0, 0.0), rings=16):
+    theta, phi = np.meshgrid(np.linspace(0, np.pi, rings), np.linspace(0, 2 * np.pi, 2 * rings), indexing="ij")
+    normals = np.stack([np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)], axis=-1).reshape(-1, 3)
+    grid = np.arange(rings * 2 * rings).reshape(rings, 2 * rings)
+    corners = np.stack([grid[:-1, :-1], grid[1:, :-1], grid[1:, 1:], grid[:-1, 1:]], axis=-1).reshape(-1, 4)
+    indices = np.concatenate([corners[:, [0, 1, 2]], corners[:, [0, 2, 3]]], axis=1).ravel()
+    vertices = normals * radius + np.asarray(offset)
+    return {"vertices": vertices.ravel(), "normals": normals.ravel(), "indices": indices}
+
+def facing_triangle(z=0.0, color=(0.7, 0.7, 0.7)):
+    geometry = SimpleNamespace(vertices=[-1, -1, z, 1, -1, z, 0, 1, z], normals=[0, 0, 1] * 3, indices=[0, 1, 2])
+    return (geometry, None, color)
+
+def render_items(items, size=32):
+    positions, normals, colors = sr.gather_triangles(items)
+    view = sr.translation(0, 0, -3)
+    return sr.render(positions, normals, colors, view, sr.perspective(60.0, 1.0, 0.1, 10.0), size, size)
+
+class TestSoftwareRenderer(unittest.TestCase):
+    def test_png_round_trip(self):
+        image = np.random.default_rng(1).integers(0, 256, (5, 7, 4), dtype=np.uint8)
+        path = os.path.join(tempfile.mkdtemp(), "image.png")
+        sr.write_png(path, image)
+        np.testing.assert_array_equal(sr.read_png(path), image)
+
+    def test_lambert_matches_fixed_function_lighting(self):
+        image = render_items([facing_triangle()])
+        # GL_COLOR_MATERIAL: color * (global + light ambient + N.L), N = +Z in eye space
+        expected = round(0.7 * (sr.AMBIENT + 1.0 / math.sqrt(6.0)) * 255)
+        np.testing.assert_array_equal(image[16, 16], [expected] * 3)
+        np.testing.assert_array_equal(image[0, 0], np.round(np.array(sr.BACKGROUND) * 255))
+
+    def test_nearest_triangle_wins_in_any_order(self):
+        near = facing_triangle(0.5, (1.0, 0.0, 0.0))
+        far = facing_triangle(0.0, (0.0, 0.0, 1.0))
+        for items in ([near, far], [far, near]):
+            pixel = render_items(items)[16, 16]
+            self.assertGreater(pixel[0], 0)
+            self.assertEqual(pixel[2], 0)
+
+    def test_thumbnail_is_framed_on_transparent_background(self):
+        geometry = SimpleNamespace(**sphere(5.0, (100.0, 0.0, 0.0)))
+        image = sr.render_thumbnail([(geometry, None, sr.DEFAULT_COLOR)], size=48)
+        self.assertEqual(image.shape, (48, 48, 4))
+        self.assertEqual(image[0, 0, 3], 0)
+        rows, cols = np.nonzero(image[..., 3])
+        # Far from the origin and small, yet it fills most of the frame
+        self.assertGreater(cols.max() - cols.min(), 40)
+        self.assertGreater(rows.max() - rows.min(), 40)
+
+class TestViewportSnapshot(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from PySide6.QtWidgets import QApplication
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_snapshot_matches_golden_image(self):
+        from app.ui.viewport import ModularViewport
+        viewport = ModularViewport()
+        viewport.armature_world_matrix = list(np.diag([0.01, 0.01, 0.01, 1.0]).T.ravel())
+        manager = viewport.mesh_manager
+        manager.add_part_meshes("Torso", [
+            dict(sphere(120.0), name="Body", parent_bone="Spine"),
+            dict(sphere(60.0, (180.0, 0.0, 60.0)), name="Shoulder", parent_bone=""),
+        ])
+        manager.parts["Torso"][1].color = (0.2, 0.5, 1.0)
+        pose = sr.translation(0, 0, 100) @ sr.rotation_x(30)
+        manager.set_pose({"Spine": list(pose.T.ravel())})
+
+        image = viewport.snapshot(96, 72)
+        path = os.path.join(GOLDEN_DIR, "viewport_snapshot.png")
+        if UPDATE_GOLDEN or not os.path.exists(path):
+            sr.write_png(path, image)
+        golden = sr.read_png(path)
+        self.assertEqual(image.shape, golden.shape)
+        # Tolerates last-bit float differences between platforms, not rendering changes
+        difference = np.abs(image.astype(np.int16) - golden.astype(np.int16))
+        self.assertLess(difference.mean(), 0.5)
+        self.assertLess((difference.max(axis=2) > 16).mean(), 0.002)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,88 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+import numpy as np
+from app.core.upload_queue import UploadQueue, WAITING
+from app.core.mesh_manager import MeshManager, PackedMesh, pack_fbx_data
+from validation.models import FBXData
+
+def counting_task(log, name, steps, state=None):
+    for step in range(steps):
+        log.append((name, step))
+        yield state
+
+class TestUploadQueue(unittest.TestCase):
+    def test_runs_tasks_in_order_until_done(self):
+        log = []
+        queue = UploadQueue()
+        queue.submit("a", counting_task(log, "a", 2))
+        queue.submit("b", counting_task(log, "b", 1))
+        queue.run(budget_ms=1000)
+        self.assertEqual(log, [("a", 0), ("a", 1), ("b", 0)])
+        self.assertEqual(len(queue), 0)
+
+    def test_budget_spreads_work_over_runs(self):
+        log = []
+        queue = UploadQueue()
+        queue.submit("a", counting_task(log, "a", 3))
+        # An exhausted budget still makes progress: one step per run
+        queue.run(budget_ms=0)
+        self.assertEqual(log, [("a", 0)])
+        queue.run(budget_ms=0)
+        self.assertEqual(log, [("a", 0), ("a", 1)])
+        self.assertIn("a", queue)
+
+    def test_waiting_task_yields_to_the_next(self):
+        log = []
+        queue = UploadQueue()
+        queue.submit("a", counting_task(log, "a", 3, WAITING))
+        queue.submit("b", counting_task(log, "b", 1))
+        queue.run(budget_ms=1000)
+        self.assertEqual(log, [("a", 0), ("b", 0)])
+        self.assertEqual(len(queue), 1)
+
+    def test_resubmitting_a_key_closes_the_old_task(self):
+        closed = []
+        def task():
+            try:
+                yield
+            finally:
+                closed.append(True)
+        queue = UploadQueue()
+        queue.submit("a", task())
+        queue.run(budget_ms=0) # Started, suspended at its yield
+        queue.submit("a", counting_task([], "a", 1))
+        self.assertEqual(closed, [True])
+        self.assertEqual(len(queue), 1)
+
+class TestPackedMeshes(unittest.TestCase):
+    def test_pack_fbx_data_is_contiguous_and_idempotent(self):
+        data = FBXData("part.fbx", 1)
+        data.meshes = [{"name": "Tri", "vertices": [0, 0, 0, 2, 0, 0, 0, 2, 0],
+                        "normals": [0, 0, 1] * 3, "indices": [0, 1, 2]}]
+        pack_fbx_data(data)
+        packed = data.meshes[0]["packed"]
+        self.assertIsInstance(packed, PackedMesh)
+        self.assertTrue(packed.interleaved.flags["C_CONTIGUOUS"])
+        self.assertEqual(packed.interleaved.shape, (3, 6))
+        self.assertEqual(packed.indices.dtype, np.uint32)
+        np.testing.assert_allclose(packed.center, [1, 1, 0])
+
+        pack_fbx_data(data)
+        self.assertIs(data.meshes[0]["packed"], packed)
+
+    def test_manager_without_gl_installs_immediately(self):
+        data = FBXData("part.fbx", 1)
+        data.meshes = [{"name": "Tri", "vertices": [0, 0, 0, 1, 0, 0, 0, 1, 0],
+                        "normals": [0, 0, 1] * 3, "indices": [0, 1, 2]}]
+        pack_fbx_data(data)
+        manager = MeshManager()
+        manager.add_part_meshes("Head", data.meshes)
+        self.assertEqual([m.name for m in manager.parts["Head"]], ["Tri"])
+        # The mesh shares the worker-built arrays instead of copying them
+        self.assertIs(manager.parts["Head"][0].vertices, data.meshes[0]["packed"].vertices)
+        self.assertEqual(len(manager.uploads), 0)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
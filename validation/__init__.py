@@ -1,66 +1,82 @@
 import json
 import os
 from validation.models import FBXData, ValidationResult, Severity
-from validation.rules import naming, bone_set, tri_count
+from validation.engine import RuleEngine, RuleContext, DEFAULT_MAX_WORKERS
+from validation.rules import category_filter
 
 class ValidationRunner:
-    def __init__(self, registry_path=None):
+    def __init__(self, registry_path=None, rules=None, max_workers=DEFAULT_MAX_WORKERS):
         if not registry_path:
             registry_path = os.path.join(os.path.dirname(__file__), "part_registry.json")
         
         with open(registry_path, "r") as f:
             self.registry = json.load(f)
 
-    def validate(self, fbx_path, fbx_data: FBXData, part_category):
-        """Runs all validation rules against the extracted FBX data."""
-        results = []
-        
+        # Reverse index: bone name -> categories that own it
+        self.bone_categories = {}
+        for category, config in self.registry.items():
+            for bone in config.get("bones", []):
+                self.bone_categories.setdefault(bone, []).append(category)
+
+        # Every registered rule unless a rule list is given
+        self.engine = RuleEngine(rules, max_workers)
+
+    def partition_by_category(self, fbx_data: FBXData):
+        """
+        Splits a full-robot FBXData into one FBXData per registry category in a
+        single pass over the meshes. Unparented meshes go to every category, as
+        in validate(). Mesh dicts are shared with the input, not copied.
+        """
+        partitions = {category: [] for category in self.registry}
+        for mesh in fbx_data.meshes:
+            parent_bone = mesh.get("parent_bone", "")
+            owners = self.bone_categories.get(parent_bone, ()) if parent_bone else partitions
+            for category in owners:
+                partitions[category].append(mesh)
+
+        return {
+            category: FBXData(
+                filename=fbx_data.filename,
+                tris=fbx_data.tris,
+                meshes=meshes,
+                armature_name=fbx_data.armature_name,
+                bones=fbx_data.bones
+            )
+            for category, meshes in partitions.items()
+        }
+
+    def filter_category(self, fbx_data: FBXData, part_category):
+        """fbx_data narrowed to one category's meshes, as the rules see it."""
+        allowed_bones = set(self.registry.get(part_category, {}).get("bones", []))
+        return category_filter.filter_meshes(fbx_data, allowed_bones)[0]
+
+    def validate(self, fbx_path, fbx_data: FBXData, part_category, on_result=None):
+        """
+        Runs all registered rules against the extracted FBX data. Returns
+        (results, category-filtered FBXData); `on_result` is called with
+        each result as soon as its rule finishes.
+        """
         part_config = self.registry.get(part_category)
         if not part_config:
-            return [ValidationResult(
+            result = ValidationResult(
                 rule_id="CONFIG_INVALID",
                 passed=False,
+                severity=Severity.ERROR,
                 message=f"Unknown part category: {part_category}"
-            )]
-        
-        # Add name for convenience
-        part_config["name"] = part_category
-        allowed_bones = set(part_config.get("bones", []))
-        
-        # 0. Filter meshes to the target category
-        filtered_meshes = []
-        ignored_count = 0
-        for mesh in fbx_data.meshes:
-            parent_bone = mesh.get("parent_bone", "")
-            if parent_bone in allowed_bones or not parent_bone:
-                filtered_meshes.append(mesh)
-            else:
-                ignored_count += 1
-        
-        if ignored_count > 0:
-            results.append(ValidationResult(
-                rule_id="BONE_SET_FILTER",
-                passed=True,
-                severity=Severity.INFO,
-                message=f"Category Filtering: Ignored {ignored_count} meshes belonging to other limbs/bones."
-            ))
+            )
+            if on_result:
+                on_result(result)
+            return [result], None
 
-        # Create a filtered copy of FBXData for rules to consume
-        filtered_fbx = FBXData(
-            filename=fbx_data.filename,
-            tris=fbx_data.tris, # Original total (rules should use mesh list now)
-            meshes=filtered_meshes,
-            armature_name=fbx_data.armature_name,
-            bones=fbx_data.bones
+        context = RuleContext(
+            fbx_path=fbx_path,
+            category=part_category,
+            part_config=dict(part_config, name=part_category), # Name for convenience
+            fbx_data=fbx_data
         )
-        
-        # Rule 1: Naming
-        results.append(naming.check(fbx_path, part_category))
-        
-        # Rule 2: Bone Set (Now checks filtered meshes for loose objects)
-        results.extend(bone_set.check(filtered_fbx, part_config))
-        
-        # Rule 3: Tri Count (Now calculates from filtered_fbx.meshes)
-        results.append(tri_count.check(filtered_fbx, part_config))
-        
-        return results, filtered_fbx
+        results = []
+        for result in self.engine.run(context):
+            results.append(result)
+            if on_result:
+                on_result(result)
+        return results, context.outputs.get("category_filter")
@@ -0,0 +1,161 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+from validation.models import FBXData, ValidationResult, Severity
+
+# What a rule reads, cheapest first; each level includes the ones before it
+INPUT_FILENAME = "filename" # File path and category only
+INPUT_STATS = "stats" # Mesh names, parent bones and counts (a stats-only extraction)
+INPUT_GEOMETRY = "geometry" # Vertex, normal and index arrays
+INPUT_LEVELS = (INPUT_FILENAME, INPUT_STATS, INPUT_GEOMETRY)
+
+# Threads for geometry rules; cheaper rules run on the calling thread
+DEFAULT_MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+@dataclass
+class Rule:
+    name: str
+    check: Callable # check(context) -> ValidationResult or a list of them
+    inputs: str = INPUT_STATS
+    depends_on: Tuple[str, ...] = ()
+    blocking: bool = True # An ERROR result skips every rule that depends on this one
+
+@dataclass
+class RuleContext:
+    """What rules read. A rule can hand data to its dependents through `outputs`."""
+    fbx_path: str
+    category: str
+    part_config: Dict[str, Any]
+    fbx_data: Optional[FBXData] = None
+    outputs: Dict[str, Any] = field(default_factory=dict) # rule name -> data for dependent rules
+
+# name -> Rule, in registration order; rule modules add themselves on import
+RULES: Dict[str, Rule] = {}
+
+def rule(name, inputs=INPUT_STATS, depends_on=(), blocking=True):
+    """Decorator registering check(context) in RULES."""
+    if inputs not in INPUT_LEVELS:
+        raise ValueError(f"Unknown rule input '{inputs}', expected one of {INPUT_LEVELS}")
+
+    def register(check):
+        RULES[name] = Rule(name, check, inputs, tuple(depends_on), blocking)
+        return check
+    return register
+
+def available_inputs(fbx_data):
+    """Richest input level an extraction provides."""
+    if fbx_data is None:
+        return INPUT_FILENAME
+    if any("vertices" in mesh for mesh in fbx_data.meshes):
+        return INPUT_GEOMETRY
+    return INPUT_STATS
+
+def order_rules(rules):
+    """
+    Rules sorted so each comes after its dependencies, otherwise keeping the
+    given order. Raises ValueError on unknown dependencies and cycles.
+    """
+    by_name = {r.name: r for r in rules}
+    for r in rules:
+        missing = [dep for dep in r.depends_on if dep not in by_name]
+        if missing:
+            raise ValueError(f"Rule '{r.name}' depends on unknown rule(s): {', '.join(missing)}")
+
+    ordered, placed = [], set()
+    remaining = list(rules)
+    while remaining:
+        ready = [r for r in remaining if all(dep in placed for dep in r.depends_on)]
+        if not ready:
+            raise ValueError(f"Rule dependency cycle among: {', '.join(r.name for r in remaining)}")
+        for r in ready:
+            remaining.remove(r)
+            ordered.append(r)
+            placed.add(r.name)
+    return ordered
+
+def _run_check(r, context):
+    try:
+        results = r.check(context)
+    except Exception as e:
+        return [ValidationResult(
+            rule_id="RULE_ERROR",
+            passed=False,
+            severity=Severity.ERROR,
+            message=f"Rule '{r.name}' failed to run: {e}",
+            details={"rule": r.name}
+        )]
+    if results is None:
+        return []
+    return [results] if isinstance(results, ValidationResult) else list(results)
+
+def _skipped(r, failed):
+    return ValidationResult(
+        rule_id="RULE_SKIPPED",
+        passed=False,
+        severity=Severity.WARNING,
+        message=f"Skipped '{r.name}' because '{failed}' failed.",
+        details={"rule": r.name, "blocked_by": failed}
+    )
+
+class RuleEngine:
+    """
+    Runs rules as a dependency graph. Rules that read geometry run on a
+    thread pool; the rest run on the calling thread. Results stream out as
+    each rule finishes. Rules needing more input than the extraction has
+    are left out quietly, along with their dependents; dependents of a
+    blocking rule that failed with an ERROR get a RULE_SKIPPED result instead.
+    """
+
+    def __init__(self, rules=None, max_workers=DEFAULT_MAX_WORKERS):
+        self.rules = order_rules(list(RULES.values()) if rules is None else list(rules))
+        self.max_workers = max_workers
+
+    def run(self, context, inputs=None):
+        """Generator of ValidationResults, in the order they become ready."""
+        level = INPUT_LEVELS.index(inputs or available_inputs(context.fbx_data))
+        remaining = list(self.rules)
+        finished = set()
+        blocked = {} # rule name -> name of the failed rule behind it, or None if not applicable
+        running = {} # future -> rule
+        pool = None
+        try:
+            while remaining or running:
+                ready = [r for r in remaining if all(dep in finished for dep in r.depends_on)]
+                if not ready:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        r = running.pop(future)
+                        yield from self._complete(r, future.result(), finished, blocked)
+                    continue
+
+                for r in ready:
+                    remaining.remove(r)
+                    cause = next((dep for dep in r.depends_on if dep in blocked), None)
+                    if cause is not None:
+                        finished.add(r.name)
+                        blocked[r.name] = blocked[cause]
+                        if blocked[cause] is not None:
+                            yield _skipped(r, blocked[cause])
+                    elif INPUT_LEVELS.index(r.inputs) > level:
+                        finished.add(r.name)
+                        blocked[r.name] = None
+                    elif r.inputs == INPUT_GEOMETRY and self.max_workers > 1:
+                        if pool is None:
+                            pool = ThreadPoolExecutor(max_workers=self.max_workers)
+                        running[pool.submit(_run_check, r, context)] = r
+                    else:
+                        yield from self._complete(r, _run_check(r, context), finished, blocked)
+        finally:
+            if pool is not None:
+                # The caller may stop early; don't start rules nobody will read
+                for future in running:
+                    future.cancel()
+                pool.shutdown(wait=True)
+
+    @staticmethod
+    def _complete(r, results, finished, blocked):
+        finished.add(r.name)
+        if r.blocking and any(not res.passed and res.severity == Severity.ERROR for res in results):
+            blocked[r.name] = r.name
+        yield from results
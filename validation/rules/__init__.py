@@ -0,0 +1,4 @@
+# The default rule set. Importing a rule module registers its rules with
+# validation.engine; rules run on the calling thread report in this order,
+# geometry rules as soon as the thread pool finishes them.
+from validation.rules import category_filter, naming, bone_set, tri_count, geometry
@@ -1,7 +1,8 @@
+from validation.engine import rule, INPUT_STATS
 from validation.models import ValidationResult, Severity, FBXData
 
 def check(fbx_data: FBXData, part_config: dict):
-    """Checks if meshes have parent bones. Category filtering happens in the Runner."""
+    """Checks if meshes have parent bones. Category filtering happens in the category_filter rule."""
     results = []
     
     for mesh in fbx_data.meshes:
@@ -35,3 +36,7 @@ def check(fbx_data: FBXData, part_config: dict):
             ))
         
     return results
+
+@rule("bone_set", inputs=INPUT_STATS, depends_on=("category_filter",))
+def run(context):
+    return check(context.outputs["category_filter"], context.part_config)
@@ -0,0 +1,39 @@
+from validation.engine import rule, INPUT_STATS
+from validation.models import ValidationResult, Severity, FBXData
+
+def filter_meshes(fbx_data: FBXData, allowed_bones):
+    """
+    Copy of fbx_data keeping meshes parented to allowed_bones or to nothing.
+    Returns (filtered FBXData, number of meshes left out).
+    """
+    filtered_meshes = []
+    ignored_count = 0
+    for mesh in fbx_data.meshes:
+        parent_bone = mesh.get("parent_bone", "")
+        if parent_bone in allowed_bones or not parent_bone:
+            filtered_meshes.append(mesh)
+        else:
+            ignored_count += 1
+
+    filtered_fbx = FBXData(
+        filename=fbx_data.filename,
+        tris=fbx_data.tris, # Original total (rules should use mesh list now)
+        meshes=filtered_meshes,
+        armature_name=fbx_data.armature_name,
+        bones=fbx_data.bones
+    )
+    return filtered_fbx, ignored_count
+
+@rule("category_filter", inputs=INPUT_STATS)
+def run(context):
+    """Narrows the meshes to the target category; dependents read the result from outputs."""
+    filtered_fbx, ignored_count = filter_meshes(context.fbx_data, set(context.part_config.get("bones", [])))
+    context.outputs["category_filter"] = filtered_fbx
+    if not ignored_count:
+        return []
+    return ValidationResult(
+        rule_id="BONE_SET_FILTER",
+        passed=True,
+        severity=Severity.INFO,
+        message=f"Category Filtering: Ignored {ignored_count} meshes belonging to other limbs/bones."
+    )
@@ -1,5 +1,6 @@
 import os
 import re
+from validation.engine import rule, INPUT_FILENAME
 from validation.models import ValidationResult, Severity
 
 def check(fbx_path, part_category):
@@ -21,3 +22,7 @@ def check(fbx_path, part_category):
             message=f"Filename '{filename}' does not match expected pattern '{part_category}_v###.fbx'.",
             fix_hint=f"Rename the file to something like {part_category}_v001.fbx"
         )
+
+@rule("naming", inputs=INPUT_FILENAME)
+def run(context):
+    return check(context.fbx_path, context.category)
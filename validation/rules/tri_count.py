@@ -1,3 +1,4 @@
+from validation.engine import rule, INPUT_STATS
 from validation.models import ValidationResult, Severity, FBXData
 
 def check(fbx_data: FBXData, part_config: dict):
@@ -22,3 +23,7 @@ def check(fbx_data: FBXData, part_config: dict):
             details={"current": current_tris, "limit": max_tris},
             fix_hint="Reduce polygon count using Decimate modifier or manual cleanup in Blender."
         )
+
+@rule("tri_count", inputs=INPUT_STATS, depends_on=("category_filter",))
+def run(context):
+    return check(context.outputs["category_filter"], context.part_config)